@@ -17,8 +17,8 @@ from app.models.user import User
 from app.models.blood_donation import BloodDonationRequest, BloodDonationResponse
 from app.models.assistive_device import AssistiveDeviceListing, AssistiveDeviceRequest, AssistiveDeviceResponse
 from app.models.caregiver import CaregiverListing, CaregiverRequest, CaregiverResponse
-from app.models.sharing import Share
-from app.models.notification import Notification, NotificationPreference
+from app.models.sharing import Share, ShareCounter, ShareClickCounter
+from app.models.notification import Notification, NotificationPreference, NotificationCounter, NotificationOutbox
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,43 @@
+"""notification outbox
+
+Revision ID: 0a7e5c3b9d21
+Revises: f4c9a2d7e1b3
+Create Date: 2026-10-16 21:32:05.118940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a7e5c3b9d21'
+down_revision: Union[str, None] = 'f4c9a2d7e1b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reuse the enum type created with the notifications table
+    notification_type = postgresql.ENUM(
+        'BLOOD_REQUEST', 'DEVICE_REQUEST', 'CAREGIVER_REQUEST', 'DEVICE_REVIEW', 'SHARE', 'SYSTEM',
+        name='notificationtype', create_type=False,
+    )
+    op.create_table(
+        'notification_outbox',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), nullable=False),
+        sa.Column('type', notification_type, nullable=False),
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('message', sa.Text(), nullable=False),
+        sa.Column('link', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('notification_outbox')
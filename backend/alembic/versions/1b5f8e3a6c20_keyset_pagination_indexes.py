@@ -0,0 +1,44 @@
+"""keyset pagination indexes
+
+Revision ID: 1b5f8e3a6c20
+Revises: 44271b4df067
+Create Date: 2026-10-16 08:47:19.540316
+
+(created_at, id) on every table the list endpoints page through, so a keyset page
+(created_at DESC NULLS FIRST, id DESC) is an index range scan at any depth.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1b5f8e3a6c20'
+down_revision: Union[str, None] = '44271b4df067'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables listed with the (created_at DESC, id DESC) keyset order
+PAGINATED_TABLES = [
+    'assistive_device_listings',
+    'assistive_device_requests',
+    'assistive_device_responses',
+    'device_reviews',
+    'blood_donation_requests',
+    'blood_donation_responses',
+    'caregiver_listings',
+    'caregiver_requests',
+    'caregiver_responses',
+    'caregiver_reviews',
+]
+
+
+def upgrade() -> None:
+    for table in PAGINATED_TABLES:
+        op.create_index(f'ix_{table}_created_at_id', table, ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    for table in PAGINATED_TABLES:
+        op.drop_index(f'ix_{table}_created_at_id', table_name=table)
@@ -0,0 +1,26 @@
+"""user token version
+
+Revision ID: 2785e47aa18e
+Revises: e941d745392d
+Create Date: 2026-10-16 10:02:17.554310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2785e47aa18e'
+down_revision: Union[str, None] = 'e941d745392d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default=sa.text('0'), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
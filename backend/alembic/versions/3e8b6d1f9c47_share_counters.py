@@ -0,0 +1,46 @@
+"""share counters
+
+Revision ID: 3e8b6d1f9c47
+Revises: 7c2d4f8a1e65
+Create Date: 2026-10-16 22:20:11.736052
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8b6d1f9c47'
+down_revision: Union[str, None] = '7c2d4f8a1e65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Reuse the enum types created with the shares table
+    shareable_type = postgresql.ENUM(
+        'BLOOD_REQUEST', 'BLOOD_LISTING', 'DEVICE_LISTING', 'CAREGIVER_LISTING', 'DEVICE_REQUEST', 'CAREGIVER',
+        name='shareabletype', create_type=False,
+    )
+    platform = postgresql.ENUM('FACEBOOK', 'TWITTER', 'LINKEDIN', 'WHATSAPP', 'EMAIL', name='sharingplatform', create_type=False)
+    op.create_table(
+        'share_counters',
+        sa.Column('shareable_type', shareable_type, nullable=False),
+        sa.Column('shareable_id', sa.Integer(), nullable=False),
+        sa.Column('platform', platform, nullable=False),
+        sa.Column('count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.PrimaryKeyConstraint('shareable_type', 'shareable_id', 'platform'),
+    )
+    # Backfill from the existing shares
+    op.execute("""
+        INSERT INTO share_counters (shareable_type, shareable_id, platform, count)
+        SELECT shareable_type, shareable_id, platform, COUNT(*) FROM shares
+        GROUP BY shareable_type, shareable_id, platform
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('share_counters')
@@ -0,0 +1,62 @@
+"""listing full text search
+
+Revision ID: 5c0e9a7d2f14
+Revises: b7d3c1f05a92
+Create Date: 2026-10-16 11:26:53.904127
+
+Adds a trigger-maintained, weighted search_vector tsvector to caregiver and device
+listings with a GIN index. Existing rows are backfilled by touching them.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c0e9a7d2f14'
+down_revision: Union[str, None] = 'b7d3c1f05a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Same (column, weight) pairs as the models' search_fields
+SEARCH_FIELDS = {
+    'caregiver_listings': [('service_type', 'A'), ('description', 'B')],
+    'assistive_device_listings': [('device_name', 'A'), ('device_type', 'B'), ('description', 'C')],
+}
+
+
+def document_sql(fields, row='NEW'):
+    return " || ".join(
+        f"setweight(to_tsvector('english', replace(coalesce({row}.{column}::text, ''), '_', ' ')), '{weight}')"
+        for column, weight in fields
+    )
+
+
+def upgrade() -> None:
+    for table, fields in SEARCH_FIELDS.items():
+        op.add_column(table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION {table}_search_vector_update() RETURNS trigger AS $$
+            BEGIN
+                NEW.search_vector := {document_sql(fields)};
+                RETURN NEW;
+            END
+            $$ LANGUAGE plpgsql
+        """)
+        op.execute(f"""
+            CREATE TRIGGER {table}_search_vector_trigger
+            BEFORE INSERT OR UPDATE OF {', '.join(column for column, _ in fields)} ON {table}
+            FOR EACH ROW EXECUTE FUNCTION {table}_search_vector_update()
+        """)
+        op.execute(f"UPDATE {table} SET search_vector = {document_sql(fields, row=table)}")
+        op.create_index(f'ix_{table}_search_vector', table, ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    for table in SEARCH_FIELDS:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_search_vector_trigger ON {table}")
+        op.execute(f"DROP FUNCTION IF EXISTS {table}_search_vector_update()")
+        op.drop_column(table, 'search_vector')
@@ -0,0 +1,94 @@
+"""partition notifications by month
+
+Revision ID: 7c2d4f8a1e65
+Revises: 0a7e5c3b9d21
+Create Date: 2026-10-16 21:58:43.604127
+
+Postgres only: notifications becomes a table range partitioned on created_at, one
+partition per month. The rows are copied over inside the migration, so expect it
+to take a while on a large table. Later months are created by the app and by
+`manage.py notifications-archive`.
+"""
+from datetime import datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c2d4f8a1e65'
+down_revision: Union[str, None] = '0a7e5c3b9d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, user_id, type, title, message, is_read, link, notification_metadata, created_at, updated_at"
+# Months created past the current one
+MONTHS_AHEAD = 3
+INDEXES = [
+    ('ix_notifications_id', ['id']),
+    ('ix_notifications_user_id_is_read_created_at', ['user_id', 'is_read', 'created_at', 'id']),
+    ('ix_notifications_user_id_created_at', ['user_id', 'created_at', 'id']),
+]
+
+
+def _month(index: int) -> datetime:
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def _create_table(partitioned: bool) -> None:
+    op.execute(f"""
+        CREATE TABLE notifications_new (
+            id integer NOT NULL DEFAULT nextval('notifications_id_seq'),
+            user_id integer NOT NULL,
+            type notificationtype NOT NULL,
+            title varchar NOT NULL,
+            message text NOT NULL,
+            is_read boolean,
+            link varchar,
+            notification_metadata json,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz DEFAULT now()
+        ){' PARTITION BY RANGE (created_at)' if partitioned else ''}
+    """)
+
+
+def _swap_in(primary_key: list[str]) -> None:
+    """Move the new table's data and the sequence into place as notifications"""
+    op.execute("INSERT INTO notifications_new (" + COLUMNS + ") SELECT " +
+               COLUMNS.replace("created_at", "COALESCE(created_at, updated_at, now())") + " FROM notifications")
+    op.execute("ALTER SEQUENCE notifications_id_seq OWNED BY notifications_new.id")
+    op.execute("DROP TABLE notifications")
+    op.execute("ALTER TABLE notifications_new RENAME TO notifications")
+    op.create_primary_key('notifications_pkey', 'notifications', primary_key)
+    op.create_foreign_key('notifications_user_id_fkey', 'notifications', 'users', ['user_id'], ['id'])
+    for name, columns in INDEXES:
+        op.create_index(name, 'notifications', columns, unique=False)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    _create_table(partitioned=True)
+    oldest = bind.execute(sa.text("SELECT min(COALESCE(created_at, updated_at, now())) FROM notifications")).scalar()
+    now = datetime.now(timezone.utc)
+    first = oldest.astimezone(timezone.utc) if oldest else now
+    start, stop = first.year * 12 + first.month - 1, now.year * 12 + now.month - 1 + MONTHS_AHEAD
+    for index in range(start, stop + 1):
+        month = _month(index)
+        op.execute(
+            f"CREATE TABLE notifications_y{month.year}m{month.month:02d} PARTITION OF notifications_new "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_month(index + 1).isoformat()}')"
+        )
+    # The partition key has to be part of the primary key
+    _swap_in(['id', 'created_at'])
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    _create_table(partitioned=False)
+    # Archived months detached as notifications_archive_* stay where they are
+    _swap_in(['id'])
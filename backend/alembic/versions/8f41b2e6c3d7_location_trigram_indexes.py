@@ -0,0 +1,36 @@
+"""location trigram indexes
+
+Revision ID: 8f41b2e6c3d7
+Revises: 5c0e9a7d2f14
+Create Date: 2026-10-16 12:03:37.610482
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f41b2e6c3d7'
+down_revision: Union[str, None] = '5c0e9a7d2f14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    'blood_donation_requests',
+    'assistive_device_listings',
+    'caregiver_listings',
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in TABLES:
+        op.create_index(f'ix_{table}_location_trgm', table, ['location'], unique=False,
+                        postgresql_using='gin', postgresql_ops={'location': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_location_trgm', table_name=table)
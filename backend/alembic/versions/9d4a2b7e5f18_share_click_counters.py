@@ -0,0 +1,31 @@
+"""share click counters
+
+Revision ID: 9d4a2b7e5f18
+Revises: 3e8b6d1f9c47
+Create Date: 2026-10-16 22:41:52.903417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a2b7e5f18'
+down_revision: Union[str, None] = '3e8b6d1f9c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'share_click_counters',
+        sa.Column('share_id', sa.Integer(), sa.ForeignKey('shares.id'), primary_key=True),
+        sa.Column('clicks', sa.Integer(), server_default=sa.text('0'), nullable=False),
+        sa.Column('last_clicked_at', sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('share_click_counters')
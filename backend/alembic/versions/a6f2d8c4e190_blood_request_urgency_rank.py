@@ -0,0 +1,39 @@
+"""blood request urgency rank
+
+Revision ID: a6f2d8c4e190
+Revises: 9d4a2b7e5f18
+Create Date: 2026-10-16 23:18:06.214533
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6f2d8c4e190'
+down_revision: Union[str, None] = '9d4a2b7e5f18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('blood_donation_requests', sa.Column('urgency_rank', sa.Integer(), nullable=True))
+    # Same ranks as app.models.blood_donation.URGENCY_RANK; unknown levels sort last
+    op.execute("""
+        UPDATE blood_donation_requests
+        SET urgency_rank = CASE urgency WHEN 'High' THEN 0 WHEN 'Medium' THEN 1 WHEN 'Low' THEN 2 ELSE 3 END
+    """)
+    op.alter_column('blood_donation_requests', 'urgency_rank', existing_type=sa.Integer(), nullable=False)
+
+    op.drop_index('ix_blood_donation_requests_matching', table_name='blood_donation_requests')
+    op.create_index('ix_blood_donation_requests_matching', 'blood_donation_requests',
+                    ['status', 'blood_type', 'urgency_rank', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blood_donation_requests_matching', table_name='blood_donation_requests')
+    op.create_index('ix_blood_donation_requests_matching', 'blood_donation_requests',
+                    ['status', 'blood_type', 'urgency', 'created_at'], unique=False)
+    op.drop_column('blood_donation_requests', 'urgency_rank')
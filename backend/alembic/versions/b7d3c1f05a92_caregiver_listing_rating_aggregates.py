@@ -0,0 +1,37 @@
+"""caregiver listing rating aggregates
+
+Revision ID: b7d3c1f05a92
+Revises: 2785e47aa18e
+Create Date: 2026-10-16 10:41:08.217933
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3c1f05a92'
+down_revision: Union[str, None] = '2785e47aa18e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('caregiver_listings', sa.Column('rating_sum', sa.Float(), server_default=sa.text('0'), nullable=False))
+    op.add_column('caregiver_listings', sa.Column('review_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    # Backfill from the existing reviews
+    op.execute("""
+        UPDATE caregiver_listings SET
+            rating_sum = COALESCE((SELECT SUM(r.rating) FROM caregiver_reviews r
+                                   WHERE r.listing_id = caregiver_listings.id), 0),
+            review_count = (SELECT COUNT(*) FROM caregiver_reviews r
+                            WHERE r.listing_id = caregiver_listings.id)
+        WHERE EXISTS (SELECT 1 FROM caregiver_reviews r WHERE r.listing_id = caregiver_listings.id)
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('caregiver_listings', 'review_count')
+    op.drop_column('caregiver_listings', 'rating_sum')
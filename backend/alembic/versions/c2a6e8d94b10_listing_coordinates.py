@@ -0,0 +1,38 @@
+"""listing coordinates
+
+Revision ID: c2a6e8d94b10
+Revises: 8f41b2e6c3d7
+Create Date: 2026-10-16 12:38:02.145568
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2a6e8d94b10'
+down_revision: Union[str, None] = '8f41b2e6c3d7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    'blood_donation_requests',
+    'assistive_device_listings',
+    'caregiver_listings',
+]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.add_column(table, sa.Column('latitude', sa.Float(), nullable=True))
+        op.add_column(table, sa.Column('longitude', sa.Float(), nullable=True))
+        op.create_index(f'ix_{table}_lat_lon', table, ['latitude', 'longitude'], unique=False)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.drop_index(f'ix_{table}_lat_lon', table_name=table)
+        op.drop_column(table, 'longitude')
+        op.drop_column(table, 'latitude')
@@ -0,0 +1,27 @@
+"""blood request matching index
+
+Revision ID: d9e1f3a7b5c2
+Revises: c2a6e8d94b10
+Create Date: 2026-10-16 13:10:45.872019
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9e1f3a7b5c2'
+down_revision: Union[str, None] = 'c2a6e8d94b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_blood_donation_requests_matching', 'blood_donation_requests',
+                    ['status', 'blood_type', 'urgency', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_blood_donation_requests_matching', table_name='blood_donation_requests')
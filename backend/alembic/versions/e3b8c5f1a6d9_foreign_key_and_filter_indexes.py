@@ -0,0 +1,65 @@
+"""foreign key and filter indexes
+
+Revision ID: e3b8c5f1a6d9
+Revises: d9e1f3a7b5c2
+Create Date: 2026-10-16 13:52:19.330861
+
+Check the resulting plans with `python -m benchmarks.explain_plans`.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8c5f1a6d9'
+down_revision: Union[str, None] = 'd9e1f3a7b5c2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, index name, columns)
+INDEXES = [
+    # Owner/filter column plus the keyset order of the list endpoints
+    ('assistive_device_listings', 'ix_assistive_device_listings_donor_id_created_at', ['donor_id', 'created_at', 'id']),
+    ('assistive_device_listings', 'ix_assistive_device_listings_device_type_created_at', ['device_type', 'created_at', 'id']),
+    ('assistive_device_listings', 'ix_assistive_device_listings_available_created_at', ['available', 'created_at', 'id']),
+    ('blood_donation_requests', 'ix_blood_donation_requests_user_id_created_at', ['user_id', 'created_at', 'id']),
+    ('blood_donation_requests', 'ix_blood_donation_requests_blood_type_created_at', ['blood_type', 'created_at', 'id']),
+    ('blood_donation_requests', 'ix_blood_donation_requests_status_created_at', ['status', 'created_at', 'id']),
+    ('blood_donation_responses', 'ix_blood_donation_responses_donor_id_created_at', ['donor_id', 'created_at', 'id']),
+    ('caregiver_listings', 'ix_caregiver_listings_caregiver_id_created_at', ['caregiver_id', 'created_at', 'id']),
+    ('caregiver_listings', 'ix_caregiver_listings_service_type_created_at', ['service_type', 'created_at', 'id']),
+    ('caregiver_listings', 'ix_caregiver_listings_availability_status_created_at', ['availability_status', 'created_at', 'id']),
+    ('notifications', 'ix_notifications_user_id_is_read_created_at', ['user_id', 'is_read', 'created_at', 'id']),
+    ('notifications', 'ix_notifications_user_id_created_at', ['user_id', 'created_at', 'id']),
+    ('shares', 'ix_shares_user_id_created_at', ['user_id', 'created_at']),
+    ('shares', 'ix_shares_shareable', ['shareable_type', 'shareable_id']),
+    # Plain foreign keys, for joins and for deletes of the parent row
+    ('assistive_device_requests', 'ix_assistive_device_requests_listing_id', ['listing_id']),
+    ('assistive_device_requests', 'ix_assistive_device_requests_receiver_id', ['receiver_id']),
+    ('assistive_device_responses', 'ix_assistive_device_responses_request_id', ['request_id']),
+    ('assistive_device_responses', 'ix_assistive_device_responses_listing_id', ['listing_id']),
+    ('assistive_device_responses', 'ix_assistive_device_responses_donor_id', ['donor_id']),
+    ('device_reviews', 'ix_device_reviews_listing_id', ['listing_id']),
+    ('device_reviews', 'ix_device_reviews_reviewer_id', ['reviewer_id']),
+    ('blood_donation_responses', 'ix_blood_donation_responses_request_id', ['request_id']),
+    ('caregiver_requests', 'ix_caregiver_requests_receiver_id', ['receiver_id']),
+    ('caregiver_requests', 'ix_caregiver_requests_listing_id', ['listing_id']),
+    ('caregiver_responses', 'ix_caregiver_responses_caregiver_id', ['caregiver_id']),
+    ('caregiver_responses', 'ix_caregiver_responses_receiver_id', ['receiver_id']),
+    ('caregiver_responses', 'ix_caregiver_responses_request_id', ['request_id']),
+    ('caregiver_reviews', 'ix_caregiver_reviews_listing_id', ['listing_id']),
+    ('caregiver_reviews', 'ix_caregiver_reviews_reviewer_id', ['reviewer_id']),
+    ('notification_preferences', 'ix_notification_preferences_user_id', ['user_id']),
+]
+
+
+def upgrade() -> None:
+    for table, name, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
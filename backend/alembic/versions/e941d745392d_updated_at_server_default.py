@@ -0,0 +1,47 @@
+"""updated_at server default
+
+Revision ID: e941d745392d
+Revises: 1b5f8e3a6c20
+Create Date: 2026-10-16 09:12:41.318204
+
+Legacy rows keep their NULL updated_at; run `python manage.py backfill-timestamps`
+after upgrading to fill them in batches.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e941d745392d'
+down_revision: Union[str, None] = '1b5f8e3a6c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    'users',
+    'assistive_device_listings',
+    'assistive_device_requests',
+    'assistive_device_responses',
+    'device_reviews',
+    'blood_donation_requests',
+    'blood_donation_responses',
+    'caregiver_listings',
+    'caregiver_requests',
+    'caregiver_responses',
+    'caregiver_reviews',
+    'notification_preferences',
+    'notifications',
+    'shares',
+]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', server_default=sa.text('now()'))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, 'updated_at', server_default=None)
@@ -0,0 +1,35 @@
+"""notification unread counters
+
+Revision ID: f4c9a2d7e1b3
+Revises: e3b8c5f1a6d9
+Create Date: 2026-10-16 21:14:37.502318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c9a2d7e1b3'
+down_revision: Union[str, None] = 'e3b8c5f1a6d9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'notification_counters',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id'), primary_key=True),
+        sa.Column('unread_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    )
+    # Backfill from the existing notifications
+    op.execute("""
+        INSERT INTO notification_counters (user_id, unread_count)
+        SELECT user_id, COUNT(*) FROM notifications WHERE is_read = false GROUP BY user_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('notification_counters')
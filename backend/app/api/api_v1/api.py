@@ -4,6 +4,8 @@ from app.api.api_v1.endpoints import (
     blood_donation,
     assistive_device,
     caregiver,
+    notifications,
+    sharing,
     users
 )
 
@@ -22,4 +24,10 @@ api_router.include_router(blood_donation.router, prefix="/blood-donation", tags=
 api_router.include_router(assistive_device.router, prefix="/devices", tags=["devices"])
 
 # Caregiver endpoints
-api_router.include_router(caregiver.router, prefix="/caregivers", tags=["caregivers"])
\ No newline at end of file
+api_router.include_router(caregiver.router, prefix="/caregivers", tags=["caregivers"])
+
+# Notification endpoints
+api_router.include_router(notifications.router, prefix="/notifications", tags=["notifications"])
+
+# Sharing endpoints
+api_router.include_router(sharing.router, prefix="/shares", tags=["sharing"])
\ No newline at end of file
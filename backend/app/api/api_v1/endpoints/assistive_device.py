@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-from app.db.session import get_db
-from app.models.user import User
+from app.db.session import get_async_db
+from app.core.auth import CurrentUser, get_current_user
 from app.models.assistive_device import AssistiveDeviceListing, AssistiveDeviceRequest, AssistiveDeviceResponse, DeviceReview
+from app.models.notification import NotificationType
 from app.schemas.assistive_device import (
     AssistiveDeviceListingCreate,
     AssistiveDeviceListingResponse,
@@ -16,24 +18,26 @@ from app.schemas.assistive_device import (
     DeviceReviewResponse
 )
 from app.schemas.common import PaginatedResponse
+from app.core.pagination import paginate
+from app.core.etags import ConditionalGet, conditional_get, row_version
+from app.core.result_cache import CachedRoute
+from app.db.geo import apply_proximity_filter
+from app.db.search import apply_search, apply_location_filter
+from app.services.notification import NotificationService
 
 router = APIRouter()
 
+# Browse page served from the result cache, see settings.RESULT_CACHE_TTL_SECONDS
+DEVICE_LISTINGS = CachedRoute("devices.listings", AssistiveDeviceListingResponse)
+
 # Listing endpoints
 @router.post("/listings", response_model=AssistiveDeviceListingResponse)
-def create_device_listing(
+async def create_device_listing(
     listing: AssistiveDeviceListingCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new assistive device listing"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Remove is_donor check temporarily until role migration is complete
     # if not user.is_donor:
     #    raise HTTPException(status_code=403, detail="User is not registered as a donor")
@@ -48,98 +52,90 @@ def create_device_listing(
     
     # Add, commit, and refresh the object
     db.add(db_listing)
-    db.commit()
-    db.refresh(db_listing)
+    await db.commit()
+    await db.refresh(db_listing)
     return db_listing
 
 @router.get("/listings", response_model=PaginatedResponse[AssistiveDeviceListingResponse])
-def get_device_listings(
+async def get_device_listings(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
     device_type: Optional[str] = None,
     location: Optional[str] = None,
+    location_match: str = Query("exact", description="How to match location: 'exact', 'prefix' (starts with, case-insensitive) or 'fuzzy' (close match anywhere, ranked by similarity)"),
+    near: Optional[str] = Query(None, description="'latitude,longitude' to search around; results within radius_km, nearest first"),
+    radius_km: float = Query(25.0, gt=0, le=20000, description="Search radius in km for near"),
+    search: Optional[str] = Query(None, description="Full-text search over device name, type and description; results are ordered by relevance"),
     available: Optional[str] = Query(None, description="Filter by availability status: 'available', 'pending', 'reserved', 'on_hold', 'taken', 'maintenance', 'inactive', or empty for all"),
     is_mine: Optional[str] = Query(None, description="Filter for listings created by the current user (true/false)"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get all assistive device listings"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    query = db.query(AssistiveDeviceListing)
+    query = select(AssistiveDeviceListing)
     
     # Apply filters only if they have actual values
     if device_type and device_type.strip():
-        query = query.filter(AssistiveDeviceListing.device_type == device_type)
+        query = query.where(AssistiveDeviceListing.device_type == device_type)
+    location_rank = None
     if location and location.strip():
-        query = query.filter(AssistiveDeviceListing.location == location)
+        query, location_rank = apply_location_filter(query, AssistiveDeviceListing.location, location.strip(),
+                                                     location_match, db.bind.dialect.name)
     if available and available.strip():
-        query = query.filter(AssistiveDeviceListing.available == available)
+        query = query.where(AssistiveDeviceListing.available == available)
     if is_mine and is_mine.lower() == 'true':
-        query = query.filter(AssistiveDeviceListing.donor_id == user.id)
-    
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    listings = query.offset(skip).limit(limit).all()
-    
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": listings,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+        query = query.where(AssistiveDeviceListing.donor_id == user.id)
+    
+    # Full-text search, ranked by relevance on Postgres
+    rank = None
+    if search and search.strip():
+        query, rank = apply_search(query, AssistiveDeviceListing, search.strip(), db.bind.dialect.name)
+    
+    # Within radius_km of near, nearest first
+    distance = None
+    if near and near.strip():
+        query, distance = apply_proximity_filter(query, AssistiveDeviceListing, near, radius_km)
+    
+    # Get the page (offset or keyset) with total count and next cursor
+    order_by = [distance] if distance is not None else []
+    order_by += [r.desc() for r in (rank, location_rank) if r is not None]
+    return await paginate(db, query, AssistiveDeviceListing, skip, limit, cursor, include_total, count_mode,
+                          order_by=order_by or None, conditional=conditional, cache=DEVICE_LISTINGS)
 
 @router.get("/listings/{listing_id}", response_model=AssistiveDeviceListingResponse)
-def read_device_listing(
+async def read_device_listing(
     listing_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-        
-    listing = db.query(AssistiveDeviceListing).filter(
+    not_modified = await conditional.unchanged(db, row_version(AssistiveDeviceListing, listing_id))
+    if not_modified:
+        return not_modified
+    listing = await db.scalar(select(AssistiveDeviceListing).where(
         AssistiveDeviceListing.id == listing_id
-    ).first()
+    ))
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device listing not found"
         )
+    conditional.tag(listing.id, listing.updated_at)
     return listing
 
 @router.patch("/listings/{listing_id}/status", response_model=AssistiveDeviceListingResponse)
-def update_device_listing_status(
+async def update_device_listing_status(
     listing_id: int,
     status: str = Header(..., description="New status: 'available', 'pending', 'reserved', 'on_hold', 'taken', 'maintenance', 'inactive'"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Update the availability status of a device listing"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    listing = db.query(AssistiveDeviceListing).filter(AssistiveDeviceListing.id == listing_id).first()
+    listing = await db.scalar(select(AssistiveDeviceListing).where(AssistiveDeviceListing.id == listing_id))
     if not listing:
         raise HTTPException(status_code=404, detail="Device listing not found")
     
@@ -154,32 +150,25 @@ def update_device_listing_status(
     listing.updated_at = datetime.now()
     
     db.add(listing)
-    db.commit()
-    db.refresh(listing)
+    await db.commit()
+    await db.refresh(listing)
     
     return listing
 
 # Request endpoints
 @router.post("/requests", response_model=AssistiveDeviceRequestResponse)
-def create_device_request(
+async def create_device_request(
     request: AssistiveDeviceRequestCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new assistive device request"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Once the role migration is complete, uncomment this line
     # if not user.is_recipient:
     #    raise HTTPException(status_code=403, detail="User is not registered as a recipient")
 
     # Verify listing exists
-    listing = db.query(AssistiveDeviceListing).filter(AssistiveDeviceListing.id == request.listing_id).first()
+    listing = await db.scalar(select(AssistiveDeviceListing).where(AssistiveDeviceListing.id == request.listing_id))
     if not listing:
         raise HTTPException(status_code=404, detail="Device listing not found")
 
@@ -191,101 +180,75 @@ def create_device_request(
     db_request.updated_at = current_time
     
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    await db.commit()
+    await db.refresh(db_request)
     return db_request
 
 @router.get("/requests", response_model=PaginatedResponse[AssistiveDeviceRequestResponse])
-def get_device_requests(
+async def get_device_requests(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get all assistive device requests
     """
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    query = db.query(AssistiveDeviceRequest)
-    
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    requests = query.offset(skip).limit(limit).all()
+    query = select(AssistiveDeviceRequest)
     
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": requests,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, AssistiveDeviceRequest, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
 
 @router.get("/requests/{request_id}", response_model=AssistiveDeviceRequestResponse)
-def read_device_request(
+async def read_device_request(
     request_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get a specific assistive device request by ID
     """
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    request = db.query(AssistiveDeviceRequest).filter(AssistiveDeviceRequest.id == request_id).first()
+    not_modified = await conditional.unchanged(db, row_version(AssistiveDeviceRequest, request_id))
+    if not_modified:
+        return not_modified
+    request = await db.scalar(select(AssistiveDeviceRequest).where(AssistiveDeviceRequest.id == request_id))
     if not request:
         raise HTTPException(status_code=404, detail="Assistive device request not found")
+    conditional.tag(request.id, request.updated_at)
     return request
 
 # Response endpoints
 @router.post("/responses", response_model=AssistiveDeviceResponseResponse)
-def create_device_response(
+async def create_device_response(
     response: AssistiveDeviceResponseCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
     # Verify listing and request exist
-    listing = db.query(AssistiveDeviceListing).filter(
+    listing = await db.scalar(select(AssistiveDeviceListing).where(
         AssistiveDeviceListing.id == response.listing_id
-    ).first()
+    ))
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device listing not found"
         )
     
-    request = db.query(AssistiveDeviceRequest).filter(
+    request = await db.scalar(select(AssistiveDeviceRequest).where(
         AssistiveDeviceRequest.id == response.request_id
-    ).first()
+    ))
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device request not found"
         )
     
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     db_response = AssistiveDeviceResponse(
         **response.dict(),
         donor_id=user.id,
@@ -298,115 +261,86 @@ def create_device_response(
     db_response.updated_at = current_time
     
     db.add(db_response)
-    db.commit()
-    db.refresh(db_response)
+    # Committed with the response; the outbox worker creates the notification
+    NotificationService(db).enqueue(
+        user_id=request.receiver_id,
+        type=NotificationType.DEVICE_REQUEST,
+        title="New response to your device request",
+        message=f"The owner of {listing.device_name} responded to your request",
+        link=f"/devices/requests/{request.id}"
+    )
+    await db.commit()
+    await db.refresh(db_response)
     return db_response
 
 @router.get("/responses", response_model=PaginatedResponse[AssistiveDeviceResponseResponse])
-def read_device_responses(
+async def read_device_responses(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    query = db.query(AssistiveDeviceResponse)
-    
-    # Fix for null updated_at values
-    current_time = datetime.now()
-    for response in query.all():
-        if not response.updated_at:
-            response.updated_at = current_time
-            db.add(response)
-    db.commit()
+    query = select(AssistiveDeviceResponse)
     
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    responses = query.offset(skip).limit(limit).all()
-    
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": responses,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, AssistiveDeviceResponse, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
 
 @router.get("/responses/{response_id}", response_model=AssistiveDeviceResponseResponse)
-def read_device_response(
+async def read_device_response(
     response_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    response = db.query(AssistiveDeviceResponse).filter(
+    not_modified = await conditional.unchanged(db, row_version(AssistiveDeviceResponse, response_id))
+    if not_modified:
+        return not_modified
+    response = await db.scalar(select(AssistiveDeviceResponse).where(
         AssistiveDeviceResponse.id == response_id
-    ).first()
+    ))
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device response not found"
         )
+    conditional.tag(response.id, response.updated_at)
     return response
 
 @router.put("/responses/{response_id}/status", response_model=AssistiveDeviceResponseResponse)
-def update_response_status(
+async def update_response_status(
     response_id: int,
     status: str,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    response = db.query(AssistiveDeviceResponse).filter(
+    response = await db.scalar(select(AssistiveDeviceResponse).where(
         AssistiveDeviceResponse.id == response_id
-    ).first()
+    ))
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device response not found"
         )
     
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     response.status = status
-    db.commit()
-    db.refresh(response)
+    await db.commit()
+    await db.refresh(response)
     return response
 
 @router.post("/reviews", response_model=DeviceReviewResponse)
-def create_device_review(
+async def create_device_review(
     review: DeviceReviewCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new device review"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Verify listing exists
-    listing = db.query(AssistiveDeviceListing).filter(AssistiveDeviceListing.id == review.listing_id).first()
+    listing = await db.scalar(select(AssistiveDeviceListing).where(AssistiveDeviceListing.id == review.listing_id))
     if not listing:
         raise HTTPException(status_code=404, detail="Device listing not found")
 
@@ -418,49 +352,24 @@ def create_device_review(
     db_review.updated_at = current_time
     
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
+    await db.commit()
+    await db.refresh(db_review)
     return db_review
 
 @router.get("/reviews", response_model=PaginatedResponse[DeviceReviewResponse])
-def get_device_reviews(
+async def get_device_reviews(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get all device reviews"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    query = db.query(DeviceReview)
-    
-    # Fix for null updated_at values
-    current_time = datetime.now()
-    for review in query.all():
-        if not review.updated_at:
-            review.updated_at = current_time
-            db.add(review)
-    db.commit()
-    
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    reviews = query.offset(skip).limit(limit).all()
-    
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
+    query = select(DeviceReview)
     
-    # Construct and return paginated response
-    return {
-        "items": reviews,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
\ No newline at end of file
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, DeviceReview, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_, not_
-from app.db.session import get_db
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, or_, and_, not_
+from app.db.session import get_async_db
 from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse
-from app.schemas.auth import UserLogin
+from app.core.auth import CurrentUser, user_cache, get_current_user as require_user
+from app.schemas.user import UserCreate, UserResponse, UserLoginResponse
+from app.schemas.auth import UserLogin, TokenResponse, TokenRefresh
+from app.core.passwords import password_hasher
+from app.core.security import REFRESH_TOKEN, TokenError, create_token_pair, decode_token, revoke_user_tokens
 from datetime import datetime
 import traceback
 import sys
@@ -12,44 +15,47 @@ import sys
 router = APIRouter()
 
 @router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     try:
         print(f"Registration attempt with data: {user_data.dict(exclude={'password'})}")
         
         # Check if user with this email exists but is deleted (can be reactivated)
-        deleted_user = db.query(User).filter(User.email == user_data.email, User.deleted_at.is_not(None)).first()
+        deleted_user = await db.scalar(select(User).where(User.email == user_data.email, User.deleted_at.is_not(None)))
         if deleted_user:
             print(f"Found deleted user with same email, will reactivate: {deleted_user.id}")
             
             # Update the user's data
             deleted_user.username = user_data.username
-            deleted_user.hashed_password = User.get_password_hash(user_data.password)
+            deleted_user.hashed_password = await password_hasher.hash(user_data.password)
             deleted_user.deleted_at = None
             
-            db.commit()
-            db.refresh(deleted_user)
+            await db.commit()
+            await db.refresh(deleted_user)
+            user_cache.invalidate(deleted_user.email)
             print(f"Reactivated user successfully, id: {deleted_user.id}")
             return deleted_user
         
         # Check if user with this username exists but is deleted (can be reactivated)
-        deleted_user_by_username = db.query(User).filter(User.username == user_data.username, 
-                                                         User.deleted_at.is_not(None)).first()
+        deleted_user_by_username = await db.scalar(select(User).where(User.username == user_data.username,
+                                                                          User.deleted_at.is_not(None)))
         if deleted_user_by_username:
             print(f"Found deleted user with same username, will reactivate: {deleted_user_by_username.id}")
             
             # Update the user's data
+            user_cache.invalidate(deleted_user_by_username.email)
             deleted_user_by_username.email = user_data.email
-            deleted_user_by_username.hashed_password = User.get_password_hash(user_data.password)
+            deleted_user_by_username.hashed_password = await password_hasher.hash(user_data.password)
             deleted_user_by_username.deleted_at = None
             
-            db.commit()
-            db.refresh(deleted_user_by_username)
+            await db.commit()
+            await db.refresh(deleted_user_by_username)
+            user_cache.invalidate(deleted_user_by_username.email)
             print(f"Reactivated user successfully, id: {deleted_user_by_username.id}")
             return deleted_user_by_username
         
         # Check if active user already exists with this email
-        if db.query(User).filter(User.email == user_data.email, User.deleted_at.is_(None)).first():
+        if await db.scalar(select(User).where(User.email == user_data.email, User.deleted_at.is_(None))):
             print(f"Email already registered: {user_data.email}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -57,7 +63,7 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             )
         
         # Check if active user already exists with this username
-        if db.query(User).filter(User.username == user_data.username, User.deleted_at.is_(None)).first():
+        if await db.scalar(select(User).where(User.username == user_data.username, User.deleted_at.is_(None))):
             print(f"Username already taken: {user_data.username}")
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -71,15 +77,15 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             username=user_data.username,
             full_name=user_data.full_name if user_data.full_name else None,
             phone_number=user_data.phone_number if user_data.phone_number else None,
-            hashed_password=User.get_password_hash(user_data.password)
+            hashed_password=await password_hasher.hash(user_data.password)
         )
         print("User object created")
         
         db.add(user)
         print("User added to session")
-        db.commit()
+        await db.commit()
         print("Transaction committed")
-        db.refresh(user)
+        await db.refresh(user)
         print(f"User refreshed, id: {user.id}")
         
         return user
@@ -95,13 +101,13 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
             detail=f"An error occurred during registration: {str(e)}"
         )
 
-@router.post("/login", response_model=UserResponse)
-def login(login_data: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=UserLoginResponse)
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login user"""
     try:
         print(f"Login attempt with email: {login_data.email}")
         
-        user = db.query(User).filter(User.email == login_data.email, User.deleted_at.is_(None)).first()
+        user = await db.scalar(select(User).where(User.email == login_data.email, User.deleted_at.is_(None)))
         if not user:
             print(f"User not found with email: {login_data.email}")
             raise HTTPException(
@@ -111,15 +117,22 @@ def login(login_data: UserLogin, db: Session = Depends(get_db)):
             
         print(f"User found with email: {login_data.email}, id: {user.id}")
         
-        if not user.verify_password(login_data.password):
+        if not await password_hasher.verify(login_data.password, user.hashed_password):
             print(f"Incorrect password for user: {login_data.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password"
             )
+        
+        # Upgrade hashes made with a different bcrypt cost while we have the plaintext
+        if password_hasher.needs_rehash(user.hashed_password):
+            print(f"Rehashing password for user: {login_data.email}")
+            user.hashed_password = await password_hasher.hash(login_data.password)
+            await db.commit()
+            await db.refresh(user)
             
         print(f"Login successful for user: {login_data.email}")
-        return user
+        return {**UserResponse.model_validate(user).model_dump(), **create_token_pair(user)}
     except HTTPException as http_e:
         print(f"HTTP exception during login: {http_e.detail}")
         raise
@@ -132,17 +145,34 @@ def login(login_data: UserLogin, db: Session = Depends(get_db)):
             detail=f"An error occurred during login: {str(e)}"
         )
 
-@router.get("/me", response_model=UserResponse)
-def get_current_user(db: Session = Depends(get_db), x_user_email: str = Header(None, alias="X-User-Email")):
-    """Get current user details"""
-    if not x_user_email:
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_token(token_data: TokenRefresh, db: AsyncSession = Depends(get_async_db)):
+    """Exchange a refresh token for a new access/refresh token pair"""
+    try:
+        claims = decode_token(token_data.refresh_token, REFRESH_TOKEN)
+    except TokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Refreshing is the point where revocation is checked against the database
+    user = await db.get(User, claims["sub"])
+    if not user or user.is_deleted or user.token_version != claims.get("ver"):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
+            detail="Token revoked",
+            headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.email == x_user_email, User.deleted_at.is_(None)).first()
-    if not user:
+    return create_token_pair(user)
+
+@router.get("/me", response_model=UserResponse)
+async def get_current_user(db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(require_user)):
+    """Get current user details"""
+    user = await db.get(User, current_user.id)
+    if not user or user.is_deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
@@ -151,17 +181,11 @@ def get_current_user(db: Session = Depends(get_db), x_user_email: str = Header(N
     return user
 
 @router.delete("/delete-account", response_model=dict)
-def delete_account(db: Session = Depends(get_db), x_user_email: str = Header(None, alias="X-User-Email")):
+async def delete_account(db: AsyncSession = Depends(get_async_db), current_user: CurrentUser = Depends(require_user)):
     """Delete user account (soft delete)"""
-    if not x_user_email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-    
     try:
-        user = db.query(User).filter(User.email == x_user_email, User.deleted_at.is_(None)).first()
-        if not user:
+        user = await db.get(User, current_user.id)
+        if not user or user.is_deleted:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
@@ -169,14 +193,16 @@ def delete_account(db: Session = Depends(get_db), x_user_email: str = Header(Non
         
         # Soft delete the user by setting deleted_at timestamp
         user.deleted_at = datetime.now()
-        db.commit()
+        revoke_user_tokens(user)
+        await db.commit()
+        user_cache.invalidate(user.email)
         
         return {"success": True, "message": "Account successfully deleted"}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred while deleting the account: {str(e)}"
-        )
\ No newline at end of file
+        )
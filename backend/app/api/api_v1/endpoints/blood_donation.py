@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status, Header
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import datetime
-from app.db.session import get_db
-from app.models.user import User
-from app.models.blood_donation import BloodDonationRequest, BloodDonationResponse
+from app.db.session import get_async_db
+from app.core.auth import CurrentUser, get_current_user
+from app.models.blood_donation import BloodDonationRequest, BloodDonationResponse, COMPATIBLE_RECIPIENTS
+from app.models.notification import NotificationType
 from app.schemas.blood_donation import (
     BloodDonationRequestCreate,
     BloodDonationRequestResponse,
@@ -12,27 +14,32 @@ from app.schemas.blood_donation import (
     BloodDonationResponseResponse
 )
 from app.schemas.common import PaginatedResponse
+from app.core.pagination import paginate
+from app.core.etags import ConditionalGet, conditional_get, row_version
+from app.core.result_cache import CachedRoute
+from app.db.geo import apply_proximity_filter
+from app.db.search import apply_location_filter
+from app.services.notification import NotificationService
 
 router = APIRouter()
 
+# Browse page served from the result cache, see settings.RESULT_CACHE_TTL_SECONDS
+BLOOD_REQUESTS = CachedRoute("blood.requests", BloodDonationRequestResponse)
+BLOOD_COMPATIBLE = CachedRoute("blood.compatible", BloodDonationRequestResponse)
+
 @router.post("/requests", response_model=BloodDonationRequestResponse)
-def create_blood_request(
+async def create_blood_request(
     request: BloodDonationRequestCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new blood donation request"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     # Create the database object
     db_request = BloodDonationRequest(
         blood_type=request.blood_type,
         location=request.location,
+        latitude=request.latitude,
+        longitude=request.longitude,
         urgency=request.urgency,
         contact_number=request.contact_number,
         notes=request.notes,
@@ -46,85 +53,102 @@ def create_blood_request(
     
     # Add, commit, and refresh the object
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    await db.commit()
+    await db.refresh(db_request)
     return db_request
 
 @router.get("/requests", response_model=PaginatedResponse[BloodDonationRequestResponse])
-def get_blood_requests(
+async def get_blood_requests(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
     blood_type: Optional[str] = Query(None),
     location: Optional[str] = Query(None),
+    location_match: str = Query("exact", description="How to match location: 'exact', 'prefix' (starts with, case-insensitive) or 'fuzzy' (close match anywhere, ranked by similarity)"),
+    near: Optional[str] = Query(None, description="'latitude,longitude' to search around; results within radius_km, nearest first"),
+    radius_km: float = Query(25.0, gt=0, le=20000, description="Search radius in km for near"),
     status: Optional[str] = Query(None, description="Filter by status: 'available', 'unavailable', 'pending_verification', 'reserved', 'expired', or empty for all"),
     is_mine: Optional[bool] = Query(None, description="Show only the current user's blood donation requests"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get all blood donation requests"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    query = db.query(BloodDonationRequest)
+    query = select(BloodDonationRequest)
     
     # Apply filters only if they have actual values
     if blood_type and blood_type.strip():
-        query = query.filter(BloodDonationRequest.blood_type == blood_type)
+        query = query.where(BloodDonationRequest.blood_type == blood_type)
+    location_rank = None
     if location and location.strip():
-        query = query.filter(BloodDonationRequest.location == location)
+        query, location_rank = apply_location_filter(query, BloodDonationRequest.location, location.strip(),
+                                                     location_match, db.bind.dialect.name)
     if status and status.strip():
-        query = query.filter(BloodDonationRequest.status == status)
+        query = query.where(BloodDonationRequest.status == status)
     # Filter by current user's blood donation requests if is_mine is true
     if is_mine:
-        query = query.filter(BloodDonationRequest.user_id == user.id)
+        query = query.where(BloodDonationRequest.user_id == user.id)
         
-    # Fix for null updated_at values
-    current_time = datetime.now()
-    for request in query.all():
-        if not request.updated_at:
-            request.updated_at = current_time
-            db.add(request)
-    db.commit()
-    
-    # Get total count for pagination
-    total = query.count()
+    # Within radius_km of near, nearest first
+    distance = None
+    if near and near.strip():
+        query, distance = apply_proximity_filter(query, BloodDonationRequest, near, radius_km)
     
-    # Get paginated results
-    requests = query.offset(skip).limit(limit).all()
+    # Get the page (offset or keyset) with total count and next cursor
+    order_by = [distance] if distance is not None else []
+    order_by += [location_rank.desc()] if location_rank is not None else []
+    return await paginate(db, query, BloodDonationRequest, skip, limit, cursor, include_total, count_mode,
+                          order_by=order_by or None, conditional=conditional, cache=BLOOD_REQUESTS)
+
+@router.get("/requests/compatible", response_model=PaginatedResponse[BloodDonationRequestResponse])
+async def get_compatible_blood_requests(
+    blood_type: str = Query(..., description="The donor's blood type: 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-', 'O+' or 'O-'"),
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
+):
+    """Get the open blood requests a donor of the given type can serve, most urgent and newest first"""
+    recipients = COMPATIBLE_RECIPIENTS.get(blood_type.strip().upper())
+    if not recipients:
+        raise HTTPException(status_code=400, detail=f"Invalid blood type. Must be one of {', '.join(COMPATIBLE_RECIPIENTS)}")
     
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
+    query = select(BloodDonationRequest).where(
+        BloodDonationRequest.status == "available",
+        BloodDonationRequest.blood_type.in_(recipients),
+        BloodDonationRequest.user_id != user.id
+    )
     
-    # Construct and return paginated response
-    return {
-        "items": requests,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # (urgency_rank, created_at, id) is the tail of ix_blood_donation_requests_matching,
+    # so pages, cursor ones included, come off the index
+    return await paginate(db, query, BloodDonationRequest, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional, cache=BLOOD_COMPATIBLE, rank=BloodDonationRequest.urgency_rank)
 
 @router.get("/requests/{request_id}", response_model=BloodDonationRequestResponse)
-def read_blood_request(
+async def read_blood_request(
     request_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get a specific blood donation request by ID
     """
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
+    # Only a version the user may see answers 304; anything else takes the checks below
+    visible = BloodDonationRequest.user_id == user.id
+    if user.is_donor:
+        visible = or_(visible, BloodDonationRequest.status == 'available')
+    not_modified = await conditional.unchanged(db, row_version(BloodDonationRequest, request_id, visible))
+    if not_modified:
+        return not_modified
     
-    request = db.query(BloodDonationRequest).filter(BloodDonationRequest.id == request_id).first()
+    request = await db.scalar(select(BloodDonationRequest).where(BloodDonationRequest.id == request_id))
     if not request:
         raise HTTPException(status_code=404, detail="Blood donation request not found")
     
@@ -134,28 +158,22 @@ def read_blood_request(
         if not user.is_donor or request.status != 'available':
             raise HTTPException(status_code=403, detail="Not authorized to view this request")
     
+    conditional.tag(request.id, request.updated_at)
     return request
 
 @router.post("/responses", response_model=BloodDonationResponseResponse)
-def create_blood_response(
+async def create_blood_response(
     response: BloodDonationResponseCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new blood donation response"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Once the role migration is complete, uncomment this line
     # if not user.is_donor:
     #    raise HTTPException(status_code=403, detail="User is not registered as a donor")
 
     # Verify request exists
-    request = db.query(BloodDonationRequest).filter(BloodDonationRequest.id == response.request_id).first()
+    request = await db.scalar(select(BloodDonationRequest).where(BloodDonationRequest.id == response.request_id))
     if not request:
         raise HTTPException(status_code=404, detail="Blood donation request not found")
 
@@ -166,91 +184,68 @@ def create_blood_response(
         status="pending"
     )
     db.add(db_response)
-    db.commit()
-    db.refresh(db_response)
+    # Committed with the response; the outbox worker creates the notification
+    NotificationService(db).enqueue(
+        user_id=request.user_id,
+        type=NotificationType.BLOOD_REQUEST,
+        title="New response to your blood request",
+        message=f"A donor responded to your {request.blood_type} blood request",
+        link=f"/blood-donation/requests/{request.id}"
+    )
+    await db.commit()
+    await db.refresh(db_response)
     return db_response
 
 @router.get("/responses", response_model=PaginatedResponse[BloodDonationResponseResponse])
-def get_blood_responses(
+async def get_blood_responses(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
     is_mine: Optional[bool] = Query(None, description="Show only the current user's blood donation responses"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get all blood donation responses"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    query = db.query(BloodDonationResponse)
+    query = select(BloodDonationResponse)
     
     # Filter by current user's responses if is_mine is true
     if is_mine:
-        query = query.filter(BloodDonationResponse.donor_id == user.id)
-    
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    responses = query.offset(skip).limit(limit).all()
+        query = query.where(BloodDonationResponse.donor_id == user.id)
     
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": responses,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, BloodDonationResponse, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
 
 @router.delete("/requests/{request_id}", response_model=None)
-def delete_blood_request(
+async def delete_blood_request(
     request_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Delete a blood donation request"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    request = db.query(BloodDonationRequest).filter(BloodDonationRequest.id == request_id).first()
+    request = await db.scalar(select(BloodDonationRequest).where(BloodDonationRequest.id == request_id))
     if not request:
         raise HTTPException(status_code=404, detail="Blood donation request not found")
     
     if request.user_id != user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this request")
     
-    db.delete(request)
-    db.commit()
+    await db.delete(request)
+    await db.commit()
     return {"message": "Blood donation request deleted successfully"}
 
 @router.patch("/requests/{request_id}/status", response_model=BloodDonationRequestResponse)
-def update_blood_request_status(
+async def update_blood_request_status(
     request_id: int,
     status: str = Query(..., description="New status: 'available', 'unavailable', 'pending_verification', 'reserved', 'expired'"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Update the status of a blood donation request"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    request = db.query(BloodDonationRequest).filter(BloodDonationRequest.id == request_id).first()
+    request = await db.scalar(select(BloodDonationRequest).where(BloodDonationRequest.id == request_id))
     if not request:
         raise HTTPException(status_code=404, detail="Blood donation request not found")
     
@@ -281,7 +276,7 @@ def update_blood_request_status(
     request.updated_at = datetime.now()
     
     db.add(request)
-    db.commit()
-    db.refresh(request)
+    await db.commit()
+    await db.refresh(request)
     
     return request
\ No newline at end of file
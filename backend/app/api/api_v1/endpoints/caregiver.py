@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Header, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from typing import List, Optional
 from datetime import datetime
-from app.db.session import get_db
+from app.db.session import get_async_db
 from app.models.user import User
+from app.models.notification import NotificationType
 from app.models.caregiver import (
     CaregiverListing,
     CaregiverRequest,
@@ -24,33 +27,54 @@ from app.schemas.caregiver import (
     CaregiverReviewResponse
 )
 from app.schemas.common import PaginatedResponse
-from app.core.auth import get_current_user
+from app.core.pagination import paginate
+from app.core.etags import ConditionalGet, conditional_get, row_version
+from app.core.result_cache import CachedRoute
+from app.db.geo import apply_proximity_filter
+from app.db.search import apply_search, apply_location_filter
+from app.core.auth import CurrentUser, get_current_user
+from app.services.notification import NotificationService
 import traceback
 
 # Use auth module for user authentication
 
 router = APIRouter()
 
+# Browse page served from the result cache, see settings.RESULT_CACHE_TTL_SECONDS
+CAREGIVER_LISTINGS = CachedRoute("caregivers.listings", CaregiverListingResponse, tables=("users",))
+
+# CaregiverListingResponse serializes the caregiver, which can't be lazy-loaded on an
+# AsyncSession. The rating comes from the listing's own review aggregate columns.
+listing_load_options = (
+    selectinload(CaregiverListing.caregiver),
+)
+listing_relationships = ["caregiver"]
+
+
+def listing_version(listing: CaregiverListing) -> tuple:
+    """ETag parts of a listing: the row, its review aggregates and the embedded caregiver"""
+    return listing.id, listing.updated_at, listing.review_count, listing.caregiver.updated_at
+
+
+def listing_version_query(listing_id: int):
+    """The columns of listing_version for one listing, read without loading it"""
+    return select(
+        CaregiverListing.id, CaregiverListing.updated_at, CaregiverListing.review_count, User.updated_at
+    ).join(User, User.id == CaregiverListing.caregiver_id).where(CaregiverListing.id == listing_id)
+
 # Listing endpoints
 @router.post("/listings", response_model=CaregiverListingResponse)
-def create_caregiver_listing(
+async def create_caregiver_listing(
     listing: CaregiverListingCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Create a new caregiver listing"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email, User.deleted_at.is_(None)).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Ensure user has a full_name
-    if not user.full_name or user.full_name == "":
-        user.full_name = user.username  # Use username as fallback
-        db.add(user)
-        db.commit()
+    db_user = await db.get(User, user.id)
+    if not db_user.full_name or db_user.full_name == "":
+        db_user.full_name = db_user.username  # Use username as fallback
+        await db.commit()
     
     try:
         # Print the incoming data to help with debugging
@@ -69,35 +93,40 @@ def create_caregiver_listing(
         
         # Add, commit, and refresh the object
         db.add(db_listing)
-        db.commit()
-        db.refresh(db_listing)
+        await db.commit()
+        await db.refresh(db_listing)
+        await db.refresh(db_listing, attribute_names=listing_relationships)
         return db_listing
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error creating caregiver listing: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to create listing: {str(e)}")
 
 @router.get("/listings", response_model=PaginatedResponse[CaregiverListingResponse])
-def get_caregiver_listings(
+async def get_caregiver_listings(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
     service_type: Optional[str] = None,
     experience_level: Optional[str] = None,
     location: Optional[str] = None,
+    location_match: str = Query("exact", description="How to match location: 'exact', 'prefix' (starts with, case-insensitive) or 'fuzzy' (close match anywhere, ranked by similarity)"),
+    near: Optional[str] = Query(None, description="'latitude,longitude' to search around; results within radius_km, nearest first"),
+    radius_km: float = Query(25.0, gt=0, le=20000, description="Search radius in km for near"),
     search: Optional[str] = None,
     availability_status: Optional[str] = Query(None, description="Filter by availability status: 'available', 'busy', 'unavailable', 'temporarily_unavailable', 'on_vacation', 'limited_availability', 'booked', or empty for all"),
+    min_rating: Optional[float] = Query(None, description="Only listings whose average rating is at least this value"),
     is_mine: Optional[str] = Query(None, description="Filter for listings created by the current user (true/false)"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Get caregiver listings with optional filtering"""
-    user = db.query(User).filter(User.email == email, User.deleted_at.is_(None)).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     try:
-        query = db.query(CaregiverListing)
+        query = select(CaregiverListing).options(*listing_load_options)
         
         # Apply filters only if they have actual values
         if service_type and service_type.strip():
@@ -115,7 +144,7 @@ def get_caregiver_listings(
                         break
                 
                 if mapped_service_type:
-                    query = query.filter(CaregiverListing.service_type == mapped_service_type)
+                    query = query.where(CaregiverListing.service_type == mapped_service_type)
                 else:
                     print(f"Warning: Unable to map service_type '{service_type}' to a valid enum value")
             except Exception as e:
@@ -137,20 +166,22 @@ def get_caregiver_listings(
                         break
                 
                 if mapped_experience_level:
-                    query = query.filter(CaregiverListing.experience_level == mapped_experience_level)
+                    query = query.where(CaregiverListing.experience_level == mapped_experience_level)
                 else:
                     print(f"Warning: Unable to map experience_level '{experience_level}' to a valid enum value")
             except Exception as e:
                 print(f"Error mapping experience_level: {str(e)}")
                 print(traceback.format_exc())
         
+        location_rank = None
         if location and location.strip():
-            query = query.filter(CaregiverListing.location == location)
+            query, location_rank = apply_location_filter(query, CaregiverListing.location, location.strip(),
+                                                         location_match, db.bind.dialect.name)
         
-        # Add search functionality if needed
+        # Full-text search, ranked by relevance on Postgres
+        rank = None
         if search and search.strip():
-            search_term = f"%{search.strip()}%"
-            query = query.filter(CaregiverListing.description.ilike(search_term))
+            query, rank = apply_search(query, CaregiverListing, search.strip(), db.bind.dialect.name)
             
         # Filter by availability status if provided
         if availability_status and availability_status.strip():
@@ -163,78 +194,68 @@ def get_caregiver_listings(
                         break
                 
                 if mapped_status:
-                    query = query.filter(CaregiverListing.availability_status == mapped_status)
+                    query = query.where(CaregiverListing.availability_status == mapped_status)
                 else:
                     print(f"Warning: Unable to map availability_status '{availability_status}' to a valid enum value")
             except Exception as e:
                 print(f"Error mapping availability_status: {str(e)}")
                 print(traceback.format_exc())
         
+        if min_rating is not None:
+            query = query.where(CaregiverListing.rating >= min_rating)
+        
         # Filter by user ID if is_mine=true
         if is_mine and is_mine.lower() == 'true':
-            query = query.filter(CaregiverListing.caregiver_id == user.id)
-        
-        # Get total count for pagination
-        total = query.count()
-        
-        # Get paginated results
-        listings = query.offset(skip).limit(limit).all()
-        
-        # Calculate total pages
-        pages = (total + limit - 1) // limit if limit > 0 else 1
-        
-        # Construct and return paginated response
-        return {
-            "items": listings,
-            "total": total,
-            "page": (skip // limit) + 1 if limit else 1,
-            "size": limit,
-            "pages": pages
-        }
+            query = query.where(CaregiverListing.caregiver_id == user.id)
+        
+        # Within radius_km of near, nearest first
+        distance = None
+        if near and near.strip():
+            query, distance = apply_proximity_filter(query, CaregiverListing, near, radius_km)
+        
+        # Get the page (offset or keyset) with total count and next cursor
+        order_by = [distance] if distance is not None else []
+        order_by += [r.desc() for r in (rank, location_rank) if r is not None]
+        return await paginate(db, query, CaregiverListing, skip, limit, cursor, include_total, count_mode,
+                              order_by=order_by or None, conditional=conditional, version=listing_version,
+                              cache=CAREGIVER_LISTINGS)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_caregiver_listings: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"An error occurred: {str(e)}")
 
 @router.get("/listings/{listing_id}", response_model=CaregiverListingResponse)
-def read_caregiver_listing(
+async def read_caregiver_listing(
     listing_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-        
-    listing = db.query(CaregiverListing).filter(
+    not_modified = await conditional.unchanged(db, listing_version_query(listing_id))
+    if not_modified:
+        return not_modified
+    listing = await db.scalar(select(CaregiverListing).options(*listing_load_options).where(
         CaregiverListing.id == listing_id
-    ).first()
+    ))
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Caregiver listing not found"
         )
+    conditional.tag(*listing_version(listing))
     return listing
 
 @router.patch("/listings/{listing_id}/status", response_model=CaregiverListingResponse)
-def update_caregiver_listing_status(
+async def update_caregiver_listing_status(
     listing_id: int,
     status: str = Query(..., description="New status: 'available', 'unavailable', 'busy', 'temporarily_unavailable', 'on_vacation', 'limited_availability', 'booked'"),
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """Update the availability status of a caregiver listing"""
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    listing = db.query(CaregiverListing).filter(CaregiverListing.id == listing_id).first()
+    listing = await db.scalar(select(CaregiverListing).where(CaregiverListing.id == listing_id))
     if not listing:
         raise HTTPException(status_code=404, detail="Caregiver listing not found")
     
@@ -260,30 +281,24 @@ def update_caregiver_listing_status(
         listing.updated_at = datetime.now()
         
         db.add(listing)
-        db.commit()
-        db.refresh(listing)
+        await db.commit()
+        await db.refresh(listing)
+        await db.refresh(listing, attribute_names=listing_relationships)
         
         return listing
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Error updating caregiver listing status: {str(e)}")
         print(traceback.format_exc())
         raise HTTPException(status_code=500, detail=f"Failed to update status: {str(e)}")
 
 # Request endpoints
 @router.post("/requests", response_model=CaregiverRequestResponse)
-def create_caregiver_request(
+async def create_caregiver_request(
     request: CaregiverRequestCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-        
     # Set created_at and updated_at explicitly
     current_time = datetime.now()
     
@@ -295,95 +310,69 @@ def create_caregiver_request(
     db_request.updated_at = current_time
     
     db.add(db_request)
-    db.commit()
-    db.refresh(db_request)
+    await db.commit()
+    await db.refresh(db_request)
     return db_request
 
 @router.get("/requests", response_model=PaginatedResponse[CaregiverRequestResponse])
-def read_caregiver_requests(
+async def read_caregiver_requests(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get all caregiver requests
     """
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    query = db.query(CaregiverRequest)
-    
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    requests = query.offset(skip).limit(limit).all()
+    query = select(CaregiverRequest)
     
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": requests,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, CaregiverRequest, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
 
 @router.get("/requests/{request_id}", response_model=CaregiverRequestResponse)
-def read_caregiver_request(
+async def read_caregiver_request(
     request_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
     """
     Get a specific caregiver request by ID
     """
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    request = db.query(CaregiverRequest).filter(CaregiverRequest.id == request_id).first()
+    not_modified = await conditional.unchanged(db, row_version(CaregiverRequest, request_id))
+    if not_modified:
+        return not_modified
+    request = await db.scalar(select(CaregiverRequest).where(CaregiverRequest.id == request_id))
     if not request:
         raise HTTPException(status_code=404, detail="Caregiver request not found")
+    conditional.tag(request.id, request.updated_at)
     return request
 
 # Response endpoints
 @router.post("/responses", response_model=CaregiverResponseResponse)
-def create_caregiver_response(
+async def create_caregiver_response(
     response: CaregiverResponseCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Verify listing and request exist
-    listing = db.query(CaregiverListing).filter(
+    listing = await db.scalar(select(CaregiverListing).where(
         CaregiverListing.id == response.listing_id
-    ).first()
+    ))
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Caregiver listing not found"
         )
     
-    request = db.query(CaregiverRequest).filter(
+    request = await db.scalar(select(CaregiverRequest).where(
         CaregiverRequest.id == response.request_id
-    ).first()
+    ))
     if not request:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -396,92 +385,66 @@ def create_caregiver_response(
         receiver_id=request.receiver_id
     )
     db.add(db_response)
-    db.commit()
-    db.refresh(db_response)
+    # Committed with the response; the outbox worker creates the notification
+    NotificationService(db).enqueue(
+        user_id=request.receiver_id,
+        type=NotificationType.CAREGIVER_REQUEST,
+        title="New response to your caregiver request",
+        message="A caregiver responded to your request",
+        link=f"/caregivers/requests/{request.id}"
+    )
+    await db.commit()
+    await db.refresh(db_response)
     return db_response
 
 @router.get("/responses", response_model=PaginatedResponse[CaregiverResponseResponse])
-def read_caregiver_responses(
+async def read_caregiver_responses(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    query = db.query(CaregiverResponse)
-    
-    # Fix for null updated_at values
-    current_time = datetime.now()
-    for response in query.all():
-        if not response.updated_at:
-            response.updated_at = current_time
-            db.add(response)
-    db.commit()
+    query = select(CaregiverResponse)
     
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    responses = query.offset(skip).limit(limit).all()
-    
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": responses,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, CaregiverResponse, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
 
 @router.get("/responses/{response_id}", response_model=CaregiverResponseResponse)
-def read_caregiver_response(
+async def read_caregiver_response(
     response_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-        
-    response = db.query(CaregiverResponse).filter(
+    not_modified = await conditional.unchanged(db, row_version(CaregiverResponse, response_id))
+    if not_modified:
+        return not_modified
+    response = await db.scalar(select(CaregiverResponse).where(
         CaregiverResponse.id == response_id
-    ).first()
+    ))
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Caregiver response not found"
         )
+    conditional.tag(response.id, response.updated_at)
     return response
 
 @router.put("/responses/{response_id}/status", response_model=CaregiverResponseResponse)
-def update_response_status(
+async def update_response_status(
     response_id: int,
     status: str,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-        
-    response = db.query(CaregiverResponse).filter(
+    response = await db.scalar(select(CaregiverResponse).where(
         CaregiverResponse.id == response_id
-    ).first()
+    ))
     if not response:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -489,28 +452,21 @@ def update_response_status(
         )
     
     response.status = status
-    db.commit()
-    db.refresh(response)
+    await db.commit()
+    await db.refresh(response)
     return response
 
 # Review endpoints
 @router.post("/reviews", response_model=CaregiverReviewResponse)
-def create_caregiver_review(
+async def create_caregiver_review(
     review: CaregiverReviewCreate,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     # Verify listing exists
-    listing = db.query(CaregiverListing).filter(
+    listing = await db.scalar(select(CaregiverListing).where(
         CaregiverListing.id == review.listing_id
-    ).first()
+    ))
     if not listing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -522,80 +478,57 @@ def create_caregiver_review(
         reviewer_id=user.id
     )
     db.add(db_review)
-    db.commit()
-    db.refresh(db_review)
     
-    # Update listing rating
-    listing_reviews = db.query(CaregiverReview).filter(
-        CaregiverReview.listing_id == listing.id
-    ).all()
-    if listing_reviews:
-        listing.rating = sum(r.rating for r in listing_reviews) / len(listing_reviews)
-        db.commit()
+    # Update listing rating aggregates in the same transaction; incrementing in SQL
+    # keeps concurrent reviews from overwriting each other
+    await db.execute(
+        update(CaregiverListing)
+        .where(CaregiverListing.id == listing.id)
+        .values(
+            rating_sum=CaregiverListing.rating_sum + review.rating,
+            review_count=CaregiverListing.review_count + 1,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    await db.refresh(db_review)
     
     return db_review
 
 @router.get("/reviews", response_model=PaginatedResponse[CaregiverReviewResponse])
-def read_caregiver_reviews(
+async def read_caregiver_reviews(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; takes precedence over skip"),
+    include_total: bool = Query(True, description="Set to false to skip counting the matching rows"),
+    count_mode: str = Query("cached", description="How to count: 'exact', 'cached' (reused for a few seconds until the next write) or 'estimate' (planner estimate, unfiltered lists only)"),
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    query = db.query(CaregiverReview)
+    query = select(CaregiverReview)
     
-    # Fix for null updated_at values
-    current_time = datetime.now()
-    for review in query.all():
-        if not review.updated_at:
-            review.updated_at = current_time
-            db.add(review)
-    db.commit()
-    
-    # Get total count for pagination
-    total = query.count()
-    
-    # Get paginated results
-    reviews = query.offset(skip).limit(limit).all()
-    
-    # Calculate total pages
-    pages = (total + limit - 1) // limit if limit > 0 else 1
-    
-    # Construct and return paginated response
-    return {
-        "items": reviews,
-        "total": total,
-        "page": (skip // limit) + 1,
-        "size": limit,
-        "pages": pages
-    }
+    # Get the page (offset or keyset) with total count and next cursor
+    return await paginate(db, query, CaregiverReview, skip, limit, cursor, include_total, count_mode,
+                          conditional=conditional)
 
 @router.get("/reviews/{review_id}", response_model=CaregiverReviewResponse)
-def read_caregiver_review(
+async def read_caregiver_review(
     review_id: int,
-    db: Session = Depends(get_db),
-    email: str = Header(None, alias="X-User-Email")
+    conditional: ConditionalGet = Depends(conditional_get),
+    db: AsyncSession = Depends(get_async_db),
+    user: CurrentUser = Depends(get_current_user)
 ):
-    if not email:
-        raise HTTPException(status_code=401, detail="Authentication required")
-        
-    user = db.query(User).filter(User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    review = db.query(CaregiverReview).filter(
+    not_modified = await conditional.unchanged(db, row_version(CaregiverReview, review_id))
+    if not_modified:
+        return not_modified
+    review = await db.scalar(select(CaregiverReview).where(
         CaregiverReview.id == review_id
-    ).first()
+    ))
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Caregiver review not found"
         )
+    conditional.tag(review.id, review.updated_at)
     return review 
\ No newline at end of file
@@ -1,45 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response, Header
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from app.core.auth import get_current_user
-from app.db.session import get_db
+from app.core.config import settings
+from app.db.session import get_async_db
 from app.models.user import User
 from app.models.notification import Notification, NotificationType, NotificationPreference
 from app.schemas.notification import (
     NotificationResponse,
+    UnreadCountResponse,
     NotificationPreferenceResponse,
     NotificationPreferenceUpdate
 )
 from app.services.notification import NotificationService
+from app.core.pagination import encode_cursor
+from app.services.notification_broker import notification_broker, CLOSE, RESYNC
 
 router = APIRouter()
 
 @router.get("/", response_model=List[NotificationResponse])
-def read_notifications(
+async def read_notifications(
+    response: Response,
     skip: int = 0,
     limit: int = 50,
     unread_only: bool = False,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's X-Next-Cursor header; takes precedence over skip"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user notifications"""
     notification_service = NotificationService(db)
-    return notification_service.get_user_notifications(
+    notifications = await notification_service.get_user_notifications(
         user_id=current_user.id,
         skip=skip,
         limit=limit,
-        unread_only=unread_only
+        unread_only=unread_only,
+        cursor=cursor
     )
+    # A full page may have more behind it; hand out the keyset cursor for the next one
+    if limit > 0 and len(notifications) == limit:
+        last = notifications[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return notifications
+
+@router.get("/unread-count", response_model=UnreadCountResponse)
+async def read_unread_count(
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Number of unread notifications, for the badge; a single primary key lookup"""
+    notification_service = NotificationService(db)
+    return {"unread_count": await notification_service.get_unread_count(current_user.id)}
+
+def _sse(event: str, data, id: Optional[int] = None) -> str:
+    """One server-sent event frame"""
+    frame = f"id: {id}\n" if id is not None else ""
+    return frame + f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.get("/stream")
+async def stream_notifications(
+    last_event_id: Optional[int] = Header(None, description="Id of the last notification received; newer ones are replayed first (sent automatically by EventSource on reconnect)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Server-sent events: a `notification` event for each new notification, as it
+    is created. A `resync` event means some were missed (the client fell too far
+    behind, or too many arrived while it was away) and it should refetch
+    GET /notifications/. Comment lines are sent as heartbeats while idle.
+    """
+    # Subscribe before reading the backfill so nothing created in between is lost
+    subscription = notification_broker.subscribe(current_user.id)
+    try:
+        missed = []
+        if last_event_id is not None:
+            missed = await NotificationService(db).get_notifications_after(
+                current_user.id, last_event_id, settings.NOTIFICATION_STREAM_BACKFILL_LIMIT + 1
+            )
+    except BaseException:
+        notification_broker.unsubscribe(subscription)
+        raise
+    finally:
+        # An idle stream must not hold a pooled database connection
+        await db.close()
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            sent = set()
+            if len(missed) > settings.NOTIFICATION_STREAM_BACKFILL_LIMIT:
+                yield _sse("resync", {"reason": "backfill_limit"})
+            else:
+                for notification in missed:
+                    sent.add(notification.id)
+                    yield _sse("notification", NotificationResponse.model_validate(notification).model_dump(mode="json"), notification.id)
+            while True:
+                # Once a client that fell behind has caught up, tell it to refetch what it missed
+                if subscription.overflowed and subscription.queue.empty():
+                    subscription.overflowed = False
+                    sent.clear()
+                    yield _sse("resync", {"reason": "missed_events"})
+                try:
+                    item = await asyncio.wait_for(subscription.queue.get(), settings.NOTIFICATION_STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                if item is CLOSE:
+                    return
+                if item is RESYNC:
+                    subscription.overflowed = True
+                elif item["id"] not in sent:
+                    yield _sse("notification", {**item, "user_id": current_user.id}, item["id"])
+        finally:
+            notification_broker.unsubscribe(subscription)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        # Don't let a reverse proxy buffer the stream
+        "X-Accel-Buffering": "no",
+    })
 
 @router.put("/{notification_id}/read", response_model=NotificationResponse)
-def mark_notification_read(
+async def mark_notification_read(
     notification_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark a notification as read"""
     notification_service = NotificationService(db)
-    notification = notification_service.mark_as_read(notification_id, current_user.id)
+    notification = await notification_service.mark_as_read(notification_id, current_user.id)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -48,33 +140,33 @@ def mark_notification_read(
     return notification
 
 @router.put("/read-all", status_code=status.HTTP_204_NO_CONTENT)
-def mark_all_notifications_read(
+async def mark_all_notifications_read(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Mark all notifications as read"""
     notification_service = NotificationService(db)
-    notification_service.mark_all_as_read(current_user.id)
+    await notification_service.mark_all_as_read(current_user.id)
     return None
 
 @router.get("/preferences", response_model=NotificationPreferenceResponse)
-def read_notification_preferences(
+async def read_notification_preferences(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get user notification preferences"""
     notification_service = NotificationService(db)
-    return notification_service.get_notification_preferences(current_user.id)
+    return await notification_service.get_notification_preferences(current_user.id)
 
 @router.put("/preferences", response_model=NotificationPreferenceResponse)
-def update_notification_preferences(
+async def update_notification_preferences(
     preferences: NotificationPreferenceUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update user notification preferences"""
     notification_service = NotificationService(db)
-    return notification_service.update_notification_preferences(
+    return await notification_service.update_notification_preferences(
         user_id=current_user.id,
         email_notifications=preferences.email_notifications,
         push_notifications=preferences.push_notifications,
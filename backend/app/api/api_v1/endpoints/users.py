@@ -1,7 +1,10 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Request, Body
+from fastapi import APIRouter, HTTPException, status, Depends, Body
 from sqlalchemy.orm import Session
 from app.db.session import get_db
 from app.models.user import User
+from app.core.auth import CurrentUser, user_cache, get_current_user as require_user
+from app.core.passwords import password_hasher
+from app.core.security import revoke_user_tokens
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
 from datetime import datetime
 from typing import Dict, Any
@@ -28,7 +31,7 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
         username=user.username,
         full_name=user.full_name,
         phone_number=user.phone_number,
-        hashed_password=User.get_password_hash(user.password)
+        hashed_password=password_hasher.hash_sync(user.password)
     )
     db.add(db_user)
     db.commit()
@@ -36,16 +39,9 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 @router.get("/me", response_model=UserResponse)
-def get_current_user(request: Request, db: Session = Depends(get_db)):
+def get_current_user(current_user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     """Get current user profile"""
-    user_email = request.headers.get("X-User-Email")
-    if not user_email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-    
-    user = db.query(User).filter(User.email == user_email).first()
+    user = db.get(User, current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -54,16 +50,9 @@ def get_current_user(request: Request, db: Session = Depends(get_db)):
     return user
 
 @router.put("/me", response_model=UserResponse)
-def update_user_info(user_data: UserUpdate, request: Request, db: Session = Depends(get_db)):
+def update_user_info(user_data: UserUpdate, current_user: CurrentUser = Depends(require_user), db: Session = Depends(get_db)):
     """Update user profile information"""
-    user_email = request.headers.get("X-User-Email")
-    if not user_email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-    
-    user = db.query(User).filter(User.email == user_email).first()
+    user = db.get(User, current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -80,6 +69,7 @@ def update_user_info(user_data: UserUpdate, request: Request, db: Session = Depe
     
     db.commit()
     db.refresh(user)
+    user_cache.invalidate(user.email)
     return user
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -96,31 +86,26 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 @router.post("/me/change-password", response_model=Dict[str, Any])
 def change_password(
     password_data: PasswordChangeRequest,
-    request: Request,
+    current_user: CurrentUser = Depends(require_user),
     db: Session = Depends(get_db)
 ):
     """Change user password"""
-    user_email = request.headers.get("X-User-Email")
-    if not user_email:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
-        )
-    
-    user = db.query(User).filter(User.email == user_email).first()
+    user = db.get(User, current_user.id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    if not user.verify_password(password_data.current_password):
+    if not password_hasher.verify_sync(password_data.current_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect current password"
         )
     
-    user.hashed_password = User.get_password_hash(password_data.new_password)
+    user.hashed_password = password_hasher.hash_sync(password_data.new_password)
+    revoke_user_tokens(user)
     db.commit()
+    user_cache.invalidate(user.email)
     
     return {"message": "Password changed successfully"} 
\ No newline at end of file
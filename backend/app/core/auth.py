@@ -1,20 +1,155 @@
-from fastapi import Header, HTTPException, status, Depends
-from sqlalchemy.orm import Session
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from fastapi import Header, HTTPException, Request, status, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.db.session import get_db
+from app.core.config import settings
+from app.core.security import ACCESS_TOKEN, TokenError, decode_token
+from app.db.session import get_async_db
 from app.models.user import User
 
-def get_current_user(x_user_email: Optional[str] = Header(None, alias="X-User-Email"), db: Session = Depends(get_db)) -> User:
-    """Basic authentication using email header"""
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """The identity of the authenticated user, enough for authorization checks"""
+    id: int
+    email: str
+    role: str
+    is_deleted: bool = False
+
+    @property
+    def is_donor(self):
+        return self.role == 'donor' or self.role == 'admin'
+
+    @property
+    def is_recipient(self):
+        return self.role == 'recipient' or self.role == 'admin'
+
+    @property
+    def is_caregiver(self):
+        return self.role == 'caregiver' or self.role == 'admin'
+
+    @property
+    def is_admin(self):
+        return self.role == 'admin'
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        return cls(id=user.id, email=user.email, role=user.role, is_deleted=user.is_deleted)
+
+
+class IdentityCache:
+    """Bounded LRU of user identities by email, each entry valid for a TTL"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, CurrentUser]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, email: str) -> Optional[CurrentUser]:
+        with self._lock:
+            entry = self._entries.get(email)
+            if entry is None:
+                return None
+            expires_at, identity = entry
+            if expires_at < time.monotonic():
+                del self._entries[email]
+                return None
+            self._entries.move_to_end(email)
+            return identity
+
+    def set(self, identity: CurrentUser) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[identity.email] = (time.monotonic() + self.ttl, identity)
+            self._entries.move_to_end(identity.email)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, *emails: str) -> None:
+        with self._lock:
+            for email in emails:
+                self._entries.pop(email, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = IdentityCache(ttl=settings.USER_CACHE_TTL_SECONDS, max_entries=settings.USER_CACHE_MAX_ENTRIES)
+
+
+async def resolve_user(email: str, db: AsyncSession) -> Optional[CurrentUser]:
+    """Look up an identity by email, from the cache when possible"""
+    identity = user_cache.get(email)
+    if identity is None:
+        user = await db.scalar(select(User).where(User.email == email))
+        if not user:
+            return None
+        identity = CurrentUser.from_user(user)
+        user_cache.set(identity)
+    return identity
+
+
+def identity_from_token(token: str) -> CurrentUser:
+    """Build the identity from a signed access token, without touching the database"""
+    try:
+        claims = decode_token(token, ACCESS_TOKEN)
+    except TokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return CurrentUser(id=claims["sub"], email=claims["email"], role=claims["role"])
+
+
+async def get_current_user(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    x_user_email: Optional[str] = Header(None, alias="X-User-Email"),
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
+    """
+    Authenticate the request from a bearer access token issued by /auth/login,
+    falling back to the legacy X-User-Email header.
+    The identity is resolved once per request and kept on request.state.user.
+    """
+    identity = getattr(request.state, "user", None)
+    if identity is not None:
+        return identity
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        identity = identity_from_token(token)
+        request.state.user = identity
+        return identity
     if not x_user_email:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated"
+            detail="Authentication required"
         )
-    user = db.query(User).filter(User.email == x_user_email, User.deleted_at.is_(None)).first()
-    if not user:
+    identity = await resolve_user(x_user_email, db)
+    if not identity or identity.is_deleted:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
-    return user
+    request.state.user = identity
+    return identity
+
+
+async def get_current_user_optional(
+    request: Request,
+    authorization: Optional[str] = Header(None),
+    x_user_email: Optional[str] = Header(None, alias="X-User-Email"),
+    db: AsyncSession = Depends(get_async_db)
+) -> Optional[CurrentUser]:
+    try:
+        return await get_current_user(request, authorization, x_user_email, db)
+    except HTTPException:
+        return None
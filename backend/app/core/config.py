@@ -13,6 +13,92 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str
     POSTGRES_DB: str
     SQLALCHEMY_DATABASE_URI: str | None = None
+    SQLALCHEMY_ASYNC_DATABASE_URI: str | None = None
+
+    # Async engine pool settings
+    ASYNC_POOL_SIZE: int = 20
+    ASYNC_MAX_OVERFLOW: int = 20
+
+    # Pagination count cache
+    COUNT_CACHE_TTL_SECONDS: float = 10.0
+    COUNT_CACHE_MAX_ENTRIES: int = 1024
+
+    # Cached pages of the browse list endpoints. A route is cached for its entry in
+    # RESULT_CACHE_TTL_SECONDS (missing or 0: not cached); any committed write to a
+    # table the page reads retires it. In-process unless RESULT_CACHE_URL points at
+    # a Redis server (needs the redis package), which all workers then share.
+    RESULT_CACHE_TTL_SECONDS: dict[str, float] = {
+        "devices.listings": 30.0,
+        "caregivers.listings": 30.0,
+        "blood.requests": 15.0,
+        "blood.compatible": 15.0,
+    }
+    RESULT_CACHE_MAX_ENTRIES: int = 2048
+    RESULT_CACHE_URL: Optional[str] = None
+
+    # Signed session tokens. Required, and the same on every worker and across
+    # deploys, or tokens stop verifying; generate one with
+    # python -c "import secrets; print(secrets.token_urlsafe(32))"
+    SECRET_KEY: str
+    ACCESS_TOKEN_TTL_SECONDS: int = 15 * 60
+    REFRESH_TOKEN_TTL_SECONDS: int = 7 * 24 * 60 * 60
+
+    # Authenticated user identity cache
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    USER_CACHE_MAX_ENTRIES: int = 10000
+
+    # Password hashing pool. PASSWORD_HASH_ROUNDS pins the bcrypt cost (measure it with
+    # `manage.py calibrate-passwords`); when unset each process calibrates its own to
+    # the highest cost under PASSWORD_HASH_TARGET_MS. Logins rehash only hashes below
+    # PASSWORD_HASH_ROUNDS, or PASSWORD_HASH_MIN_ROUNDS when it is unset.
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_ROUNDS: Optional[int] = None
+    PASSWORD_HASH_TARGET_MS: float = 250.0
+    PASSWORD_HASH_MIN_ROUNDS: int = 10
+    PASSWORD_HASH_MAX_ROUNDS: int = 14
+
+    # Per-request SQL statement counting (X-DB-* response headers). A statement shape
+    # run QUERY_REPEAT_THRESHOLD times in one request is reported as a possible N+1.
+    # Off by default: the headers expose DB timings to every client. Enabled in
+    # development (.env.example), the tests and the endpoint benchmark.
+    QUERY_STATS_ENABLED: bool = False
+    QUERY_REPEAT_THRESHOLD: int = 5
+
+    # Notification stream (/notifications/stream). A client whose queue fills up is
+    # told to resync instead of buffering without bound; backfill on reconnect is
+    # capped the same way.
+    NOTIFICATION_STREAM_HEARTBEAT_SECONDS: float = 15.0
+    NOTIFICATION_STREAM_QUEUE_SIZE: int = 100
+    NOTIFICATION_STREAM_MAX_CONNECTIONS: int = 10000
+    NOTIFICATION_STREAM_BACKFILL_LIMIT: int = 100
+
+    # Notification outbox worker. Entries are delivered in batches, right after the
+    # commit that queued them in this process and otherwise every poll interval;
+    # an entry that fails NOTIFICATION_OUTBOX_MAX_ATTEMPTS times is left in place.
+    NOTIFICATION_OUTBOX_ENABLED: bool = True
+    NOTIFICATION_OUTBOX_BATCH_SIZE: int = 500
+    NOTIFICATION_OUTBOX_POLL_SECONDS: float = 1.0
+    NOTIFICATION_OUTBOX_MAX_ATTEMPTS: int = 5
+
+    # Monthly notification partitions (Postgres). Each app process checks every
+    # NOTIFICATION_PARTITION_CHECK_SECONDS that the coming months have partitions and,
+    # when NOTIFICATION_RETENTION_MONTHS is set, detaches or drops the months past it.
+    # `manage.py notifications-archive` does the same on demand.
+    NOTIFICATION_PARTITION_MONTHS_AHEAD: int = 3
+    NOTIFICATION_PARTITION_CHECK_SECONDS: float = 6 * 60 * 60
+    NOTIFICATION_RETENTION_MONTHS: Optional[int] = None
+    NOTIFICATION_RETENTION_ACTION: str = "detach"
+
+    # Frontend origin, used to build share links
+    FRONTEND_URL: str = "http://localhost:5173"
+
+    # Share short links (/s/{code}). Redirect targets are cached per process; clicks
+    # are counted in memory and written every SHARE_CLICK_FLUSH_SECONDS, so a crash
+    # loses at most that interval's clicks.
+    SHORT_LINK_BASE_URL: str = "http://localhost:8000"
+    SHORT_LINK_CACHE_MAX_ENTRIES: int = 100000
+    SHARE_CLICK_FLUSH_SECONDS: float = 5.0
 
     # CORS settings
     BACKEND_CORS_ORIGINS: List[str]
@@ -25,4 +111,10 @@ settings = Settings()
 
 # Set the database URI using environment variables
 if not settings.SQLALCHEMY_DATABASE_URI:
-    settings.SQLALCHEMY_DATABASE_URI = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
\ No newline at end of file
+    settings.SQLALCHEMY_DATABASE_URI = f"postgresql://{settings.POSTGRES_USER}:{settings.POSTGRES_PASSWORD}@{settings.POSTGRES_SERVER}:{settings.POSTGRES_PORT}/{settings.POSTGRES_DB}"
+
+# Derive the async driver URI from the sync one (psycopg2 -> asyncpg, pysqlite -> aiosqlite)
+if not settings.SQLALCHEMY_ASYNC_DATABASE_URI:
+    _scheme, _rest = settings.SQLALCHEMY_DATABASE_URI.split("://", 1)
+    _async_drivers = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI = f"{_async_drivers.get(_scheme.split('+')[0], _scheme)}://{_rest}"
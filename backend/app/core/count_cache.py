@@ -0,0 +1,116 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.core.config import settings
+
+
+class CountCache:
+    """
+    Short-lived cache of COUNT(*) results for list queries.
+
+    Entries are keyed by the compiled count statement and its bound parameters, so
+    every distinct filter set gets its own entry. Entries expire after a TTL and are
+    dropped as soon as a committed write touches one of the tables they count.
+    The cache is per process; with several workers each keeps its own.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, count, tables)
+        self._keys_by_table: dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(statement) -> tuple:
+        compiled = statement.compile()
+        params = tuple(sorted((name, repr(value)) for name, value in compiled.params.items()))
+        return str(compiled), params
+
+    def get(self, key) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, count, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            return count
+
+    def set(self, key, count: int, tables: set[str]) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, count, tables)
+            for table in tables:
+                self._keys_by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, table: str) -> None:
+        with self._lock:
+            for key in list(self._keys_by_table.pop(table, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+
+    def _remove(self, key) -> None:
+        _, _, tables = self._entries.pop(key)
+        for table in tables:
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+
+count_cache = CountCache(
+    ttl=settings.COUNT_CACHE_TTL_SECONDS,
+    max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+)
+
+
+# Called with each table a committed transaction wrote to; other caches of table
+# contents (see result_cache) add themselves here
+table_write_listeners: list[Callable[[str], None]] = [count_cache.invalidate]
+
+
+# Write invalidation: remember which tables a session flushed changes to, and drop
+# their cached counts once the transaction commits. Hooked on the sync Session class,
+# so it covers AsyncSession (which wraps one) as well as the sync routers.
+@event.listens_for(Session, "after_flush")
+def _collect_written_tables(session, flush_context):
+    tables = session.info.setdefault("count_cache_tables", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_tables(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None:
+            orm_execute_state.session.info.setdefault("count_cache_tables", set()).add(mapper.local_table.name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_written_tables(session):
+    for table in session.info.pop("count_cache_tables", ()):
+        for listener in table_write_listeners:
+            listener(table)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_written_tables(session):
+    session.info.pop("count_cache_tables", None)
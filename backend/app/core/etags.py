@@ -0,0 +1,67 @@
+import hashlib
+from typing import Any, Optional
+from fastapi import Header, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def make_etag(*parts: Any) -> str:
+    """A weak ETag over the values that version a response (ids and updated_at stamps)"""
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def row_version(model, id: int, *conditions):
+    """SELECT of the (id, updated_at) a row's ETag is made from, without loading the row"""
+    return select(model.id, model.updated_at).where(model.id == id, *conditions)
+
+
+class ConditionalGet:
+    """
+    If-None-Match handling for one GET. Detail endpoints first ask `unchanged`,
+    which reads only the version columns and answers 304 when the client's copy is
+    current; otherwise they load the row as usual and `tag` the response.
+    """
+
+    def __init__(self, response: Response, if_none_match: Optional[str]):
+        self.response = response
+        self.if_none_match = if_none_match
+
+    def matches(self, etag: str) -> bool:
+        if not self.if_none_match:
+            return False
+        if self.if_none_match.strip() == "*":
+            return True
+        # Weak comparison: W/ prefixes are ignored
+        return any(
+            candidate.strip().removeprefix("W/") == etag.removeprefix("W/")
+            for candidate in self.if_none_match.split(",")
+        )
+
+    def not_modified(self, etag: str) -> Optional[Response]:
+        """A 304 for etag if the client already has it, else None (and etag goes on the 200)"""
+        if self.matches(etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        self.response.headers["ETag"] = etag
+        return None
+
+    async def unchanged(self, db: AsyncSession, version_query) -> Optional[Response]:
+        """
+        A 304 if the client sent If-None-Match and the version row still matches it.
+        version_query selects the ETag parts, see row_version; no row means the
+        endpoint decides (404, 403) on its normal path.
+        """
+        if not self.if_none_match:
+            return None
+        row = (await db.execute(version_query)).first()
+        if row is None:
+            return None
+        etag = make_etag(*row)
+        return Response(status_code=304, headers={"ETag": etag}) if self.matches(etag) else None
+
+    def tag(self, *parts: Any) -> None:
+        self.response.headers["ETag"] = make_etag(*parts)
+
+
+def conditional_get(response: Response, if_none_match: Optional[str] = Header(None)) -> ConditionalGet:
+    return ConditionalGet(response, if_none_match)
@@ -0,0 +1,195 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select, func, tuple_, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.count_cache import count_cache
+from app.core.etags import ConditionalGet, make_etag
+from app.core.result_cache import CachedRoute, result_cache
+
+COUNT_MODES = ("exact", "cached", "estimate")
+
+
+def encode_cursor(created_at: Optional[datetime], id: int, rank: Optional[int] = None) -> str:
+    """Encode the sort key of the last row on a page as an opaque cursor"""
+    payload = [created_at.isoformat() if created_at else None, id]
+    if rank is not None:
+        payload.append(rank)
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, ranked: bool = False) -> tuple:
+    """Decode a cursor produced by encode_cursor: (created_at, id), plus the rank if ranked"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(values) != (3 if ranked else 2):
+            raise ValueError("wrong number of sort keys")
+        created_at, id = values[0], int(values[1])
+        created_at = datetime.fromisoformat(created_at) if created_at else None
+        return (created_at, id, int(values[2])) if ranked else (created_at, id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset_order(query, model, rank=None):
+    """
+    Apply the stable (created_at, id) newest-first order used by every list endpoint.
+    Legacy rows without created_at come first on every dialect; that is Postgres'
+    own DESC order, so its (created_at, id) indexes still serve the sort.
+    rank is a non-null column sorted ascending ahead of them, see paginate.
+    """
+    if rank is not None:
+        query = query.order_by(rank.asc())
+    return query.order_by(model.created_at.desc().nulls_first(), model.id.desc())
+
+
+def _after(model, created_at: Optional[datetime], id: int):
+    """Rows past (created_at, id) in the keyset order"""
+    if created_at is None:
+        # Past a NULL row: the rest of the NULL rows, then every dated one
+        return or_(and_(model.created_at.is_(None), model.id < id), model.created_at.is_not(None))
+    # Dated rows never lead back to NULL ones, which sort first
+    return tuple_(model.created_at, model.id) < tuple_(created_at, id)
+
+
+def keyset_filter(query, model, cursor: str, rank=None):
+    """Restrict a (created_at, id) ordered query, or a (rank, created_at, id) one, to the rows after the cursor"""
+    if rank is None:
+        return query.where(_after(model, *decode_cursor(cursor)))
+    created_at, id, rank_value = decode_cursor(cursor, ranked=True)
+    return query.where(or_(rank > rank_value, and_(rank == rank_value, _after(model, created_at, id))))
+
+
+async def count_rows(db: AsyncSession, query, model, count_mode: str = "cached") -> tuple[int, str]:
+    """
+    Count the rows matched by a list query.
+
+    Returns the count and where it came from: "exact" (a fresh COUNT), "cached"
+    (a recent COUNT for the same filters, dropped on writes to the table) or
+    "estimated" (the planner's row estimate, only for unfiltered Postgres queries).
+    """
+    if count_mode not in COUNT_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid count_mode. Must be one of {', '.join(COUNT_MODES)}")
+
+    table = model.__tablename__
+    if count_mode == "estimate" and query.whereclause is None and db.bind.dialect.name == "postgresql":
+        estimate = await db.scalar(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table"),
+            {"table": table},
+        )
+        # reltuples is -1 (or 0) until the table has been vacuumed/analyzed
+        if estimate and estimate > 0:
+            return int(estimate), "estimated"
+
+    count_query = select(func.count()).select_from(query.subquery())
+    key = None
+    if count_mode != "exact":
+        key = count_cache.make_key(count_query)
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, "cached"
+
+    total = await db.scalar(count_query)
+    if key is not None:
+        count_cache.set(key, total, {t.name for t in query.get_final_froms() if hasattr(t, "name")} | {table})
+    return total, "exact"
+
+
+async def paginate(
+    db: AsyncSession,
+    query,
+    model,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = True,
+    count_mode: str = "cached",
+    order_by: Optional[list] = None,
+    conditional: Optional[ConditionalGet] = None,
+    version: Callable[[Any], tuple] = lambda item: (item.id, item.updated_at),
+    cache: Optional[CachedRoute] = None,
+    rank=None,
+) -> Any:
+    """
+    Run a list query and build a PaginatedResponse payload.
+
+    With a cursor the page is fetched by keyset on (created_at, id), so deep pages
+    cost the same as the first one; otherwise the old skip/limit offset is used.
+    Either way the response carries next_cursor when there are more rows.
+    The total is only computed when include_total is set, see count_rows.
+    order_by puts other sort keys (e.g. search relevance) ahead of (created_at, id);
+    such pages can only be fetched by offset. rank is the exception: a stored,
+    non-null integer column sorted ascending ahead of (created_at, id), which
+    cursors cover as well (e.g. urgency), so an index can serve the whole order.
+    With conditional the page gets an ETag over its rows' version(item) and the
+    totals, and a client that already has the page gets a 304 instead of the body.
+    With cache the whole page comes from the result cache while none of the tables
+    it reads has been written to; count_mode 'exact' always reads the database.
+    """
+    if order_by and cursor:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not available for this ordering, use skip")
+
+    page_query = keyset_order(query.order_by(*order_by) if order_by else query, model, rank)
+    if cursor:
+        page_query = keyset_filter(page_query, model, cursor, rank)
+    else:
+        page_query = page_query.offset(skip)
+    # Fetch one extra row to know whether a next page exists
+    page_query = page_query.limit(limit + 1)
+
+    cache_key = None
+    if cache is not None and count_mode != "exact":
+        tables = {t.name for t in query.get_final_froms() if hasattr(t, "name")} | {model.__tablename__}
+        cache_key = await result_cache.make_key(cache, page_query, db.bind.dialect, tables, include_total, count_mode)
+    if cache_key is not None:
+        cached = await result_cache.get(cache, cache_key)
+        if cached is not None:
+            etag, cached_page = cached
+            if conditional is not None:
+                not_modified = conditional.not_modified(etag)
+                if not_modified is not None:
+                    return not_modified
+            return cached_page
+
+    total = pages = total_source = None
+    if include_total:
+        total, total_source = await count_rows(db, query, model, count_mode)
+        # Calculate total pages
+        pages = (total + limit - 1) // limit if limit > 0 else 1
+
+    items = list((await db.scalars(page_query)).all()) if limit > 0 else []
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        if not order_by:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, last.id, getattr(last, rank.key) if rank is not None else None)
+
+    page = (skip // limit) + 1 if limit > 0 else 1
+    result = {
+        "items": items,
+        "total": total,
+        "page": page,
+        "size": limit,
+        "pages": pages,
+        "total_source": total_source,
+        "next_cursor": next_cursor,
+    }
+    if conditional is None and cache_key is None:
+        return result
+
+    etag = make_etag(total, page, limit, next_cursor, *(version(item) for item in items))
+    if cache_key is not None:
+        await result_cache.set(cache, cache_key, etag, {
+            **result,
+            "items": [cache.schema.model_validate(item).model_dump(mode="json") for item in items],
+            "total_source": "cached" if total is not None else None,
+        })
+    if conditional is not None:
+        not_modified = conditional.not_modified(etag)
+        if not_modified is not None:
+            return not_modified
+    return result
@@ -0,0 +1,154 @@
+import asyncio
+import math
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.models.user import pwd_context
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool.
+
+    bcrypt is deliberately slow, so running it on the shared threadpool lets a burst
+    of logins starve every sync endpoint. Here at most `workers` hashes run at once
+    and at most `max_queue` more wait; anything beyond that is rejected with a 503
+    right away instead of queueing behind the burst.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.rounds: Optional[int] = None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._busy_seconds = 0.0
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.workers + self.max_queue:
+                self._rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many password operations in progress, please retry shortly",
+                    headers={"Retry-After": "1"},
+                )
+            self._pending += 1
+        return self._executor.submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+                self._completed += 1
+                self._busy_seconds += elapsed
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(pwd_context.hash, password))
+
+    async def verify(self, password: str, hashed_password: str) -> bool:
+        return await asyncio.wrap_future(self._submit(pwd_context.verify, password, hashed_password))
+
+    def hash_sync(self, password: str) -> str:
+        """Blocking variant for the sync routers; still bounded by the pool"""
+        return self._submit(pwd_context.hash, password).result()
+
+    def verify_sync(self, password: str, hashed_password: str) -> bool:
+        return self._submit(pwd_context.verify, password, hashed_password).result()
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """
+        Whether a stored hash is weaker than the configured cost. Only ever upgrades:
+        a hash at or above it is kept, so workers that calibrated to different
+        costs don't rewrite each other's hashes on every login.
+        """
+        rounds = stored_rounds(hashed_password)
+        if rounds is None:
+            return pwd_context.needs_update(hashed_password)
+        return rounds < (settings.PASSWORD_HASH_ROUNDS or settings.PASSWORD_HASH_MIN_ROUNDS)
+
+    def set_rounds(self, rounds: int) -> None:
+        pwd_context.update(bcrypt__rounds=rounds)
+        self.rounds = rounds
+
+    def calibrate(self, target_ms: float, min_rounds: int, max_rounds: int, samples: int = 5) -> int:
+        """
+        Pick the highest bcrypt cost whose hash time stays under target_ms on this
+        machine. Each extra round doubles the work, so timings at min_rounds are
+        enough to extrapolate; the median of `samples` keeps one slow run from
+        lowering the cost.
+        """
+        probe = pwd_context.copy(bcrypt__rounds=min_rounds)
+        probe.hash("calibration")  # warm up
+        timings = []
+        for _ in range(samples):
+            start = time.perf_counter()
+            probe.hash("calibration")
+            timings.append(time.perf_counter() - start)
+        elapsed_ms = max(statistics.median(timings) * 1000, 0.001)
+        extra = math.floor(math.log2(target_ms / elapsed_ms)) if target_ms > elapsed_ms else 0
+        rounds = max(min_rounds, min(max_rounds, min_rounds + extra))
+        self.set_rounds(rounds)
+        print(f"Password hashing calibrated to {rounds} rounds "
+              f"(~{elapsed_ms * 2 ** (rounds - min_rounds):.0f} ms, target {target_ms:.0f} ms)")
+        return rounds
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_ms": round(self._busy_seconds / self._completed * 1000, 2) if self._completed else None,
+                "rounds": self.rounds,
+            }
+
+
+def stored_rounds(hashed_password: str) -> Optional[int]:
+    """The cost of a bcrypt hash ($2b$12$...), or None for anything else"""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[1].startswith("2") or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+
+def configure_password_hashing() -> None:
+    """
+    Set the bcrypt cost at startup from PASSWORD_HASH_ROUNDS. Without it this
+    process calibrates its own cost for new hashes; `manage.py calibrate-passwords`
+    measures one value to pin for every worker instead.
+    """
+    if settings.PASSWORD_HASH_ROUNDS:
+        password_hasher.set_rounds(settings.PASSWORD_HASH_ROUNDS)
+    else:
+        password_hasher.calibrate(
+            settings.PASSWORD_HASH_TARGET_MS,
+            settings.PASSWORD_HASH_MIN_ROUNDS,
+            settings.PASSWORD_HASH_MAX_ROUNDS,
+        )
+        print("PASSWORD_HASH_ROUNDS is not set; run `python manage.py calibrate-passwords` "
+              "and set it so all workers hash with the same cost")
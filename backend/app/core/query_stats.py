@@ -0,0 +1,135 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+
+
+class QueryStats:
+    """Statements executed while handling one request (or inside query_budget)"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        # Parameters are bound separately, so the SQL text already is the statement shape
+        self.shapes[re.sub(r"\s+", " ", statement).strip()] += 1
+
+    def repeated(self, threshold: Optional[int] = None) -> dict[str, int]:
+        """Statement shapes run at least `threshold` times, the usual sign of an N+1"""
+        threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    def headers(self) -> dict[str, str]:
+        return {
+            "X-DB-Query-Count": str(self.count),
+            "X-DB-Time-Ms": f"{self.duration * 1000:.2f}",
+            "X-DB-Repeated-Queries": str(len(self.repeated())),
+        }
+
+
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_budgets: list[QueryStats] = []
+
+
+def start_request_stats() -> QueryStats:
+    stats = QueryStats()
+    _request_stats.set(stats)
+    return stats
+
+
+# Hooked on the Engine class so it covers the sync engine and the async engine's
+# underlying sync engine. AsyncSession runs its statements in a greenlet that shares
+# the request's context, so the context variable resolves there too.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_statement(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for budget in _budgets:
+        budget.record(statement, duration)
+
+
+def report_repeated(stats: QueryStats, label: str) -> None:
+    for shape, n in stats.repeated().items():
+        print(f"Possible N+1 in {label}: {n}x {shape[:200]}")
+
+
+class QueryStatsMiddleware:
+    """
+    Report the SQL statements each request ran as X-DB-* response headers.
+    Plain ASGI rather than BaseHTTPMiddleware, which would add a task group and
+    body stream to every request, including each long-lived notification stream.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = start_request_stats()
+
+        async def send_with_stats(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(stats.headers())
+            await send(message)
+
+        await self.app(scope, receive, send_with_stats)
+        report_repeated(stats, f"{scope['method']} {scope['path']}")
+
+
+@contextmanager
+def query_budget(max_queries: int, allow_repeated: bool = False) -> Iterator[QueryStats]:
+    """
+    Assert that the code inside the block runs at most `max_queries` statements and,
+    unless allow_repeated is set, no statement shape QUERY_REPEAT_THRESHOLD times or more.
+    Counts every statement on any engine in the process, so it also sees requests
+    made through TestClient, which run in another thread:
+
+        with query_budget(3):
+            client.get("/api/v1/caregivers/listings", headers=headers)
+    """
+    stats = QueryStats()
+    _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        _budgets.remove(stats)
+    assert_within_budget(stats, max_queries, allow_repeated)
+
+
+def assert_query_budget(response, max_queries: int, allow_repeated: bool = False) -> None:
+    """Check a query budget from the X-DB-* headers of a test client response"""
+    count = int(response.headers["X-DB-Query-Count"])
+    repeated = int(response.headers["X-DB-Repeated-Queries"])
+    assert count <= max_queries, (
+        f"{response.request.method} {response.request.url.path} ran {count} queries, budget is {max_queries}"
+    )
+    assert allow_repeated or not repeated, (
+        f"{response.request.method} {response.request.url.path} repeated {repeated} statement shape(s), likely an N+1"
+    )
+
+
+def assert_within_budget(stats: QueryStats, max_queries: int, allow_repeated: bool = False) -> None:
+    statements = "\n".join(f"  {n}x {shape[:200]}" for shape, n in stats.shapes.most_common())
+    assert stats.count <= max_queries, f"Ran {stats.count} queries, budget is {max_queries}:\n{statements}"
+    repeated = stats.repeated()
+    assert allow_repeated or not repeated, f"Repeated statement shapes, likely an N+1:\n{statements}"
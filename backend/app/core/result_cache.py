@@ -0,0 +1,219 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+from app.core.config import settings
+from app.core.count_cache import table_write_listeners
+
+# Cached pages of the read-heavy list endpoints. Each table has a version number
+# that every committed write to it bumps (through the count_cache session hooks);
+# a page is stored under its compiled query, paging options and the versions of
+# the tables it reads, so a write makes the old entries unreachable and they age
+# out of the LRU. Entries hold the serialized page, not ORM objects.
+#
+# The default backend is in-process: a worker only sees its own writes, so pages
+# can lag other workers' writes by up to the route's TTL. With RESULT_CACHE_URL
+# the entries and versions live in Redis and are shared by all workers; the commit
+# hook only notes the tables there, and the versions are bumped from the event loop
+# before the writing request's response goes out (see get_async_db).
+
+
+@dataclass(frozen=True)
+class CachedRoute:
+    """A list endpoint whose pages are cached: its TTL setting name, item schema and any tables beyond the query's"""
+    name: str
+    schema: Any
+    tables: tuple[str, ...] = ()
+
+    @property
+    def ttl(self) -> float:
+        return settings.RESULT_CACHE_TTL_SECONDS.get(self.name, 0.0)
+
+
+class MemoryBackend:
+    """LRU of page entries and a dict of table versions, for this process only"""
+
+    name = "memory"
+    # Versions are bumped in place, straight from the commit hook
+    remote = False
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def versions(self, tables: list[str]) -> tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(table, 0) for table in tables)
+
+    def bump(self, table: str) -> None:
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def stats(self) -> dict:
+        return {"entries": len(self._entries)}
+
+
+class RedisBackend:
+    """Entries and table versions in Redis, shared between workers. Needs the redis package."""
+
+    name = "redis"
+    remote = True
+
+    def __init__(self, url: str, prefix: str = "result-cache"):
+        import redis
+        import redis.asyncio
+
+        self.prefix = prefix
+        self._client = redis.asyncio.Redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._client.get(f"{self.prefix}:page:{key}")
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._client.set(f"{self.prefix}:page:{key}", json.dumps(value), px=int(ttl * 1000))
+
+    async def versions(self, tables: list[str]) -> tuple[int, ...]:
+        values = await self._client.mget([f"{self.prefix}:version:{table}" for table in tables])
+        return tuple(int(value or 0) for value in values)
+
+    async def bump(self, tables: list[str]) -> None:
+        async with self._client.pipeline(transaction=False) as pipe:
+            for table in tables:
+                pipe.incr(f"{self.prefix}:version:{table}")
+            await pipe.execute()
+
+    def stats(self) -> dict:
+        return {}
+
+
+class ResultCache:
+    """Page cache for CachedRoutes with hit/miss counts per route; backend errors count as misses"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._counts: dict[str, dict[str, int]] = {}
+        self.errors = 0
+        # Tables written since the last flush, for a remote backend
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._flushing: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def make_key(self, route: CachedRoute, statement, dialect, tables: set[str], *options) -> Optional[str]:
+        """The key of a page of route, or None when the route isn't cached"""
+        if route.ttl <= 0:
+            return None
+        self._loop = asyncio.get_running_loop()
+        tables = sorted(tables | set(route.tables))
+        try:
+            versions = await self.backend.versions(tables)
+        except Exception as e:
+            self._error(e)
+            return None
+        compiled = statement.compile(dialect=dialect)
+        params = sorted((name, repr(value)) for name, value in compiled.params.items())
+        parts = (route.name, str(compiled), params, options, list(zip(tables, versions)))
+        return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+    async def get(self, route: CachedRoute, key: str) -> Optional[tuple[str, dict]]:
+        """(etag, page) stored under key"""
+        try:
+            entry = await self.backend.get(key)
+        except Exception as e:
+            self._error(e)
+            entry = None
+        self._count(route, "hits" if entry is not None else "misses")
+        return tuple(entry) if entry is not None else None
+
+    async def set(self, route: CachedRoute, key: str, etag: str, page: dict) -> None:
+        try:
+            await self.backend.set(key, [etag, page], route.ttl)
+        except Exception as e:
+            self._error(e)
+
+    def bump(self, table: str) -> None:
+        """Table write listener; runs in the commit hook, so a remote bump is only noted here"""
+        if not self.backend.remote:
+            self.backend.bump(table)
+            return
+        with self._lock:
+            self._pending.add(table)
+        # Commits of the sync routers happen on threadpool threads, with nobody to
+        # await the flush; hand it to the event loop
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._schedule_flush)
+
+    def _schedule_flush(self) -> None:
+        if self._flushing is None or self._flushing.done():
+            self._flushing = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """Bump the remote versions of the tables written since the last flush"""
+        self._loop = asyncio.get_running_loop()
+        if not self._pending and not self._flush_lock.locked():
+            return
+        # One at a time, so a caller also waits out bumps another flush has taken
+        async with self._flush_lock:
+            with self._lock:
+                tables, self._pending = self._pending, set()
+            if not tables:
+                return
+            try:
+                await self.backend.bump(sorted(tables))
+            except Exception as e:
+                self._error(e)
+                # Retried with the next flush; until then pages may be stale up to their TTL
+                with self._lock:
+                    self._pending |= tables
+
+    def _count(self, route: CachedRoute, outcome: str) -> None:
+        counts = self._counts.setdefault(route.name, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def _error(self, e: Exception) -> None:
+        self.errors += 1
+        print(f"Result cache error: {e}")
+
+    def stats(self) -> dict:
+        routes = {
+            name: {**counts, "hit_ratio": counts["hits"] / max(counts["hits"] + counts["misses"], 1)}
+            for name, counts in self._counts.items()
+        }
+        return {
+            "backend": self.backend.name, **self.backend.stats(), "errors": self.errors,
+            "pending_bumps": len(self._pending), "routes": routes,
+        }
+
+
+result_cache = ResultCache(
+    RedisBackend(settings.RESULT_CACHE_URL) if settings.RESULT_CACHE_URL
+    else MemoryBackend(max_entries=settings.RESULT_CACHE_MAX_ENTRIES)
+)
+table_write_listeners.append(result_cache.bump)
@@ -0,0 +1,98 @@
+import base64
+import hashlib
+import hmac
+import json
+import threading
+import time
+from typing import Any
+from app.core.config import settings
+
+ACCESS_TOKEN = "access"
+REFRESH_TOKEN = "refresh"
+
+
+class TokenError(ValueError):
+    """Raised when a token is malformed, has a bad signature, is expired or revoked"""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.new(settings.SECRET_KEY.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def create_token(claims: dict[str, Any], token_type: str, ttl_seconds: int) -> str:
+    """Create a signed `<payload>.<signature>` token carrying the given claims"""
+    now = int(time.time())
+    body = {**claims, "typ": token_type, "iat": now, "exp": now + ttl_seconds}
+    payload = _b64encode(json.dumps(body, separators=(",", ":")).encode())
+    return f"{payload}.{_sign(payload)}"
+
+
+def decode_token(token: str, token_type: str) -> dict[str, Any]:
+    """Verify a token's signature, type and expiry and return its claims"""
+    try:
+        payload, signature = token.split(".")
+    except ValueError:
+        raise TokenError("Malformed token")
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise TokenError("Invalid token signature")
+    try:
+        claims = json.loads(_b64decode(payload))
+    except ValueError:
+        raise TokenError("Malformed token")
+    if claims.get("typ") != token_type:
+        raise TokenError("Wrong token type")
+    if claims.get("exp", 0) < time.time():
+        raise TokenError("Token expired")
+    if claims.get("ver", 0) < token_revocations.current_version(claims.get("sub")):
+        raise TokenError("Token revoked")
+    return claims
+
+
+def create_token_pair(user) -> dict[str, Any]:
+    """Issue an access/refresh token pair for a user row"""
+    claims = {"sub": user.id, "email": user.email, "role": user.role, "ver": user.token_version or 0}
+    return {
+        "access_token": create_token(claims, ACCESS_TOKEN, settings.ACCESS_TOKEN_TTL_SECONDS),
+        "refresh_token": create_token(claims, REFRESH_TOKEN, settings.REFRESH_TOKEN_TTL_SECONDS),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_TTL_SECONDS,
+    }
+
+
+class TokenRevocations:
+    """
+    Latest token version per user seen by this process.
+
+    Bumping a user's token_version revokes their outstanding tokens: this process
+    rejects them immediately, other workers once the short-lived access token
+    expires, since refreshing checks the version stored in the database.
+    """
+
+    def __init__(self):
+        self._versions: dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def current_version(self, user_id) -> int:
+        return self._versions.get(user_id, 0)
+
+    def revoke(self, user_id: int, version: int) -> None:
+        with self._lock:
+            if version > self._versions.get(user_id, 0):
+                self._versions[user_id] = version
+
+
+token_revocations = TokenRevocations()
+
+
+def revoke_user_tokens(user) -> None:
+    """Bump the user's token version; the caller commits the change"""
+    user.token_version = (user.token_version or 0) + 1
+    token_revocations.revoke(user.id, user.token_version)
@@ -17,4 +17,4 @@ class Base(DeclarativeBase):
     # Common columns
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
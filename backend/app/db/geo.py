@@ -0,0 +1,83 @@
+import math
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import Float, Index, and_, func, or_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import GenericFunction
+
+# Proximity search without PostGIS. Rows carry optional latitude/longitude with a
+# composite B-tree index; a radius query first restricts to the bounding box around
+# the point (an index range scan) and then checks the exact haversine distance on
+# the few rows left.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.045
+
+
+class least(GenericFunction):
+    """LEAST(a, b); SQLite spells it as the scalar MIN(a, b)"""
+    type = Float()
+    inherit_cache = True
+
+
+@compiles(least, "sqlite")
+def _least_sqlite(element, compiler, **kw):
+    return f"min({compiler.process(element.clauses, **kw)})"
+
+
+def coordinates_index(table_name: str) -> Index:
+    return Index(f"ix_{table_name}_lat_lon", "latitude", "longitude")
+
+
+def parse_point(near: str) -> tuple[float, float]:
+    """Parse a 'lat,lon' query value"""
+    try:
+        lat, lon = (float(part) for part in near.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid near. Expected 'latitude,longitude'")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HTTPException(status_code=400, detail="Invalid near. Latitude must be within ±90 and longitude within ±180")
+    return lat, lon
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """(min_lat, max_lat, min_lon, max_lon) enclosing the circle; longitudes may wrap past ±180"""
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = math.cos(math.radians(lat))
+    # Near the poles the circle covers every longitude
+    dlon = 180.0 if cos_lat < 1e-6 else min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return max(lat - dlat, -90.0), min(lat + dlat, 90.0), lon - dlon, lon + dlon
+
+
+def haversine_km(lat_column, lon_column, lat: float, lon: float):
+    """SQL expression for the great-circle distance from (lat, lon) in km"""
+    dlat = func.radians(lat_column - lat) / 2
+    dlon = func.radians(lon_column - lon) / 2
+    a = func.pow(func.sin(dlat), 2) + math.cos(math.radians(lat)) * func.cos(func.radians(lat_column)) * func.pow(func.sin(dlon), 2)
+    return 2 * EARTH_RADIUS_KM * func.asin(func.sqrt(least(a, 1.0)))
+
+
+def apply_proximity_filter(query, model, near: str, radius_km: Optional[float]) -> tuple:
+    """
+    Restrict a query to rows within radius_km of the 'lat,lon' point `near`.
+
+    Returns the query and the distance expression to order by. Rows without
+    coordinates never match.
+    """
+    lat, lon = parse_point(near)
+    if radius_km is None or radius_km <= 0:
+        raise HTTPException(status_code=400, detail="radius_km must be a positive number")
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    if max_lon - min_lon >= 360:
+        lon_filter = model.longitude.is_not(None)
+    elif min_lon < -180:
+        lon_filter = or_(model.longitude >= min_lon + 360, model.longitude <= max_lon)
+    elif max_lon > 180:
+        lon_filter = or_(model.longitude >= min_lon, model.longitude <= max_lon - 360)
+    else:
+        lon_filter = model.longitude.between(min_lon, max_lon)
+
+    distance = haversine_km(model.latitude, model.longitude, lat, lon)
+    query = query.where(and_(model.latitude.between(min_lat, max_lat), lon_filter), distance <= radius_km)
+    return query, distance
@@ -0,0 +1,77 @@
+import re
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+# Monthly range partitions of the notifications table on Postgres (see migration
+# 7c2d4f8a1e65). Each month is its own table, notifications_yYYYYmMM, holding the
+# rows created in that month (UTC); detached months are renamed
+# notifications_archive_yYYYYmMM. Elsewhere notifications is a plain table and
+# these helpers report it as unpartitioned.
+
+PARENT = "notifications"
+_NAME = re.compile(r"^notifications_y(\d{4})m(\d{2})$")
+# pg_advisory_lock key serialising partition maintenance across workers
+LOCK_KEY = 0x6E6F7466
+
+
+def month_start(value: datetime) -> datetime:
+    """First instant (UTC) of the month holding value"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, n: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + n
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime, archived: bool = False) -> str:
+    return f"notifications_{'archive_' if archived else ''}y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return bool(connection.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:parent)"
+    ), {"parent": PARENT}).first())
+
+
+def list_partitions(connection: Connection) -> list[tuple[str, datetime]]:
+    """(name, month) of each attached monthly partition, oldest first"""
+    names = connection.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:parent)"
+    ), {"parent": PARENT}).scalars()
+    found = []
+    for name in names:
+        match = _NAME.match(name)
+        if match:
+            found.append((name, datetime(int(match[1]), int(match[2]), 1, tzinfo=timezone.utc)))
+    return sorted(found, key=lambda partition: partition[1])
+
+
+def create_partitions(connection: Connection, first: datetime, last: datetime) -> list[str]:
+    """Attach a partition for every month from first's to last's that lacks one; returns the new names"""
+    existing = {name for name, _ in list_partitions(connection)}
+    created = []
+    month, last = month_start(first), month_start(last)
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_partitions(connection: Connection, months_ahead: int, now: Optional[datetime] = None) -> list[str]:
+    """Partitions for this month and the next months_ahead, so inserts never lack one"""
+    current = month_start(now or datetime.now(timezone.utc))
+    return create_partitions(connection, current, add_months(current, months_ahead))
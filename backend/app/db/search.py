@@ -0,0 +1,122 @@
+from typing import Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import DDL, Index, String, Text, cast, event, func, or_
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.types import TypeDecorator
+from app.db.base_class import Base
+
+# Full-text search over listings. On Postgres each searchable table has a weighted
+# search_vector column kept up to date by a trigger and indexed with GIN; elsewhere
+# (SQLite in local runs) search falls back to case-insensitive LIKE per word.
+
+
+class TSVector(TypeDecorator):
+    """tsvector on Postgres, plain text on other databases"""
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(TSVECTOR())
+        return dialect.type_descriptor(Text())
+
+
+def search_document_sql(fields: Sequence[tuple[str, str]], row: str = "NEW") -> str:
+    """The weighted tsvector expression for (column, weight) pairs of a row"""
+    return " || ".join(
+        f"setweight(to_tsvector('english', replace(coalesce({row}.{column}::text, ''), '_', ' ')), '{weight}')"
+        for column, weight in fields
+    )
+
+
+def search_trigger_ddl(table_name: str, fields: Sequence[tuple[str, str]]) -> list[str]:
+    """Postgres DDL for the trigger that keeps table_name.search_vector in sync"""
+    columns = ", ".join(column for column, _ in fields)
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {table_name}_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector := {search_document_sql(fields)};
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+        """,
+        f"""
+        CREATE TRIGGER {table_name}_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF {columns} ON {table_name}
+        FOR EACH ROW EXECUTE FUNCTION {table_name}_search_vector_update()
+        """,
+    ]
+
+
+def install_search_trigger(table, fields: Sequence[tuple[str, str]]) -> None:
+    """Create the search trigger along with the table when it comes from create_all"""
+    for statement in search_trigger_ddl(table.name, fields):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def apply_search(query, model, search: str, dialect_name: str) -> tuple:
+    """
+    Restrict a listing query to rows matching `search`.
+
+    Returns the query and, on Postgres, the ts_rank expression to order by
+    (None on the LIKE fallback, which keeps the default newest-first order).
+    """
+    rank: Optional[object] = None
+    if dialect_name == "postgresql":
+        ts_query = func.websearch_to_tsquery("english", search)
+        query = query.where(model.search_vector.op("@@")(ts_query))
+        rank = func.ts_rank(model.search_vector, ts_query)
+    else:
+        for word in search.split():
+            query = query.where(or_(*(
+                cast(getattr(model, column), String).ilike(f"%{word}%")
+                for column, _ in model.search_fields
+            )))
+    return query, rank
+
+
+# Location matching. Locations are free text ("Mumbai", "Mumbai, MH"), so besides the
+# exact match there are prefix and fuzzy modes, both served by a pg_trgm GIN index
+# on Postgres.
+LOCATION_MATCH_MODES = ("exact", "prefix", "fuzzy")
+
+event.listen(Base.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+
+def trigram_index(table_name: str, column: str) -> Index:
+    """GIN trigram index for ILIKE and similarity matching on a text column"""
+    return Index(
+        f"ix_{table_name}_{column}_trgm",
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column: "gin_trgm_ops"},
+    )
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def apply_location_filter(query, column, location: str, mode: str, dialect_name: str) -> tuple:
+    """
+    Filter a query on a location column.
+
+    exact:  the stored location equals the given one
+    prefix: the stored location starts with it, case-insensitively
+    fuzzy:  the stored location contains a close match of it (word similarity on
+            Postgres, so "Mumbai" finds "Mumbai, MH" and "Mumbay"); substring elsewhere
+
+    Returns the query and, for fuzzy matching on Postgres, the similarity to order by.
+    """
+    if mode not in LOCATION_MATCH_MODES:
+        raise HTTPException(status_code=400, detail=f"Invalid location_match. Must be one of {', '.join(LOCATION_MATCH_MODES)}")
+
+    if mode == "exact":
+        return query.where(column == location), None
+    if mode == "prefix":
+        return query.where(column.ilike(f"{_escape_like(location)}%", escape="\\")), None
+    if dialect_name == "postgresql":
+        # column %> location: word_similarity(location, column) is above pg_trgm's threshold
+        return query.where(column.op("%>")(location)), func.word_similarity(location, column)
+    return query.where(column.ilike(f"%{_escape_like(location)}%", escape="\\")), None
@@ -0,0 +1,549 @@
+import bisect
+import csv
+import io
+import itertools
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Optional
+from sqlalchemy import insert, inspect, text
+from sqlalchemy.engine import Engine
+from app.core.passwords import password_hasher
+from app.db.base import Base
+from app.db.partitions import create_partitions, is_partitioned
+from app.models.assistive_device import AssistiveDeviceListing, AssistiveDeviceRequest, AssistiveDeviceResponse, DeviceReview
+from app.models.blood_donation import BloodDonationRequest, BloodDonationResponse, rank_of_urgency
+from app.models.caregiver import (
+    AvailabilityStatus, CaregiverListing, CaregiverRequest, CaregiverResponse, CaregiverReview, ExperienceLevel, ServiceType,
+)
+from app.models.notification import Notification, NotificationType
+from app.models.sharing import Share, ShareableType, SharingPlatform
+from app.models.user import User
+
+# Synthetic data at production scale, for `manage.py seed` and the benchmarks.
+# Rows are generated column-wise from a fixed random seed with Zipf-skewed owners,
+# locations and types (a few users, cities and categories account for most rows,
+# as in real traffic), and written with COPY on Postgres or one executemany per
+# batch elsewhere. Ids are assigned explicitly so foreign keys need no lookups.
+
+# Rows per table at scale 1
+VOLUMES = {
+    "users": 2000,
+    "blood_donation_requests": 50000,
+    "blood_donation_responses": 50000,
+    "assistive_device_listings": 50000,
+    "assistive_device_requests": 50000,
+    "assistive_device_responses": 20000,
+    "device_reviews": 20000,
+    "caregiver_listings": 50000,
+    "caregiver_requests": 20000,
+    "caregiver_responses": 10000,
+    "caregiver_reviews": 20000,
+    "notifications": 100000,
+    "shares": 20000,
+}
+
+# Every seeded user logs in with this password; user1@example.com is the admin
+SEED_PASSWORD = "password"
+
+# (city, latitude, longitude), most populous first so the Zipf rank matches reality
+CITIES = [
+    ("Mumbai", 19.08, 72.88), ("Delhi", 28.61, 77.21), ("Bengaluru", 12.97, 77.59), ("Hyderabad", 17.39, 78.49),
+    ("Ahmedabad", 23.02, 72.57), ("Chennai", 13.08, 80.27), ("Kolkata", 22.57, 88.36), ("Surat", 21.17, 72.83),
+    ("Pune", 18.52, 73.86), ("Jaipur", 26.91, 75.79), ("Lucknow", 26.85, 80.95), ("Kanpur", 26.45, 80.33),
+    ("Nagpur", 21.15, 79.09), ("Indore", 22.72, 75.86), ("Thane", 19.22, 72.98), ("Bhopal", 23.26, 77.41),
+    ("Visakhapatnam", 17.69, 83.22), ("Patna", 25.59, 85.14), ("Vadodara", 22.31, 73.18), ("Ludhiana", 30.90, 75.86),
+]
+# ABO/Rh frequencies, roughly those of the Indian population
+BLOOD_TYPES = {"O+": 37, "B+": 32, "A+": 22, "AB+": 7, "O-": 0.8, "B-": 0.6, "A-": 0.4, "AB-": 0.2}
+DEVICE_TYPES = ["mobility", "daily living", "hearing", "vision", "medical", "communication"]
+# Free-text vocabulary; each listing describes itself with a few of these words, so a
+# search term matches a few percent of rows, as real search terms do
+VOCAB = (
+    "wheelchair walker cane crutches rollator scooter hoist commode shower chair bed rail "
+    "hearing aid amplifier captioned phone braille display magnifier screen reader talking clock "
+    "oxygen concentrator nebulizer glucose monitor blood pressure cuff pulse oximeter "
+    "portable folding lightweight electric manual adjustable rechargeable pediatric bariatric "
+    "new used refurbished barely gently lightly serviced spare clean complete boxed "
+    "pickup delivery nearby weekends evenings urgent free donated loan "
+    "night nurse elderly companion physiotherapy dementia stroke recovery palliative respite "
+    "cooking cleaning errands bathing dressing medication reminders mobility support"
+).split()
+# created_at values cover the SPAN_SECONDS up to the moment of seeding, so the
+# newest rows are recent and none lie in the future
+SPAN_SECONDS = 3 * 365 * 86400
+
+
+class Zipf:
+    """Draws 1-based ranks from 1..n with P(k) proportional to 1 / k**s"""
+
+    def __init__(self, n: int, rng: random.Random, s: float = 1.1):
+        self.n = n
+        self.rng = rng
+        self.cum_weights = list(itertools.accumulate(1 / k ** s for k in range(1, n + 1)))
+
+    def sample(self, k: int) -> list[int]:
+        total = self.cum_weights[-1]
+        rand = self.rng.random
+        return [bisect.bisect(self.cum_weights, rand() * total, 0, self.n - 1) + 1 for _ in range(k)]
+
+    def choices(self, population: list, k: int) -> list:
+        return [population[rank - 1] for rank in self.sample(k)]
+
+
+def plan_counts(scale: float = 1.0, overrides: Optional[dict[str, int]] = None) -> dict[str, int]:
+    """Rows per table for a scale, with per-table overrides"""
+    counts = {table: max(int(n * scale), 10) for table, n in VOLUMES.items()}
+    for table, n in (overrides or {}).items():
+        if table not in counts:
+            raise ValueError(f"Unknown table '{table}'. Must be one of {', '.join(counts)}")
+        counts[table] = n
+    return counts
+
+
+class Generator:
+    """Column generators for each seeded table; each returns rows[start:stop]"""
+
+    def __init__(self, counts: dict[str, int], seed: int, end: datetime):
+        self.counts = counts
+        self.start = end - timedelta(seconds=SPAN_SECONDS)
+        self.rng = random.Random(seed)
+        self.users = Zipf(counts["users"], self.rng)
+        self.cities = Zipf(len(CITIES), self.rng)
+        self.device_types = Zipf(len(DEVICE_TYPES), self.rng)
+        self.service_types = Zipf(len(ServiceType), self.rng)
+        # A pool of descriptions keeps generation cheap while search terms stay selective
+        self.descriptions = [" ".join(self.rng.sample(VOCAB, 8)) for _ in range(5000)]
+        self.hashed_password = password_hasher.hash_sync(SEED_PASSWORD)
+
+    def times(self, table: str, start: int, stop: int) -> list[str]:
+        """created_at values spread over the three years up to end, increasing with the id"""
+        step = SPAN_SECONDS / self.counts[table]
+        # Already in the text form both COPY and SQLite store, so rows need no conversion.
+        # Microseconds always included: SQLite compares the text, and SQLAlchemy binds
+        # datetimes (e.g. keyset cursors) with them
+        return [f"{self.start + timedelta(seconds=int(i * step)):%Y-%m-%d %H:%M:%S.%f}" for i in range(start, stop)]
+
+    def owners(self, k: int) -> list[int]:
+        return self.users.sample(k)
+
+    def ids(self, table: str, k: int) -> list[int]:
+        n, randint = self.counts[table], self.rng.randint
+        return [randint(1, n) for _ in range(k)]
+
+    def places(self, k: int) -> tuple[list, list, list]:
+        uniform, randint = self.rng.uniform, self.rng.randint
+        cities = self.cities.choices(CITIES, k)
+        return (
+            [f"{name}, {randint(1, 40)}" for name, _, _ in cities],
+            # About a metre of precision, and much cheaper to write out than full floats
+            [round(lat + uniform(-0.3, 0.3), 5) for _, lat, _ in cities],
+            [round(lon + uniform(-0.3, 0.3), 5) for _, _, lon in cities],
+        )
+
+    def weighted(self, weights: dict, k: int) -> list:
+        return self.rng.choices(list(weights), list(weights.values()), k=k)
+
+    def users_table(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("users", start, stop)
+        roles = self.weighted({"donor": 45, "recipient": 45, "caregiver": 10}, k)
+        if start == 0:
+            roles[0] = "admin"
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "email": [f"user{i}@example.com" for i in range(start + 1, stop + 1)],
+            "username": [f"user{i}" for i in range(start + 1, stop + 1)],
+            "hashed_password": [self.hashed_password] * k,
+            "full_name": [f"User {i}" for i in range(start + 1, stop + 1)],
+            "role": roles,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def blood_donation_requests(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        location, latitude, longitude = self.places(k)
+        created = self.times("blood_donation_requests", start, stop)
+        urgency = self.weighted({"High": 20, "Medium": 50, "Low": 30}, k)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "blood_type": self.weighted(BLOOD_TYPES, k),
+            "location": location,
+            "latitude": latitude,
+            "longitude": longitude,
+            "urgency": urgency,
+            "urgency_rank": [rank_of_urgency(level) for level in urgency],
+            "contact_number": ["555-0100"] * k,
+            "user_id": self.owners(k),
+            "status": self.weighted({"available": 85, "reserved": 5, "expired": 7, "unavailable": 3}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def blood_donation_responses(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("blood_donation_responses", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "request_id": self.ids("blood_donation_requests", k),
+            "donor_id": self.owners(k),
+            "message": ["I can donate"] * k,
+            "status": self.weighted({"pending": 70, "accepted": 20, "rejected": 10}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def assistive_device_listings(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        location, latitude, longitude = self.places(k)
+        created = self.times("assistive_device_listings", start, stop)
+        sample = self.rng.sample
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "donor_id": self.owners(k),
+            "device_name": [" ".join(sample(VOCAB, 2)) for _ in range(k)],
+            "device_type": self.device_types.choices(DEVICE_TYPES, k),
+            "condition": self.weighted({"new": 10, "good": 60, "fair": 30}, k),
+            "description": self.rng.choices(self.descriptions, k=k),
+            "location": location,
+            "latitude": latitude,
+            "longitude": longitude,
+            "contact_info": ["555-0100"] * k,
+            "available": self.weighted({"available": 80, "reserved": 5, "taken": 10, "inactive": 5}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def assistive_device_requests(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("assistive_device_requests", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "listing_id": self.ids("assistive_device_listings", k),
+            "receiver_id": self.owners(k),
+            "message": ["I need this"] * k,
+            "status": self.weighted({"pending": 70, "accepted": 20, "rejected": 10}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def assistive_device_responses(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("assistive_device_responses", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "request_id": self.ids("assistive_device_requests", k),
+            "listing_id": self.ids("assistive_device_listings", k),
+            "donor_id": self.owners(k),
+            "message": ["It is yours"] * k,
+            "status": self.weighted({"pending": 60, "accepted": 30, "rejected": 10}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def device_reviews(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("device_reviews", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "listing_id": self.ids("assistive_device_listings", k),
+            "reviewer_id": self.owners(k),
+            "rating": self.weighted({5: 45, 4: 30, 3: 15, 2: 6, 1: 4}, k),
+            "comment": ["Works well"] * k,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def caregiver_listings(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        location, latitude, longitude = self.places(k)
+        created = self.times("caregiver_listings", start, stop)
+        randint = self.rng.randint
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "caregiver_id": self.owners(k),
+            "service_type": self.service_types.choices([s.name for s in ServiceType], k),
+            "experience_level": self.rng.choices([e.name for e in ExperienceLevel], k=k),
+            "description": self.rng.choices(self.descriptions, k=k),
+            "location": location,
+            "latitude": latitude,
+            "longitude": longitude,
+            "contact_info": ["555-0100"] * k,
+            "hourly_rate": [randint(5, 50) for _ in range(k)],
+            "availability_status": self.weighted({AvailabilityStatus.AVAILABLE.name: 80, AvailabilityStatus.BUSY.name: 10,
+                                                  AvailabilityStatus.UNAVAILABLE.name: 10}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def caregiver_requests(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        location, _, _ = self.places(k)
+        created = self.times("caregiver_requests", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "receiver_id": self.owners(k),
+            "listing_id": self.ids("caregiver_listings", k),
+            "service_type": self.service_types.choices([s.name for s in ServiceType], k),
+            "location": location,
+            "contact_info": ["555-0100"] * k,
+            "description": self.rng.choices(self.descriptions, k=k),
+            "status": self.weighted({"PENDING": 60, "ACCEPTED": 25, "REJECTED": 5, "COMPLETED": 10}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def caregiver_responses(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("caregiver_responses", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "caregiver_id": self.owners(k),
+            "receiver_id": self.owners(k),
+            "request_id": self.ids("caregiver_requests", k),
+            "status": self.weighted({"ACCEPTED": 80, "REJECTED": 20}, k),
+            "message": ["I can help"] * k,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def caregiver_reviews(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("caregiver_reviews", start, stop)
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "listing_id": self.ids("caregiver_listings", k),
+            "reviewer_id": self.owners(k),
+            "rating": self.weighted({5: 45, 4: 30, 3: 15, 2: 6, 1: 4}, k),
+            "comment": ["Very kind"] * k,
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def notifications(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("notifications", start, stop)
+        types = self.weighted({NotificationType.BLOOD_REQUEST.name: 40, NotificationType.DEVICE_REQUEST.name: 25,
+                               NotificationType.CAREGIVER_REQUEST.name: 15, NotificationType.DEVICE_REVIEW.name: 10,
+                               NotificationType.SHARE.name: 5, NotificationType.SYSTEM.name: 5}, k)
+        rand = self.rng.random
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "user_id": self.owners(k),
+            "type": types,
+            "title": [t.replace("_", " ").capitalize() for t in types],
+            "message": ["Something happened"] * k,
+            # Older notifications have mostly been read
+            "is_read": [rand() < 0.8 for _ in range(k)],
+            "created_at": created,
+            "updated_at": created,
+        }
+
+    def shares(self, start: int, stop: int) -> dict[str, list]:
+        k = stop - start
+        created = self.times("shares", start, stop)
+        shareable = {
+            ShareableType.BLOOD_REQUEST.name: "blood_donation_requests",
+            ShareableType.DEVICE_LISTING.name: "assistive_device_listings",
+            ShareableType.CAREGIVER_LISTING.name: "caregiver_listings",
+        }
+        types = self.weighted(dict.fromkeys(shareable, 1), k)
+        randint = self.rng.randint
+        return {
+            "id": list(range(start + 1, stop + 1)),
+            "user_id": self.owners(k),
+            "shareable_type": types,
+            "shareable_id": [randint(1, self.counts[shareable[t]]) for t in types],
+            "platform": self.weighted({SharingPlatform.WHATSAPP.name: 50, SharingPlatform.FACEBOOK.name: 20,
+                                       SharingPlatform.TWITTER.name: 10, SharingPlatform.EMAIL.name: 15,
+                                       SharingPlatform.LINKEDIN.name: 5}, k),
+            "created_at": created,
+            "updated_at": created,
+        }
+
+
+# Insert order respects foreign keys
+TABLES = [
+    (User, "users_table"),
+    (BloodDonationRequest, "blood_donation_requests"),
+    (BloodDonationResponse, "blood_donation_responses"),
+    (AssistiveDeviceListing, "assistive_device_listings"),
+    (AssistiveDeviceRequest, "assistive_device_requests"),
+    (AssistiveDeviceResponse, "assistive_device_responses"),
+    (DeviceReview, "device_reviews"),
+    (CaregiverListing, "caregiver_listings"),
+    (CaregiverRequest, "caregiver_requests"),
+    (CaregiverResponse, "caregiver_responses"),
+    (CaregiverReview, "caregiver_reviews"),
+    (Notification, "notifications"),
+    (Share, "shares"),
+]
+
+
+def _copy_rows(raw_connection, table: str, columns: list[str], rows: list[tuple]) -> None:
+    """Postgres: stream the batch as CSV through COPY FROM STDIN"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # csv writes None as an empty unquoted field, which COPY reads as NULL
+    writer.writerows(rows)
+    buffer.seek(0)
+    with raw_connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _sqlite_rows(raw_connection, table: str, columns: list[str], rows: list[tuple]) -> None:
+    """SQLite: one executemany on the DB-API connection, skipping SQLAlchemy's per-row work"""
+    placeholders = ", ".join("?" for _ in columns)
+    raw_connection.cursor().executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+        rows,
+    )
+
+
+def _drop_foreign_keys(connection, tables: list[str]) -> list[tuple[str, str, str]]:
+    """Postgres: drop the foreign keys of tables, returning (table, name, definition) to restore"""
+    constraints = connection.execute(
+        text(
+            "SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE contype = 'f' AND conrelid = ANY(CAST(:tables AS regclass[]))"
+        ),
+        {"tables": tables},
+    ).all()
+    for table, name, _ in constraints:
+        connection.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{name}"'))
+    return constraints
+
+
+def _batches(make: Callable[[int, int], dict[str, list]], count: int, batch_size: int) -> Iterator[tuple[list[str], list[tuple]]]:
+    for start in range(0, count, batch_size):
+        columns = make(start, min(start + batch_size, count))
+        yield list(columns), list(zip(*columns.values()))
+
+
+def existing_rows(engine: Engine) -> dict[str, int]:
+    """Row counts of the seeded tables that already hold data"""
+    present = set(inspect(engine).get_table_names())
+    found = {}
+    with engine.connect() as connection:
+        for model, _ in TABLES:
+            table = model.__tablename__
+            if table in present and connection.execute(text(f"SELECT 1 FROM {table} LIMIT 1")).first():
+                found[table] = connection.execute(text(f"SELECT count(*) FROM {table}")).scalar()
+    return found
+
+
+def truncate(engine: Engine) -> None:
+    """Empty every model table and restart its id sequence"""
+    tables = [t.name for t in Base.metadata.sorted_tables]
+    with engine.begin() as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"TRUNCATE {', '.join(tables)} RESTART IDENTITY CASCADE"))
+            return
+        for table in reversed(tables):
+            connection.execute(text(f"DELETE FROM {table}"))
+        if engine.dialect.name == "sqlite" and connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_sequence'")
+        ).first():
+            connection.execute(text("DELETE FROM sqlite_sequence"))
+
+
+def seed_database(
+    engine: Engine,
+    counts: dict[str, int],
+    seed: int = 42,
+    batch_size: int = 50000,
+    log: Optional[Callable[[str], None]] = None,
+    end: Optional[datetime] = None,
+) -> dict[str, float]:
+    """
+    Fill the (empty) tables with counts[table] generated rows each. Secondary
+    indexes (and on Postgres foreign keys) are dropped for the load and restored
+    at the end. Returns the seconds
+    spent per table. The same counts, seed and end (default: now, in UTC) always
+    produce the same data.
+    """
+    end = end or datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+    generator = Generator(counts, seed, end)
+    dialect = engine.dialect.name
+    timings = {}
+
+    # Building each index once after the load is far cheaper than updating it per row.
+    # Likewise, COPY checks foreign keys row by row, while adding them back afterwards
+    # validates each in a single pass.
+    indexes = [index for model, _ in TABLES for index in model.__table__.indexes]
+    foreign_keys = []
+    with engine.begin() as connection:
+        for index in indexes:
+            index.drop(connection, checkfirst=True)
+        if dialect == "postgresql":
+            foreign_keys = _drop_foreign_keys(connection, [model.__tablename__ for model, _ in TABLES])
+
+    if counts.get("notifications"):
+        with engine.begin() as connection:
+            if is_partitioned(connection):
+                # COPY needs a partition for every month the generated rows fall in
+                create_partitions(connection, generator.start, end)
+
+    raw_connection = engine.raw_connection()
+    try:
+        if dialect == "sqlite":
+            # A throwaway load: skip fsyncs, the journal is rebuilt on the next write
+            raw_connection.cursor().execute("PRAGMA synchronous = OFF")
+        for model, method in TABLES:
+            table = model.__tablename__
+            started = time.perf_counter()
+            for columns, rows in _batches(getattr(generator, method), counts[table], batch_size):
+                if dialect == "postgresql":
+                    _copy_rows(raw_connection, table, columns, rows)
+                elif dialect == "sqlite":
+                    _sqlite_rows(raw_connection, table, columns, rows)
+                else:
+                    with engine.begin() as connection:
+                        connection.execute(insert(model.__table__), [dict(zip(columns, row)) for row in rows])
+            raw_connection.commit()
+            timings[table] = time.perf_counter() - started
+            if log:
+                rate = counts[table] / timings[table] if timings[table] else 0
+                log(f"{table}: {counts[table]} rows in {timings[table]:.1f}s ({rate:,.0f} rows/s)")
+        if dialect == "sqlite":
+            raw_connection.cursor().execute("PRAGMA synchronous = FULL")
+    finally:
+        raw_connection.close()
+
+    with engine.begin() as connection:
+        if log:
+            log(f"Building {len(indexes)} indexes...")
+        for index in indexes:
+            index.create(connection)
+        for table, name, definition in foreign_keys:
+            connection.execute(text(f'ALTER TABLE {table} ADD CONSTRAINT "{name}" {definition}'))
+        # Ids were given explicitly, so move the sequences past them
+        if dialect == "postgresql":
+            for model, _ in TABLES:
+                table = model.__tablename__
+                connection.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 1) FROM {table}))"
+                ))
+        # Rating aggregates kept by create_caregiver_review
+        connection.execute(text(
+            "UPDATE caregiver_listings SET "
+            "rating_sum = (SELECT coalesce(sum(rating), 0) FROM caregiver_reviews WHERE listing_id = caregiver_listings.id), "
+            "review_count = (SELECT count(*) FROM caregiver_reviews WHERE listing_id = caregiver_listings.id) "
+            "WHERE id IN (SELECT listing_id FROM caregiver_reviews)"
+        ))
+        # Unread counters kept by NotificationService
+        connection.execute(text(
+            "INSERT INTO notification_counters (user_id, unread_count) "
+            "SELECT user_id, count(*) FROM notifications WHERE is_read = false GROUP BY user_id"
+        ))
+        # Share counters kept by SharingService.create_share
+        connection.execute(text(
+            "INSERT INTO share_counters (shareable_type, shareable_id, platform, count) "
+            "SELECT shareable_type, shareable_id, platform, count(*) FROM shares "
+            "GROUP BY shareable_type, shareable_id, platform"
+        ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        connection.execute(text("ANALYZE"))
+    return timings
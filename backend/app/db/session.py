@@ -1,16 +1,48 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from app.core.config import settings
+from app.core.result_cache import result_cache
 
+# Sync engine, used by manage.py, Alembic and the routers that are still sync
 engine = create_engine(
     settings.SQLALCHEMY_DATABASE_URI,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, used by the async routers so requests don't hold a threadpool thread
+# while waiting on the database
+_async_engine_kwargs = {}
+if not settings.SQLALCHEMY_ASYNC_DATABASE_URI.startswith("sqlite"):
+    _async_engine_kwargs = {
+        "pool_size": settings.ASYNC_POOL_SIZE,
+        "max_overflow": settings.ASYNC_MAX_OVERFLOW,
+        "pool_pre_ping": True,
+    }
+
+async_engine = create_async_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI,
+    **_async_engine_kwargs,
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+    # Runs before the response is sent, so the writer's next read already misses
+    # the pages its commit retired
+    await result_cache.flush()
@@ -1,11 +1,41 @@
-from fastapi import FastAPI
+from contextlib import AsyncExitStack, asynccontextmanager
+from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import RedirectResponse
 from app.api.api_v1.api import api_router
+from app.core.config import settings
+from app.core.passwords import configure_password_hashing, password_hasher
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.result_cache import result_cache
+from app.services.notification_broker import notification_broker
+from app.services.notification_outbox import outbox_worker
+from app.services.notification_archive import PartitionMaintenance
+from app.services.short_links import click_buffer, resolve_short_link
+from app.db.session import engine
+
+partition_maintenance = PartitionMaintenance(engine, settings.NOTIFICATION_PARTITION_CHECK_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the background services; on shutdown (or a failed start) stop them in reverse order"""
+    configure_password_hashing()
+    async with AsyncExitStack() as stack:
+        await notification_broker.start()
+        stack.push_async_callback(notification_broker.stop)
+        if settings.NOTIFICATION_OUTBOX_ENABLED:
+            await outbox_worker.start()
+            stack.push_async_callback(outbox_worker.stop)
+        await partition_maintenance.start()
+        stack.push_async_callback(partition_maintenance.stop)
+        await click_buffer.start()
+        stack.push_async_callback(click_buffer.stop)
+        yield
 
 app = FastAPI(
     title="Access Share API",
     description="API for Access Share platform",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -17,9 +47,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.QUERY_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# Share short links
+@app.get("/s/{code}")
+async def follow_short_link(code: str):
+    """Redirect a share's short link to the shared item, counting the click"""
+    target = await resolve_short_link(code)
+    if target is None:
+        raise HTTPException(status_code=404, detail="Link not found")
+    # Not cached by browsers, so every click reaches us and is counted
+    return RedirectResponse(target, status_code=302, headers={"Cache-Control": "no-store"})
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -41,4 +84,29 @@ async def health_check():
 @app.get("/api/v1/health")
 async def health_check_v1():
     """Health check endpoint for frontend connection testing (v1)"""
-    return {"status": "healthy", "message": "Backend API v1 is running"} 
\ No newline at end of file
+    return {"status": "healthy", "message": "Backend API v1 is running"}
+
+@app.get("/api/v1/health/password-hashing")
+async def password_hashing_stats():
+    """Queue depth and throughput of the password hashing pool"""
+    return password_hasher.stats() 
+
+@app.get("/api/v1/health/notification-stream")
+async def notification_stream_stats():
+    """Open notification streams and delivery counts for this worker"""
+    return notification_broker.stats()
+
+@app.get("/api/v1/health/notification-outbox")
+async def notification_outbox_stats():
+    """Outbox backlog and delivery lag of the notification worker"""
+    return await outbox_worker.stats()
+
+@app.get("/api/v1/health/share-clicks")
+async def share_click_stats():
+    """Buffered and flushed short link clicks for this worker"""
+    return click_buffer.stats()
+
+@app.get("/api/v1/health/result-cache")
+async def result_cache_stats():
+    """Hits and misses of the list result cache per route, for this worker"""
+    return result_cache.stats()
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Float, Enum, Index
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from app.db.base_class import Base
+from app.db.geo import coordinates_index
+from app.db.search import TSVector, install_search_trigger, trigram_index
 import enum
 
 class DeviceAvailabilityStatus(str, enum.Enum):
@@ -15,6 +17,24 @@ class DeviceAvailabilityStatus(str, enum.Enum):
 
 class AssistiveDeviceListing(Base):
     __tablename__ = "assistive_device_listings"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_assistive_device_listings_created_at_id", "created_at", "id"),
+        # Owner and filter columns, each with the keyset order so "my listings" and
+        # filtered pages are index range scans
+        Index("ix_assistive_device_listings_donor_id_created_at", "donor_id", "created_at", "id"),
+        Index("ix_assistive_device_listings_device_type_created_at", "device_type", "created_at", "id"),
+        Index("ix_assistive_device_listings_available_created_at", "available", "created_at", "id"),
+        # Prefix and fuzzy location matching, see app.db.search
+        trigram_index("assistive_device_listings", "location"),
+        # Proximity search, see app.db.geo
+        coordinates_index("assistive_device_listings"),
+        # Full-text search, see app.db.search
+        Index("ix_assistive_device_listings_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    # Columns (and tsvector weights) that make up the full-text search document
+    search_fields = (("device_name", "A"), ("device_type", "B"), ("description", "C"))
 
     id = Column(Integer, primary_key=True, index=True)
     donor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -23,10 +43,13 @@ class AssistiveDeviceListing(Base):
     condition = Column(String(50), nullable=False)
     description = Column(Text, nullable=False)
     location = Column(String(255), nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     contact_info = Column(String(100), nullable=False)
     available = Column(String(50), nullable=False, default="available")  # available, pending, reserved, on_hold, taken, maintenance, inactive
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVector, nullable=True))  # maintained by a trigger on Postgres
 
     # Relationships
     donor = relationship("User")
@@ -34,16 +57,22 @@ class AssistiveDeviceListing(Base):
     responses = relationship("AssistiveDeviceResponse", back_populates="listing")
     reviews = relationship("DeviceReview", back_populates="listing")
 
+install_search_trigger(AssistiveDeviceListing.__table__, AssistiveDeviceListing.search_fields)
+
 class AssistiveDeviceRequest(Base):
     __tablename__ = "assistive_device_requests"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_assistive_device_requests_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    listing_id = Column(Integer, ForeignKey("assistive_device_listings.id"), nullable=False)
-    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("assistive_device_listings.id"), nullable=False, index=True)
+    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     message = Column(Text, nullable=False)
     status = Column(String(20), nullable=False, default="pending")  # pending, accepted, rejected
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     receiver = relationship("User")
@@ -52,15 +81,19 @@ class AssistiveDeviceRequest(Base):
 
 class AssistiveDeviceResponse(Base):
     __tablename__ = "assistive_device_responses"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_assistive_device_responses_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(Integer, ForeignKey("assistive_device_requests.id"), nullable=False)
-    listing_id = Column(Integer, ForeignKey("assistive_device_listings.id"), nullable=False)
-    donor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    request_id = Column(Integer, ForeignKey("assistive_device_requests.id"), nullable=False, index=True)
+    listing_id = Column(Integer, ForeignKey("assistive_device_listings.id"), nullable=False, index=True)
+    donor_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     message = Column(Text, nullable=False)
     status = Column(String(20), nullable=False, default="pending")  # pending, accepted, rejected
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     donor = relationship("User")
@@ -69,14 +102,18 @@ class AssistiveDeviceResponse(Base):
 
 class DeviceReview(Base):
     __tablename__ = "device_reviews"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_device_reviews_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    listing_id = Column(Integer, ForeignKey("assistive_device_listings.id"), nullable=False)
-    reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("assistive_device_listings.id"), nullable=False, index=True)
+    reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     rating = Column(Float, nullable=False)
     comment = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     reviewer = relationship("User")
@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index, Float
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, validates
 from app.db.base_class import Base
+from app.db.geo import coordinates_index
+from app.db.search import trigram_index
 import enum
 
 class BloodDonationStatus(str, enum.Enum):
@@ -11,34 +13,80 @@ class BloodDonationStatus(str, enum.Enum):
     RESERVED = "reserved"
     EXPIRED = "expired"
 
+# Recipient blood types each donor type can give to (red cells, ABO and Rh)
+COMPATIBLE_RECIPIENTS = {
+    "O-": ["O-", "O+", "A-", "A+", "B-", "B+", "AB-", "AB+"],
+    "O+": ["O+", "A+", "B+", "AB+"],
+    "A-": ["A-", "A+", "AB-", "AB+"],
+    "A+": ["A+", "AB+"],
+    "B-": ["B-", "B+", "AB-", "AB+"],
+    "B+": ["B+", "AB+"],
+    "AB-": ["AB-", "AB+"],
+    "AB+": ["AB+"],
+}
+
+# Sort rank of the urgency levels, most urgent first
+URGENCY_RANK = {"High": 0, "Medium": 1, "Low": 2}
+
+def rank_of_urgency(urgency: str) -> int:
+    """Sort rank of an urgency level; unknown levels sort after Low"""
+    return URGENCY_RANK.get(urgency, len(URGENCY_RANK))
+
 class BloodDonationRequest(Base):
     __tablename__ = "blood_donation_requests"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_blood_donation_requests_created_at_id", "created_at", "id"),
+        # Owner and filter columns, each with the keyset order
+        Index("ix_blood_donation_requests_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_blood_donation_requests_blood_type_created_at", "blood_type", "created_at", "id"),
+        Index("ix_blood_donation_requests_status_created_at", "status", "created_at", "id"),
+        # Prefix and fuzzy location matching, see app.db.search
+        trigram_index("blood_donation_requests", "location"),
+        # Proximity search, see app.db.geo
+        coordinates_index("blood_donation_requests"),
+        # Compatible-request matching, see /blood-donation/requests/compatible
+        Index("ix_blood_donation_requests_matching", "status", "blood_type", "urgency_rank", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     blood_type = Column(String(3), nullable=False)  # A+, A-, B+, B-, AB+, AB-, O+, O-
     location = Column(String(255), nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     urgency = Column(String(10), nullable=False)  # High, Medium, Low
+    urgency_rank = Column(Integer, nullable=False)  # rank_of_urgency(urgency), kept in step by the validator below
     contact_number = Column(String(20), nullable=False)
     notes = Column(Text, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     status = Column(String(50), nullable=False, default="available")  # available, unavailable, pending_verification, reserved, expired
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User")
     responses = relationship("BloodDonationResponse", back_populates="request")
 
+    @validates("urgency")
+    def _set_urgency_rank(self, key, urgency):
+        self.urgency_rank = rank_of_urgency(urgency)
+        return urgency
+
 class BloodDonationResponse(Base):
     __tablename__ = "blood_donation_responses"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_blood_donation_responses_created_at_id", "created_at", "id"),
+        Index("ix_blood_donation_responses_donor_id_created_at", "donor_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    request_id = Column(Integer, ForeignKey("blood_donation_requests.id"), nullable=False)
+    request_id = Column(Integer, ForeignKey("blood_donation_requests.id"), nullable=False, index=True)
     donor_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     message = Column(Text, nullable=False)
     status = Column(String(20), nullable=False, default="pending")  # pending, accepted, rejected
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     donor = relationship("User")
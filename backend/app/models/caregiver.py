@@ -1,7 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Boolean, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Boolean, Float, Index, case, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.ext.hybrid import hybrid_property
 from app.db.base_class import Base
+from app.db.geo import coordinates_index
+from app.db.search import TSVector, install_search_trigger, trigram_index
 import enum
 
 class ServiceType(str, enum.Enum):
@@ -42,6 +45,23 @@ class ResponseStatus(str, enum.Enum):
 
 class CaregiverListing(Base):
     __tablename__ = "caregiver_listings"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_caregiver_listings_created_at_id", "created_at", "id"),
+        # Owner and filter columns, each with the keyset order
+        Index("ix_caregiver_listings_caregiver_id_created_at", "caregiver_id", "created_at", "id"),
+        Index("ix_caregiver_listings_service_type_created_at", "service_type", "created_at", "id"),
+        Index("ix_caregiver_listings_availability_status_created_at", "availability_status", "created_at", "id"),
+        # Prefix and fuzzy location matching, see app.db.search
+        trigram_index("caregiver_listings", "location"),
+        # Proximity search, see app.db.geo
+        coordinates_index("caregiver_listings"),
+        # Full-text search, see app.db.search
+        Index("ix_caregiver_listings_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
+    # Columns (and tsvector weights) that make up the full-text search document
+    search_fields = (("service_type", "A"), ("description", "B"))
 
     id = Column(Integer, primary_key=True, index=True)
     caregiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -49,42 +69,54 @@ class CaregiverListing(Base):
     experience_level = Column(Enum(ExperienceLevel), nullable=False)
     description = Column(Text, nullable=False)
     location = Column(String, nullable=False)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
     contact_info = Column(String, nullable=False)
     hourly_rate = Column(Float, nullable=False)
     availability_status = Column(Enum(AvailabilityStatus), nullable=False, default=AvailabilityStatus.AVAILABLE)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    search_vector = deferred(Column(TSVector, nullable=True))  # maintained by a trigger on Postgres
+
+    # Review aggregates, incremented in the same transaction as each review insert
+    rating_sum = Column(Float, server_default=text("0"), nullable=False)
+    review_count = Column(Integer, server_default=text("0"), nullable=False)
 
     # Relationships
     caregiver = relationship("User")
     requests = relationship("CaregiverRequest", back_populates="listing")
     reviews = relationship("CaregiverReview", back_populates="listing")
 
-    @property
+    @hybrid_property
     def rating(self):
-        """Calculate average rating from reviews"""
-        if not self.reviews:
+        """Average rating from the stored review aggregates"""
+        if not self.review_count:
             return None
-        return sum(review.rating for review in self.reviews) / len(self.reviews)
+        return self.rating_sum / self.review_count
+
+    @rating.expression
+    def rating(cls):
+        return case((cls.review_count > 0, cls.rating_sum / cls.review_count), else_=None)
 
-    @property
-    def review_count(self):
-        """Get total number of reviews"""
-        return len(self.reviews)
+install_search_trigger(CaregiverListing.__table__, CaregiverListing.search_fields)
 
 class CaregiverRequest(Base):
     __tablename__ = "caregiver_requests"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_caregiver_requests_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    listing_id = Column(Integer, ForeignKey("caregiver_listings.id"), nullable=False)
+    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    listing_id = Column(Integer, ForeignKey("caregiver_listings.id"), nullable=False, index=True)
     service_type = Column(Enum(ServiceType), nullable=False)
     location = Column(String, nullable=False)
     contact_info = Column(String, nullable=False)
     description = Column(Text, nullable=False)
     status = Column(Enum(RequestStatus), nullable=False, default=RequestStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     receiver = relationship("User")
@@ -93,15 +125,19 @@ class CaregiverRequest(Base):
 
 class CaregiverResponse(Base):
     __tablename__ = "caregiver_responses"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_caregiver_responses_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    caregiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    request_id = Column(Integer, ForeignKey("caregiver_requests.id"), nullable=False)
+    caregiver_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    request_id = Column(Integer, ForeignKey("caregiver_requests.id"), nullable=False, index=True)
     status = Column(Enum(ResponseStatus), nullable=False)
     message = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     caregiver = relationship("User", foreign_keys=[caregiver_id])
@@ -110,14 +146,18 @@ class CaregiverResponse(Base):
 
 class CaregiverReview(Base):
     __tablename__ = "caregiver_reviews"
+    __table_args__ = (
+        # Keyset pagination order, see app.core.pagination
+        Index("ix_caregiver_reviews_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    listing_id = Column(Integer, ForeignKey("caregiver_listings.id"), nullable=False)
-    reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    listing_id = Column(Integer, ForeignKey("caregiver_listings.id"), nullable=False, index=True)
+    reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     rating = Column(Float, nullable=False)
     comment = Column(Text)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     listing = relationship("CaregiverListing", back_populates="reviews")
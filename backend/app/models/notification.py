@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Boolean, JSON, Enum, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 import enum
@@ -14,6 +14,11 @@ class NotificationType(str, enum.Enum):
 
 class Notification(Base):
     __tablename__ = "notifications"
+    __table_args__ = (
+        # A user's notifications, all or unread only, newest first
+        Index("ix_notifications_user_id_is_read_created_at", "user_id", "is_read", "created_at", "id"),
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -23,22 +28,55 @@ class Notification(Base):
     is_read = Column(Boolean, default=False)
     link = Column(String)
     notification_metadata = Column(JSON)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # On Postgres the table is range partitioned by month on created_at, with
+    # (id, created_at) as its primary key; see app.db.partitions
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     # Relationships
     user = relationship("User")
 
+class NotificationCounter(Base):
+    """A user's unread notification count, adjusted in the same transaction as each change"""
+    __tablename__ = "notification_counters"
+    # Keyed by user; none of Base's common columns
+    id = None
+    created_at = None
+    updated_at = None
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    unread_count = Column(Integer, server_default=text("0"), nullable=False)
+
+class NotificationOutbox(Base):
+    """
+    A notification to create, written in the same transaction as the change that
+    causes it and turned into a Notification by the outbox worker
+    """
+    __tablename__ = "notification_outbox"
+    # Entries are only inserted and deleted
+    updated_at = None
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    type = Column(Enum(NotificationType), nullable=False)
+    title = Column(String, nullable=False)
+    message = Column(Text, nullable=False)
+    link = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Failed deliveries; entries that reach the worker's limit are left for inspection
+    attempts = Column(Integer, server_default=text("0"), nullable=False)
+    last_error = Column(Text)
+
 class NotificationPreference(Base):
     __tablename__ = "notification_preferences"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     email_notifications = Column(Boolean, default=True)
     push_notifications = Column(Boolean, default=True)
     in_app_notifications = Column(Boolean, default=True)
     notification_types = Column(JSON, nullable=False)  # JSON object of notification type preferences
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # Relationships
     user = relationship("User") 
\ No newline at end of file
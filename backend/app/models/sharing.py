@@ -1,6 +1,6 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, JSON
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, JSON, Index, select, text
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from app.db.base_class import Base
 import enum
 
@@ -19,8 +19,26 @@ class SharingPlatform(str, enum.Enum):
     WHATSAPP = "whatsapp"
     EMAIL = "email"
 
+class ShareCounter(Base):
+    """Shares of an item per platform, incremented in the same transaction as each share"""
+    __tablename__ = "share_counters"
+    # Keyed by item and platform; none of Base's common columns
+    id = None
+    created_at = None
+    updated_at = None
+
+    shareable_type = Column(Enum(ShareableType), primary_key=True)
+    shareable_id = Column(Integer, primary_key=True)
+    platform = Column(Enum(SharingPlatform), primary_key=True)
+    count = Column(Integer, server_default=text("0"), nullable=False)
+
 class Share(Base):
     __tablename__ = "shares"
+    __table_args__ = (
+        # A user's sharing history, newest first, and the share stats of an item
+        Index("ix_shares_user_id_created_at", "user_id", "created_at"),
+        Index("ix_shares_shareable", "shareable_type", "shareable_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -34,6 +52,13 @@ class Share(Base):
     # Relationships
     user = relationship("User")
 
+    @property
+    def short_url(self):
+        """The /s/{code} link that redirects to the shared item and counts the click"""
+        from app.services.short_links import short_url
+
+        return short_url(self.id) if self.id else None
+
     def get_shareable(self, db):
         """Get the actual shareable object based on type and ID"""
         from app.models.blood_donation import BloodDonationRequest
@@ -48,4 +73,25 @@ class Share(Base):
             return db.query(AssistiveDeviceListing).get(self.shareable_id)
         elif self.shareable_type == ShareableType.CAREGIVER_LISTING:
             return db.query(CaregiverListing).get(self.shareable_id)
-        return None 
\ No newline at end of file
+        return None 
+
+class ShareClickCounter(Base):
+    """Clicks on a share's short link, added in batches from each worker's click buffer"""
+    __tablename__ = "share_click_counters"
+    # Keyed by share; none of Base's common columns
+    id = None
+    created_at = None
+    updated_at = None
+
+    share_id = Column(Integer, ForeignKey("shares.id"), primary_key=True)
+    clicks = Column(Integer, server_default=text("0"), nullable=False)
+    last_clicked_at = Column(DateTime(timezone=True))
+
+# Flushed clicks only; the current interval's are still in the workers' buffers
+Share.click_count = column_property(func.coalesce(
+    select(ShareClickCounter.clicks)
+    .where(ShareClickCounter.share_id == Share.id)
+    .correlate_except(ShareClickCounter)
+    .scalar_subquery(),
+    0
+))
@@ -13,7 +13,7 @@ class User(Base):
     username = Column(String(255), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime, server_default=func.now())
-    updated_at = Column(DateTime, onupdate=func.now())
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
     # Add role field with a server_default so it works with existing data
     role = Column(String(50), server_default=text("'user'"), nullable=False)
@@ -27,6 +27,9 @@ class User(Base):
     # Add deleted_at field for account deletion
     deleted_at = Column(DateTime, nullable=True)
     
+    # Bumped to revoke every session token issued to the user
+    token_version = Column(Integer, server_default=text("0"), nullable=False)
+    
     # Helper properties for authorization checks
     @property
     def is_donor(self):
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional
 from datetime import datetime
 
@@ -8,6 +8,8 @@ class AssistiveDeviceListingBase(BaseModel):
     condition: str
     description: str
     location: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     contact_info: str
 
 class AssistiveDeviceListingCreate(AssistiveDeviceListingBase):
@@ -20,4 +20,13 @@ class UserResponse(UserBase):
     full_name: Optional[str] = None
     phone_number: Optional[str] = None
     
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TokenResponse(BaseModel):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
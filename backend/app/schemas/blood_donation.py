@@ -1,10 +1,12 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from typing import Optional
 
 class BloodDonationRequestBase(BaseModel):
     blood_type: str  # A+, A-, B+, B-, AB+, AB-, O+, O-
     location: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     urgency: str  # High, Medium, Low
     contact_number: str
     notes: Optional[str] = None
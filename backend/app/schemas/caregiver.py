@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional, List
 from datetime import datetime
 from app.models.caregiver import (
@@ -30,6 +30,8 @@ class CaregiverListingBase(BaseModel):
     hourly_rate: float
     description: str
     location: str
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
     contact_info: str
     availability_status: AvailabilityStatus = AvailabilityStatus.AVAILABLE
 
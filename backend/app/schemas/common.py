@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic, List
+from typing import TypeVar, Generic, List, Optional
 from pydantic import BaseModel
 from pydantic.generics import GenericModel
 
@@ -7,10 +7,12 @@ T = TypeVar("T")
 class PaginatedResponse(GenericModel, Generic[T]):
     """Generic paginated response model"""
     items: List[T]
-    total: int
+    total: Optional[int] = None  # None when the request set include_total=false
     page: int
     size: int
-    pages: int
+    pages: Optional[int] = None
+    total_source: Optional[str] = None  # "exact", "cached" or "estimated"
+    next_cursor: Optional[str] = None  # Pass back as `cursor` to fetch the next page by keyset
 
 class ApiResponse(BaseModel):
     """Standard API response model"""
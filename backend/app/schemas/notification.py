@@ -21,6 +21,9 @@ class NotificationResponse(NotificationBase):
     class Config:
         from_attributes = True
 
+class UnreadCountResponse(BaseModel):
+    unread_count: int
+
 class NotificationPreferenceBase(BaseModel):
     email_notifications: bool
     push_notifications: bool
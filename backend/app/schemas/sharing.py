@@ -15,6 +15,8 @@ class ShareResponse(ShareBase):
     id: int
     user_id: int
     share_url: Optional[str] = None
+    short_url: Optional[str] = None
+    click_count: int = 0
     share_metadata: Optional[Dict] = None
     created_at: datetime
 
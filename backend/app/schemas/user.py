@@ -19,6 +19,12 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserLoginResponse(UserResponse):
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int
+
 class UserUpdate(BaseModel):
     username: Optional[str] = None
     full_name: Optional[str] = None
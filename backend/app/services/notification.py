@@ -1,14 +1,64 @@
-from typing import Optional
-from sqlalchemy.orm import Session
-from app.models.notification import Notification, NotificationType, NotificationPreference
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+from sqlalchemy import and_, case, cast, delete, exists, func, insert, literal, literal_column, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox, NotificationType, NotificationPreference
 from app.models.user import User
-import json
+from app.core.pagination import keyset_order, keyset_filter
+from app.services.notification_broker import notification_broker
+
+# Recipients per INSERT ... SELECT in create_notifications_bulk, well under the bind
+# parameter limits of SQLite and asyncpg
+BULK_CHUNK_SIZE = 1000
+# Set on a session that queued outbox entries, so the worker is woken when it commits
+OUTBOX_PENDING_KEY = "notification_outbox_pending"
+
+
+def _type_enabled(type: NotificationType, dialect_name: str):
+    """
+    SQL condition: NotificationPreference.notification_types lists `type`.
+    Older rows hold the list JSON-encoded a second time, as a string; both forms match.
+    """
+    types = NotificationPreference.notification_types
+    if dialect_name == "postgresql":
+        # #>> '{}' unwraps the top-level value as text: the list itself or the string holding it
+        return cast(types.op("#>>")(literal_column("'{}'")), JSONB).op("@>")(func.jsonb_build_array(type.value))
+    listed = case((func.json_type(types) == "text", func.json_extract(types, "$")), else_=types)
+    entries = func.json_each(listed).table_valued("value")
+    return exists(select(1).select_from(entries).where(entries.c.value == type.value))
+
+
+def _stream_event(type: NotificationType, title: str, message: str, link: Optional[str], created_at) -> dict:
+    """A notification as /notifications/stream sends it, less its id"""
+    return {
+        "type": type.value,
+        "title": title,
+        "message": message,
+        "link": link,
+        "is_read": False,
+        "created_at": created_at.isoformat() if created_at else None,
+    }
+
+
+def _add_unread(unread: dict[int, int], dialect_name: str):
+    """Upsert adding unread[user_id] to each user's unread counter"""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(NotificationCounter).values(
+        [{"user_id": user_id, "unread_count": n} for user_id, n in unread.items()]
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[NotificationCounter.user_id],
+        set_={"unread_count": NotificationCounter.unread_count + statement.excluded.unread_count},
+    )
+
 
 class NotificationService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def create_notification(
+    async def create_notification(
         self,
         user_id: int,
         type: NotificationType,
@@ -25,60 +75,221 @@ class NotificationService:
             link=link
         )
         self.db.add(notification)
-        self.db.commit()
-        self.db.refresh(notification)
+        await self.db.flush()
+        await self.db.execute(_add_unread({user_id: 1}, self.db.get_bind().dialect.name))
+        await notification_broker.publish(
+            self.db,
+            _stream_event(type, title, message, link, notification.created_at),
+            [(user_id, notification.id)],
+        )
+        await self.db.commit()
+        await self.db.refresh(notification)
         return notification
 
-    def get_user_notifications(
+    async def create_notifications_bulk(
+        self,
+        user_ids: Iterable[int],
+        type: NotificationType,
+        title: str,
+        message: str,
+        link: Optional[str] = None
+    ) -> int:
+        """
+        Send the same notification to many users in one transaction.
+
+        Recipients are filtered in SQL: users who were deleted, turned in-app
+        notifications off or left `type` out of their preferences are skipped (no
+        preferences row means everything is on). Each chunk of recipients is a
+        single INSERT ... SELECT that returns only the new ids, which are published
+        to open notification streams, plus one upsert of the recipients' unread
+        counters. Returns the number of notifications created.
+        """
+        user_ids = sorted(set(user_ids))
+        dialect_name = self.db.get_bind().dialect.name
+        recipients_allowed = or_(
+            NotificationPreference.id.is_(None),
+            and_(NotificationPreference.in_app_notifications.is_not(False), _type_enabled(type, dialect_name)),
+        )
+        columns = Notification.__table__.c
+        created = 0
+        for start in range(0, len(user_ids), BULK_CHUNK_SIZE):
+            recipients = (
+                select(
+                    User.id,
+                    literal(type, columns.type.type),
+                    literal(title, columns.title.type),
+                    literal(message, columns.message.type),
+                    literal(link, columns.link.type),
+                )
+                .outerjoin(NotificationPreference, NotificationPreference.user_id == User.id)
+                .where(User.id.in_(user_ids[start:start + BULK_CHUNK_SIZE]), User.deleted_at.is_(None), recipients_allowed)
+            )
+            rows = (await self.db.execute(
+                insert(Notification)
+                .from_select(["user_id", "type", "title", "message", "link"], recipients)
+                .returning(Notification.id, Notification.user_id, Notification.created_at)
+            )).all()
+            if rows:
+                # user_ids are distinct, so each recipient gets one new notification
+                await self.db.execute(_add_unread({row.user_id: 1 for row in rows}, dialect_name))
+                await notification_broker.publish(
+                    self.db,
+                    _stream_event(type, title, message, link, rows[0].created_at),
+                    [(row.user_id, row.id) for row in rows],
+                )
+            created += len(rows)
+        await self.db.commit()
+        return created
+
+    def enqueue(
+        self,
+        user_id: int,
+        type: NotificationType,
+        title: str,
+        message: str,
+        link: Optional[str] = None
+    ) -> None:
+        """
+        Queue a notification in the outbox. It is written by the caller's commit,
+        together with the change it is about, and created by the outbox worker.
+        """
+        self.db.add(NotificationOutbox(user_id=user_id, type=type, title=title, message=message, link=link))
+        self.db.sync_session.info[OUTBOX_PENDING_KEY] = True
+
+    async def deliver_outbox(self, limit: int, max_attempts: int, ids: Optional[list[int]] = None) -> list[NotificationOutbox]:
+        """
+        Create the notifications of up to `limit` outbox entries, oldest first, and
+        delete the entries, in one transaction. On Postgres the entries are claimed
+        with SKIP LOCKED, so several workers can drain the outbox at once. Returns
+        the entries delivered.
+        """
+        dialect_name = self.db.get_bind().dialect.name
+        query = select(NotificationOutbox).where(NotificationOutbox.attempts < max_attempts)
+        if ids is not None:
+            query = query.where(NotificationOutbox.id.in_(ids))
+        query = query.order_by(NotificationOutbox.id).limit(limit)
+        if dialect_name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        entries = list((await self.db.scalars(query)).all())
+        if not entries:
+            return []
+
+        notifications = [
+            Notification(user_id=entry.user_id, type=entry.type, title=entry.title, message=entry.message, link=entry.link)
+            for entry in entries
+        ]
+        self.db.add_all(notifications)
+        await self.db.flush()
+        await self.db.execute(_add_unread(Counter(entry.user_id for entry in entries), dialect_name))
+        # One event per distinct notification text, like create_notifications_bulk
+        recipients = defaultdict(list)
+        for notification in notifications:
+            key = (notification.type, notification.title, notification.message, notification.link)
+            recipients[key].append((notification.user_id, notification.id, notification.created_at))
+        for (type, title, message, link), sent in recipients.items():
+            await notification_broker.publish(
+                self.db,
+                _stream_event(type, title, message, link, sent[0][2]),
+                [(user_id, notification_id) for user_id, notification_id, _ in sent],
+            )
+        await self.db.execute(delete(NotificationOutbox).where(NotificationOutbox.id.in_([entry.id for entry in entries])))
+        await self.db.commit()
+        return entries
+
+    async def record_outbox_failure(self, entry_id: int, error: str) -> None:
+        """Count a failed delivery of an outbox entry"""
+        await self.db.execute(update(NotificationOutbox).where(NotificationOutbox.id == entry_id).values(
+            attempts=NotificationOutbox.attempts + 1,
+            last_error=error
+        ))
+        await self.db.commit()
+
+    async def get_user_notifications(
         self,
         user_id: int,
         skip: int = 0,
         limit: int = 50,
-        unread_only: bool = False
+        unread_only: bool = False,
+        cursor: Optional[str] = None
     ) -> list[Notification]:
-        """Get notifications for a user"""
-        query = self.db.query(Notification).filter(Notification.user_id == user_id)
+        """Get notifications for a user, newest first, by offset or by keyset cursor"""
+        query = select(Notification).where(Notification.user_id == user_id)
         if unread_only:
-            query = query.filter(Notification.is_read == False)
-        return query.order_by(Notification.created_at.desc()).offset(skip).limit(limit).all()
+            query = query.where(Notification.is_read == False)
+        query = keyset_order(query, Notification)
+        if cursor:
+            query = keyset_filter(query, Notification, cursor)
+        else:
+            query = query.offset(skip)
+        result = await self.db.scalars(query.limit(limit))
+        return list(result.all())
 
-    def mark_as_read(self, notification_id: int, user_id: int) -> Notification:
+    async def get_notifications_after(self, user_id: int, after_id: int, limit: int) -> list[Notification]:
+        """A user's notifications with ids above after_id, oldest first"""
+        result = await self.db.scalars(
+            select(Notification)
+            .where(Notification.user_id == user_id, Notification.id > after_id)
+            .order_by(Notification.id)
+            .limit(limit)
+        )
+        return list(result.all())
+
+    async def get_unread_count(self, user_id: int) -> int:
+        """A user's unread notifications, from their counter row"""
+        count = await self.db.scalar(
+            select(NotificationCounter.unread_count).where(NotificationCounter.user_id == user_id)
+        )
+        return count or 0
+
+    async def _remove_unread(self, user_id: int, n: int) -> None:
+        if n:
+            await self.db.execute(update(NotificationCounter).where(
+                NotificationCounter.user_id == user_id
+            ).values(unread_count=NotificationCounter.unread_count - n))
+
+    async def mark_as_read(self, notification_id: int, user_id: int) -> Notification:
         """Mark a notification as read"""
-        notification = self.db.query(Notification).filter(
+        # Only the request that flips is_read decrements the counter
+        result = await self.db.execute(update(Notification).where(
+            Notification.id == notification_id,
+            Notification.user_id == user_id,
+            Notification.is_read == False
+        ).values(is_read=True))
+        await self._remove_unread(user_id, result.rowcount)
+        await self.db.commit()
+        return await self.db.scalar(select(Notification).where(
             Notification.id == notification_id,
             Notification.user_id == user_id
-        ).first()
-        if notification:
-            notification.is_read = True
-            self.db.commit()
-            self.db.refresh(notification)
-        return notification
+        ))
 
-    def mark_all_as_read(self, user_id: int) -> None:
+    async def mark_all_as_read(self, user_id: int) -> None:
         """Mark all notifications as read for a user"""
-        self.db.query(Notification).filter(
+        # Subtract what was marked rather than zeroing, so a notification committed
+        # concurrently stays counted
+        result = await self.db.execute(update(Notification).where(
             Notification.user_id == user_id,
             Notification.is_read == False
-        ).update({"is_read": True})
-        self.db.commit()
+        ).values(is_read=True))
+        await self._remove_unread(user_id, result.rowcount)
+        await self.db.commit()
 
-    def get_notification_preferences(self, user_id: int) -> NotificationPreference:
+    async def get_notification_preferences(self, user_id: int) -> NotificationPreference:
         """Get notification preferences for a user"""
-        preferences = self.db.query(NotificationPreference).filter(
+        preferences = await self.db.scalar(select(NotificationPreference).where(
             NotificationPreference.user_id == user_id
-        ).first()
+        ))
         if not preferences:
             # Create default preferences if they don't exist
             preferences = NotificationPreference(
                 user_id=user_id,
-                notification_types=json.dumps([t.value for t in NotificationType])
+                notification_types=[t.value for t in NotificationType]
             )
             self.db.add(preferences)
-            self.db.commit()
-            self.db.refresh(preferences)
+            await self.db.commit()
+            await self.db.refresh(preferences)
         return preferences
 
-    def update_notification_preferences(
+    async def update_notification_preferences(
         self,
         user_id: int,
         email_notifications: Optional[bool] = None,
@@ -87,7 +298,7 @@ class NotificationService:
         notification_types: Optional[list[str]] = None
     ) -> NotificationPreference:
         """Update notification preferences for a user"""
-        preferences = self.get_notification_preferences(user_id)
+        preferences = await self.get_notification_preferences(user_id)
         
         if email_notifications is not None:
             preferences.email_notifications = email_notifications
@@ -96,15 +307,15 @@ class NotificationService:
         if in_app_notifications is not None:
             preferences.in_app_notifications = in_app_notifications
         if notification_types is not None:
-            preferences.notification_types = json.dumps(notification_types)
+            preferences.notification_types = notification_types
         
-        self.db.commit()
-        self.db.refresh(preferences)
+        await self.db.commit()
+        await self.db.refresh(preferences)
         return preferences
 
-    def notify_request_received(self, user: User, request_type: str, request_id: int) -> None:
+    async def notify_request_received(self, user: User, request_type: str, request_id: int) -> None:
         """Create notification for received request"""
-        self.create_notification(
+        await self.create_notification(
             user_id=user.id,
             type=NotificationType.REQUEST_RECEIVED,
             title=f"New {request_type} Request",
@@ -112,9 +323,9 @@ class NotificationService:
             link=f"/{request_type}/requests/{request_id}"
         )
 
-    def notify_response_received(self, user: User, response_type: str, response_id: int) -> None:
+    async def notify_response_received(self, user: User, response_type: str, response_id: int) -> None:
         """Create notification for received response"""
-        self.create_notification(
+        await self.create_notification(
             user_id=user.id,
             type=NotificationType.RESPONSE_RECEIVED,
             title=f"New {response_type} Response",
@@ -122,9 +333,9 @@ class NotificationService:
             link=f"/{response_type}/responses/{response_id}"
         )
 
-    def notify_status_updated(self, user: User, item_type: str, item_id: int, new_status: str) -> None:
+    async def notify_status_updated(self, user: User, item_type: str, item_id: int, new_status: str) -> None:
         """Create notification for status update"""
-        self.create_notification(
+        await self.create_notification(
             user_id=user.id,
             type=NotificationType.STATUS_UPDATED,
             title=f"{item_type} Status Updated",
@@ -132,9 +343,9 @@ class NotificationService:
             link=f"/{item_type}/{item_id}"
         )
 
-    def notify_review_received(self, user: User, review_type: str, review_id: int) -> None:
+    async def notify_review_received(self, user: User, review_type: str, review_id: int) -> None:
         """Create notification for received review"""
-        self.create_notification(
+        await self.create_notification(
             user_id=user.id,
             type=NotificationType.REVIEW_RECEIVED,
             title=f"New {review_type} Review",
@@ -0,0 +1,209 @@
+import asyncio
+import csv
+import gzip
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+from sqlalchemy import bindparam, delete, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from app.core.config import settings
+from app.db.partitions import (
+    LOCK_KEY, PARENT, add_months, ensure_partitions, is_partitioned, list_partitions, month_start, partition_name,
+)
+from app.models.notification import Notification
+
+# Retention for notifications. On a partitioned table (Postgres) whole months past
+# the retention window are detached, and kept as notifications_archive_yYYYYmMM
+# tables, or dropped; elsewhere old rows are deleted in batches. Either way the
+# unread counters lose the unread notifications that go, in the same transaction.
+
+ACTIONS = ("detach", "drop")
+
+_SUBTRACT_UNREAD = text(
+    "UPDATE notification_counters SET unread_count = unread_count - ("
+    "  SELECT count(*) FROM notifications n WHERE n.user_id = notification_counters.user_id"
+    "  AND n.is_read = false AND n.id IN :ids"
+    ") WHERE user_id IN (SELECT user_id FROM notifications WHERE id IN :ids AND is_read = false)"
+).bindparams(bindparam("ids", expanding=True))
+
+
+@contextmanager
+def maintenance_lock(engine: Engine) -> Iterator[bool]:
+    """
+    Yields whether this process may maintain partitions now. On Postgres only one
+    holder of the advisory lock at a time does; the others skip their run.
+    """
+    if engine.dialect.name != "postgresql":
+        yield True
+        return
+    with engine.connect() as connection:
+        locked = connection.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": LOCK_KEY}).scalar()
+        connection.commit()
+        try:
+            yield locked
+        finally:
+            if locked:
+                connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": LOCK_KEY})
+                connection.commit()
+
+
+def _export(connection: Connection, query, path: str) -> int:
+    """Write the rows of query to a gzipped CSV with a header; returns the row count"""
+    result = connection.execution_options(stream_results=True, yield_per=10000).execute(query)
+    written = 0
+    with gzip.open(path, "wt", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(result.keys())
+        for rows in result.partitions():
+            writer.writerows(rows)
+            written += len(rows)
+    return written
+
+
+def _expire_partitions(
+    engine: Engine,
+    cutoff: datetime,
+    action: str,
+    output_dir: Optional[str],
+    dry_run: bool,
+    log: Callable[[str], None],
+) -> int:
+    with engine.connect() as connection:
+        expired = [(name, month) for name, month in list_partitions(connection) if add_months(month, 1) <= cutoff]
+    for name, month in expired:
+        if dry_run:
+            log(f"{name}: would {action}")
+            continue
+        with engine.begin() as connection:
+            if output_dir:
+                path = os.path.join(output_dir, f"{name}.csv.gz")
+                log(f"{name}: exported {_export(connection, text(f'SELECT * FROM {name} ORDER BY id'), path)} rows to {path}")
+            connection.execute(text(
+                "UPDATE notification_counters SET unread_count = notification_counters.unread_count - expired.n "
+                f"FROM (SELECT user_id, count(*) AS n FROM {name} WHERE is_read = false GROUP BY user_id) expired "
+                "WHERE notification_counters.user_id = expired.user_id"
+            ))
+            if action == "drop":
+                connection.execute(text(f"DROP TABLE {name}"))
+                log(f"{name}: dropped")
+            else:
+                archived = partition_name(month, archived=True)
+                connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+                connection.execute(text(f"ALTER TABLE {name} RENAME TO {archived}"))
+                log(f"{name}: detached as {archived}")
+    return len(expired)
+
+
+def _delete_rows(
+    engine: Engine,
+    cutoff: datetime,
+    output_dir: Optional[str],
+    dry_run: bool,
+    batch_size: int,
+    log: Callable[[str], None],
+) -> int:
+    notifications = Notification.__table__
+    if engine.dialect.name != "postgresql":
+        # SQLite keeps CURRENT_TIMESTAMP text, which is UTC without a zone
+        cutoff = cutoff.replace(tzinfo=None)
+    expired = notifications.c.created_at < cutoff
+    if dry_run:
+        with engine.connect() as connection:
+            count = connection.execute(select(func.count()).select_from(notifications).where(expired)).scalar()
+        log(f"{PARENT}: would delete {count} rows created before {cutoff:%Y-%m-%d}")
+        return 0
+    if output_dir:
+        path = os.path.join(output_dir, f"{PARENT}_before_{cutoff:%Y_%m}.csv.gz")
+        with engine.connect() as connection:
+            log(f"{PARENT}: exported {_export(connection, select(notifications).where(expired).order_by(notifications.c.id), path)} rows to {path}")
+    deleted = 0
+    while True:
+        with engine.begin() as connection:
+            ids = list(connection.execute(
+                select(notifications.c.id).where(expired).order_by(notifications.c.id).limit(batch_size)
+            ).scalars())
+            if not ids:
+                break
+            connection.execute(_SUBTRACT_UNREAD, {"ids": ids})
+            connection.execute(delete(notifications).where(notifications.c.id.in_(ids)))
+        deleted += len(ids)
+        log(f"{PARENT}: deleted {deleted} rows")
+    return deleted
+
+
+def archive_notifications(
+    engine: Engine,
+    retention_months: int,
+    action: str = "detach",
+    output_dir: Optional[str] = None,
+    dry_run: bool = False,
+    batch_size: int = 10000,
+    now: Optional[datetime] = None,
+    log: Callable[[str], None] = print,
+) -> int:
+    """
+    Retire notifications created before the start of the month retention_months
+    back. Partitions are detached or dropped per `action`; an unpartitioned table
+    can only have its rows deleted (action "drop"). With output_dir each retired
+    partition, or the deleted rows, are first written there as gzipped CSV.
+    Returns the partitions or rows retired.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"action must be one of {', '.join(ACTIONS)}")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -retention_months)
+    with engine.connect() as connection:
+        partitioned = is_partitioned(connection)
+    if partitioned:
+        return _expire_partitions(engine, cutoff, action, output_dir, dry_run, log)
+    if action == "detach":
+        raise ValueError(f"{PARENT} is not partitioned, so nothing can be detached; "
+                         "use action 'drop' (with an output directory to keep a copy)")
+    return _delete_rows(engine, cutoff, output_dir, dry_run, batch_size, log)
+
+
+def maintain_partitions(engine: Engine, log: Callable[[str], None] = print) -> None:
+    """Create upcoming partitions and apply the configured retention, if this process holds the lock"""
+    with maintenance_lock(engine) as locked:
+        if not locked:
+            return
+        with engine.begin() as connection:
+            if not is_partitioned(connection):
+                return
+            for name in ensure_partitions(connection, settings.NOTIFICATION_PARTITION_MONTHS_AHEAD):
+                log(f"Created notification partition {name}")
+        if settings.NOTIFICATION_RETENTION_MONTHS is not None:
+            archive_notifications(engine, settings.NOTIFICATION_RETENTION_MONTHS, settings.NOTIFICATION_RETENTION_ACTION, log=log)
+
+
+class PartitionMaintenance:
+    """Runs maintain_partitions at startup and every interval_seconds after"""
+
+    def __init__(self, engine: Engine, interval_seconds: float):
+        self.engine = engine
+        self.interval_seconds = interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                # DDL and retention are blocking work on the sync engine
+                await asyncio.to_thread(maintain_partitions, self.engine)
+            except Exception as e:
+                print(f"Notification partition maintenance failed: {e}")
+            await asyncio.sleep(self.interval_seconds)
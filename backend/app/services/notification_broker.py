@@ -0,0 +1,217 @@
+import asyncio
+import json
+from collections import defaultdict
+from typing import Optional
+from fastapi import HTTPException
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import async_engine
+
+# Pushes new notifications to the /notifications/stream connections of their users.
+# Each process keeps its own subscribers. On Postgres every notification goes through
+# NOTIFY on commit, and each process LISTENs and delivers to its own subscribers, so
+# a user connected to any worker hears about notifications created on any other.
+# Without Postgres there is only one process to serve, and events are delivered
+# in-process once the creating transaction commits.
+
+CHANNEL = "notifications"
+# NOTIFY payloads are limited to 8000 bytes
+MAX_PAYLOAD_BYTES = 7500
+_PENDING_KEY = "pending_notification_events"
+
+# Queued to a subscription to end its stream, or to make it resync
+CLOSE = None
+RESYNC = "resync"
+
+
+class Subscription:
+    """One open stream: a bounded queue of notifications for one user"""
+
+    def __init__(self, user_id: int, max_queue: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        # Set when the client fell behind and events were dropped; it has to refetch
+        self.overflowed = False
+
+
+class NotificationBroker:
+    def __init__(self, max_queue: int, max_connections: int):
+        self.max_queue = max_queue
+        self.max_connections = max_connections
+        self._subscribers: dict[int, set[Subscription]] = defaultdict(set)
+        self._connections = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[AsyncConnection] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    # Subscribers
+
+    def subscribe(self, user_id: int) -> Subscription:
+        if self._connections >= self.max_connections:
+            raise HTTPException(status_code=503, detail="Too many open notification streams", headers={"Retry-After": "5"})
+        self._loop = self._loop or asyncio.get_running_loop()
+        subscription = Subscription(user_id, self.max_queue)
+        self._subscribers[user_id].add(subscription)
+        self._connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers and subscription in subscribers:
+            subscribers.discard(subscription)
+            self._connections -= 1
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def dispatch(self, events: list[dict]) -> None:
+        """Queue each event's notification for the subscribers of its recipients"""
+        for item in events:
+            for user_id, notification_id in item["recipients"]:
+                subscribers = self._subscribers.get(user_id)
+                if not subscribers:
+                    continue
+                payload = {**item["notification"], "id": notification_id}
+                for subscription in subscribers:
+                    if subscription.overflowed:
+                        continue
+                    try:
+                        subscription.queue.put_nowait(payload)
+                        self.delivered += 1
+                    except asyncio.QueueFull:
+                        # Don't let one slow client hold events in memory; it resyncs instead
+                        subscription.overflowed = True
+                        self.dropped += 1
+
+    def dispatch_threadsafe(self, events: list[dict]) -> None:
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop or self._loop is None:
+            self.dispatch(events)
+        else:
+            self._loop.call_soon_threadsafe(self.dispatch, events)
+
+    # Publishing
+
+    async def publish(self, db: AsyncSession, notification: dict, recipients: list[tuple[int, int]]) -> None:
+        """
+        Send `notification` to each (user_id, notification_id) recipient once db's
+        transaction commits. Call before committing.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            for payload in notify_payloads(notification, recipients):
+                await db.execute(select(func.pg_notify(CHANNEL, payload)))
+        else:
+            db.sync_session.info.setdefault(_PENDING_KEY, []).append(
+                {"notification": notification, "recipients": recipients}
+            )
+
+    # Postgres LISTEN
+
+    async def start(self) -> None:
+        """Listen for notifications from every worker (Postgres only)"""
+        self._loop = asyncio.get_running_loop()
+        if async_engine.dialect.name != "postgresql" or self._listener is not None:
+            return
+        listener = await async_engine.connect()
+        driver_connection = (await listener.get_raw_connection()).driver_connection
+        await driver_connection.add_listener(CHANNEL, self._on_notify)
+        driver_connection.add_termination_listener(self._on_listener_lost)
+        self._listener = listener
+
+    async def stop(self) -> None:
+        """Stop listening and end every open stream"""
+        if self._listener is not None:
+            listener, self._listener = self._listener, None
+            driver_connection = (await listener.get_raw_connection()).driver_connection
+            driver_connection.remove_termination_listener(self._on_listener_lost)
+            # UNLISTEN before the connection goes back to the pool
+            await driver_connection.remove_listener(CHANNEL, self._on_notify)
+            await listener.close()
+        self._signal_all(CLOSE)
+
+    def _signal_all(self, signal) -> None:
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                try:
+                    subscription.queue.put_nowait(signal)
+                except asyncio.QueueFull:
+                    # Already behind; it resyncs once it has drained its queue
+                    subscription.overflowed = True
+
+    def _on_notify(self, connection, pid, channel, payload: str) -> None:
+        self.dispatch([json.loads(payload)])
+
+    def _on_listener_lost(self, connection) -> None:
+        print("Notification listener connection lost, reconnecting")
+        lost, self._listener = self._listener, None
+        self._loop.create_task(self._reconnect(lost))
+
+    async def _reconnect(self, lost: Optional[AsyncConnection], delay: float = 1.0) -> None:
+        if lost is not None:
+            # Keep the dead connection out of the pool
+            try:
+                await lost.invalidate()
+            except Exception:
+                pass
+        while self._listener is None:
+            try:
+                await self.start()
+            except Exception as e:
+                print(f"Notification listener reconnect failed: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+        # Whatever was published while nobody listened is lost; streams refetch
+        self._signal_all(RESYNC)
+
+    def stats(self) -> dict:
+        return {
+            "connections": self._connections,
+            "users": len(self._subscribers),
+            "listening": self._listener is not None,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+        }
+
+
+def notify_payloads(notification: dict, recipients: list[tuple[int, int]]) -> list[str]:
+    """Split an event into NOTIFY payloads that each fit the size limit"""
+    body = json.dumps(notification)
+    if len(body) > MAX_PAYLOAD_BYTES // 2:
+        # Streams send what they get; clients fetch the full text when flagged
+        notification = {**notification, "message": None, "truncated": True}
+    payloads, chunk = [], []
+    size = len(json.dumps({"notification": notification, "recipients": []}))
+    for recipient in recipients:
+        entry = len(json.dumps(list(recipient))) + 2
+        if chunk and size + entry > MAX_PAYLOAD_BYTES:
+            payloads.append(json.dumps({"notification": notification, "recipients": chunk}))
+            chunk, size = [], len(json.dumps({"notification": notification, "recipients": []}))
+        chunk.append(list(recipient))
+        size += entry
+    if chunk:
+        payloads.append(json.dumps({"notification": notification, "recipients": chunk}))
+    return payloads
+
+
+notification_broker = NotificationBroker(
+    max_queue=settings.NOTIFICATION_STREAM_QUEUE_SIZE,
+    max_connections=settings.NOTIFICATION_STREAM_MAX_CONNECTIONS,
+)
+
+
+# In-process delivery happens only once the creating transaction has committed
+@event.listens_for(Session, "after_commit")
+def _deliver_pending(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        notification_broker.dispatch_threadsafe(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_PENDING_KEY, None)
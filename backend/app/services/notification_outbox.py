@@ -0,0 +1,181 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.notification import NotificationOutbox
+from app.services.notification import NotificationService, OUTBOX_PENDING_KEY
+
+# Drains notification_outbox into notifications in the background, so a request that
+# causes a notification only pays for one extra row in its own transaction.
+# Delivery is at least once: entries are deleted in the transaction that creates
+# their notifications, and an entry whose batch fails stays in the outbox for the
+# next pass. Each app process runs a worker; on Postgres they split the outbox
+# between them with SKIP LOCKED.
+
+
+def _age_seconds(created_at: Optional[datetime]) -> float:
+    if created_at is None:
+        return 0.0
+    if created_at.tzinfo is None:
+        # SQLite hands back CURRENT_TIMESTAMP, which is UTC, without a zone
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return max((datetime.now(timezone.utc) - created_at).total_seconds(), 0.0)
+
+
+class OutboxWorker:
+    def __init__(self, batch_size: int, poll_seconds: float, max_attempts: int):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.max_attempts = max_attempts
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.delivered = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_batch_at: Optional[float] = None
+        # Age of the oldest entry in the last batch, when it was delivered
+        self.last_lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        """Let the batch in progress finish, then stop"""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            # Whatever was mid-batch rolls back and is delivered after restart
+            pass
+        self._task = None
+
+    def wake(self) -> None:
+        """Deliver now rather than at the next poll; safe from any thread"""
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            self._wakeup.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _run(self) -> None:
+        delay = self.poll_seconds
+        while not self._stopping:
+            try:
+                delivered = await self.drain_once()
+                delay = self.poll_seconds
+            except Exception as e:
+                # The database is unreachable or similar; back off and try again
+                print(f"Notification outbox worker failed: {e}")
+                delivered = 0
+                delay = min(delay * 2, 30)
+            if delivered >= self.batch_size:
+                # More are probably waiting
+                continue
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain_once(self) -> int:
+        """Deliver one batch; returns the number of entries delivered"""
+        try:
+            async with AsyncSessionLocal() as db:
+                entries = await NotificationService(db).deliver_outbox(self.batch_size, self.max_attempts)
+        except Exception as e:
+            print(f"Notification outbox batch failed, retrying entry by entry: {e}")
+            entries = await self._deliver_one_by_one()
+        if entries:
+            self._record(entries)
+        return len(entries)
+
+    async def _deliver_one_by_one(self) -> list[NotificationOutbox]:
+        """Find the entries that make a batch fail and count their failed attempts"""
+        async with AsyncSessionLocal() as db:
+            ids = list((await db.scalars(
+                select(NotificationOutbox.id)
+                .where(NotificationOutbox.attempts < self.max_attempts)
+                .order_by(NotificationOutbox.id)
+                .limit(self.batch_size)
+            )).all())
+        delivered = []
+        for entry_id in ids:
+            async with AsyncSessionLocal() as db:
+                service = NotificationService(db)
+                try:
+                    delivered += await service.deliver_outbox(1, self.max_attempts, ids=[entry_id])
+                except Exception as e:
+                    await db.rollback()
+                    self.failures += 1
+                    await service.record_outbox_failure(entry_id, str(e)[:1000])
+        return delivered
+
+    def _record(self, entries: list[NotificationOutbox]) -> None:
+        self.delivered += len(entries)
+        self.batches += 1
+        self.last_batch_at = time.time()
+        self.last_lag_seconds = max(_age_seconds(entry.created_at) for entry in entries)
+        self.max_lag_seconds = max(self.max_lag_seconds, self.last_lag_seconds)
+
+    async def stats(self) -> dict:
+        """Delivery counts for this process, and the outbox backlog across all of them"""
+        async with AsyncSessionLocal() as db:
+            pending, oldest = (await db.execute(
+                select(func.count(), func.min(NotificationOutbox.created_at))
+                .where(NotificationOutbox.attempts < self.max_attempts)
+            )).one()
+            dead = await db.scalar(
+                select(func.count()).select_from(NotificationOutbox)
+                .where(NotificationOutbox.attempts >= self.max_attempts)
+            )
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "pending": pending,
+            "oldest_pending_seconds": round(_age_seconds(oldest), 3),
+            "dead": dead,
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "failures": self.failures,
+            "last_lag_seconds": round(self.last_lag_seconds, 3),
+            "max_lag_seconds": round(self.max_lag_seconds, 3),
+            "seconds_since_last_batch": round(time.time() - self.last_batch_at, 3) if self.last_batch_at else None,
+        }
+
+
+outbox_worker = OutboxWorker(
+    batch_size=settings.NOTIFICATION_OUTBOX_BATCH_SIZE,
+    poll_seconds=settings.NOTIFICATION_OUTBOX_POLL_SECONDS,
+    max_attempts=settings.NOTIFICATION_OUTBOX_MAX_ATTEMPTS,
+)
+
+
+# A committed outbox entry wakes the worker in this process instead of waiting a poll
+@event.listens_for(Session, "after_commit")
+def _wake_outbox_worker(session):
+    if session.info.pop(OUTBOX_PENDING_KEY, False):
+        outbox_worker.wake()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_outbox_wakeup(session):
+    session.info.pop(OUTBOX_PENDING_KEY, None)
@@ -1,10 +1,45 @@
 from typing import Optional
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from app.models.sharing import Share, ShareableType
+from app.models.assistive_device import AssistiveDeviceListing
+from app.models.blood_donation import BloodDonationRequest
+from app.models.caregiver import CaregiverListing
+from app.models.sharing import Share, ShareableType, ShareCounter
 from app.models.user import User
 from app.core.config import settings
+from app.services.short_links import short_url
 import urllib.parse
 
+# Frontend paths of the shared items
+BASE_PATHS = {
+    ShareableType.BLOOD_REQUEST: "blood-donation/requests",
+    ShareableType.BLOOD_LISTING: "blood-donation/listings",
+    ShareableType.DEVICE_LISTING: "assistive-devices/listings",
+    ShareableType.CAREGIVER_LISTING: "caregivers/listings"
+}
+
+
+def content_url(shareable_type: ShareableType, shareable_id: int) -> str:
+    """The frontend page of a shared item"""
+    return f"{settings.FRONTEND_URL}/{BASE_PATHS.get(shareable_type, '')}/{shareable_id}"
+
+
+def _count_share(share: Share, dialect_name: str):
+    """Upsert adding one to the counter of the share's item and platform"""
+    dialect = postgresql if dialect_name == "postgresql" else sqlite
+    statement = dialect.insert(ShareCounter).values(
+        shareable_type=share.shareable_type,
+        shareable_id=share.shareable_id,
+        platform=share.platform,
+        count=1
+    )
+    return statement.on_conflict_do_update(
+        index_elements=[ShareCounter.shareable_type, ShareCounter.shareable_id, ShareCounter.platform],
+        set_={"count": ShareCounter.count + 1},
+    )
+
+
 class SharingService:
     def __init__(self, db: Session):
         self.db = db
@@ -22,17 +57,18 @@ class SharingService:
         if not shareable:
             raise ValueError(f"Shareable object not found: {shareable_type} {shareable_id}")
 
-        share_url = self._generate_share_url(shareable_type, shareable_id, platform)
-        
         share = Share(
             user_id=user_id,
             shareable_type=shareable_type,
             shareable_id=shareable_id,
-            platform=platform,
-            share_url=share_url
+            platform=platform
         )
         
         self.db.add(share)
+        # The id names the short link the platform URL points at
+        self.db.flush()
+        share.share_url = self._generate_share_url(share.id, platform)
+        self.db.execute(_count_share(share, self.db.get_bind().dialect.name))
         self.db.commit()
         self.db.refresh(share)
         return share
@@ -42,17 +78,17 @@ class SharingService:
         if shareable_type == ShareableType.BLOOD_REQUEST:
             return self.db.query(BloodDonationRequest).get(shareable_id)
         elif shareable_type == ShareableType.BLOOD_LISTING:
-            return self.db.query(BloodDonationListing).get(shareable_id)
+            # Blood listings are stored as blood donation requests
+            return self.db.query(BloodDonationRequest).get(shareable_id)
         elif shareable_type == ShareableType.DEVICE_LISTING:
             return self.db.query(AssistiveDeviceListing).get(shareable_id)
         elif shareable_type == ShareableType.CAREGIVER_LISTING:
             return self.db.query(CaregiverListing).get(shareable_id)
         return None
 
-    def _generate_share_url(self, shareable_type: ShareableType, shareable_id: int, platform: str) -> str:
-        """Generate share URL based on platform"""
-        base_path = self._get_base_path(shareable_type)
-        content_url = f"{self.base_url}/{base_path}/{shareable_id}"
+    def _generate_share_url(self, share_id: int, platform: str) -> str:
+        """Generate share URL based on platform, pointing at the share's short link"""
+        content_url = short_url(share_id)
         
         if platform == "facebook":
             return f"https://www.facebook.com/sharer/sharer.php?u={urllib.parse.quote(content_url)}"
@@ -65,32 +101,32 @@ class SharingService:
         else:
             return content_url
 
-    def _get_base_path(self, shareable_type: ShareableType) -> str:
-        """Get the base path for the shareable type"""
-        paths = {
-            ShareableType.BLOOD_REQUEST: "blood-donation/requests",
-            ShareableType.BLOOD_LISTING: "blood-donation/listings",
-            ShareableType.DEVICE_LISTING: "assistive-devices/listings",
-            ShareableType.CAREGIVER_LISTING: "caregivers/listings"
-        }
-        return paths.get(shareable_type, "")
-
     def get_share_stats(self, shareable_type: ShareableType, shareable_id: int) -> dict:
-        """Get sharing statistics for a shareable object"""
-        shares = self.db.query(Share).filter(
-            Share.shareable_type == shareable_type,
-            Share.shareable_id == shareable_id
-        ).all()
-        
-        platform_stats = {}
-        for share in shares:
-            platform_stats[share.platform] = platform_stats.get(share.platform, 0) + 1
-        
+        """Get sharing statistics for a shareable object, from its share counters"""
+        rows = self.db.execute(select(ShareCounter.platform, ShareCounter.count).where(
+            ShareCounter.shareable_type == shareable_type,
+            ShareCounter.shareable_id == shareable_id
+        )).all()
+        platform_stats = {platform: count for platform, count in rows if count}
         return {
-            "total_shares": len(shares),
+            "total_shares": sum(platform_stats.values()),
             "platform_stats": platform_stats
         }
 
+    def rebuild_share_counters(self) -> int:
+        """
+        Recount every share counter from the shares table with one GROUP BY, for a
+        backfill or after counters drifted. Returns the number of counters written.
+        """
+        self.db.execute(delete(ShareCounter))
+        result = self.db.execute(insert(ShareCounter).from_select(
+            ["shareable_type", "shareable_id", "platform", "count"],
+            select(Share.shareable_type, Share.shareable_id, Share.platform, func.count())
+            .group_by(Share.shareable_type, Share.shareable_id, Share.platform)
+        ))
+        self.db.commit()
+        return result.rowcount
+
     def get_user_shares(
         self,
         user_id: int,
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.sharing import Share, ShareClickCounter
+
+# Short links (/s/{code}) for shares. A code is the share id scrambled by an odd
+# multiplier modulo 2**32, so consecutive shares don't get consecutive codes, written
+# in base 62: at most six characters, and decoding it needs no lookup table.
+# Redirects resolve codes from an in-process LRU and count clicks in memory; the
+# counts are written to share_click_counters in one upsert every few seconds.
+
+ALPHABET = "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_INDEX = {c: i for i, c in enumerate(ALPHABET)}
+_MODULUS = 2 ** 32
+_MULTIPLIER = 0x9E3779B1
+_INVERSE = pow(_MULTIPLIER, -1, _MODULUS)
+MAX_CODE_LENGTH = 6
+
+
+def encode_share_id(share_id: int) -> str:
+    n = share_id * _MULTIPLIER % _MODULUS
+    code = ""
+    while True:
+        n, digit = divmod(n, 62)
+        code = ALPHABET[digit] + code
+        if not n:
+            return code
+
+
+def decode_code(code: str) -> Optional[int]:
+    """The share id behind a code, or None if it isn't one"""
+    if not code or len(code) > MAX_CODE_LENGTH:
+        return None
+    n = 0
+    for c in code:
+        digit = _INDEX.get(c)
+        if digit is None:
+            return None
+        n = n * 62 + digit
+    if n >= _MODULUS:
+        return None
+    share_id = n * _INVERSE % _MODULUS
+    # Only the canonical spelling of a code is accepted
+    return share_id if 0 < share_id < 2 ** 31 and encode_share_id(share_id) == code else None
+
+
+def short_url(share_id: int) -> str:
+    return f"{settings.SHORT_LINK_BASE_URL}/s/{encode_share_id(share_id)}"
+
+
+class ShortLinkCache:
+    """Bounded LRU of share id -> redirect target. Shares never change, so entries don't expire."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[int, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, share_id: int) -> Optional[str]:
+        with self._lock:
+            target = self._entries.get(share_id)
+            if target is not None:
+                self._entries.move_to_end(share_id)
+            return target
+
+    def set(self, share_id: int, target: str) -> None:
+        with self._lock:
+            self._entries[share_id] = target
+            self._entries.move_to_end(share_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class ClickBuffer:
+    """
+    Per-process click counts since the last flush. Recording a click is a dict
+    update; a background task writes the counts with one batched upsert per interval.
+    """
+
+    def __init__(self, flush_seconds: float):
+        self.flush_seconds = flush_seconds
+        self._counts: dict[int, int] = {}
+        self._last_clicked: dict[int, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.flushed = 0
+        self.failures = 0
+
+    def add(self, share_id: int) -> None:
+        self._counts[share_id] = self._counts.get(share_id, 0) + 1
+        self._last_clicked[share_id] = datetime.now(timezone.utc)
+
+    async def flush(self) -> int:
+        """Write the buffered counts; on failure they are kept for the next flush"""
+        if not self._counts:
+            return 0
+        counts, self._counts = self._counts, {}
+        last_clicked, self._last_clicked = self._last_clicked, {}
+        try:
+            async with AsyncSessionLocal() as db:
+                dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+                statement = dialect.insert(ShareClickCounter).values([
+                    {"share_id": share_id, "clicks": n, "last_clicked_at": last_clicked[share_id]}
+                    for share_id, n in sorted(counts.items())
+                ])
+                await db.execute(statement.on_conflict_do_update(
+                    index_elements=[ShareClickCounter.share_id],
+                    set_={
+                        "clicks": ShareClickCounter.clicks + statement.excluded.clicks,
+                        "last_clicked_at": statement.excluded.last_clicked_at,
+                    },
+                ))
+                await db.commit()
+        except Exception as e:
+            print(f"Share click flush failed, keeping {len(counts)} counts: {e}")
+            self.failures += 1
+            for share_id, n in counts.items():
+                self._counts[share_id] = self._counts.get(share_id, 0) + n
+                self._last_clicked.setdefault(share_id, last_clicked[share_id])
+            return 0
+        self.flushed += sum(counts.values())
+        return len(counts)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "pending_shares": len(self._counts),
+            "pending_clicks": sum(self._counts.values()),
+            "flushed_clicks": self.flushed,
+            "failed_flushes": self.failures,
+        }
+
+
+short_link_cache = ShortLinkCache(max_entries=settings.SHORT_LINK_CACHE_MAX_ENTRIES)
+click_buffer = ClickBuffer(flush_seconds=settings.SHARE_CLICK_FLUSH_SECONDS)
+
+
+async def resolve_short_link(code: str) -> Optional[str]:
+    """
+    The redirect target of a short link and count the click, or None for an
+    unknown code. Only a cache miss touches the database, with a primary key read.
+    """
+    share_id = decode_code(code)
+    if share_id is None:
+        return None
+    target = short_link_cache.get(share_id)
+    if target is None:
+        from app.services.sharing import content_url
+
+        async with AsyncSessionLocal() as db:
+            share = (await db.execute(
+                select(Share.shareable_type, Share.shareable_id).where(Share.id == share_id)
+            )).first()
+        if share is None:
+            return None
+        target = content_url(share.shareable_type, share.shareable_id)
+        short_link_cache.set(share_id, target)
+    click_buffer.add(share_id)
+    return target
@@ -0,0 +1,356 @@
+"""
+Latency, throughput and SQL statement counts for every API route.
+
+Seeds a throwaway database at each dataset size (rows in each of the large
+tables, see app.db.seed.VOLUMES for the mix), then drives every route in
+api_router in-process through the ASGI app and reports p50/p95/p99 latency,
+requests per second and the statements each request ran (X-DB-Query-Count).
+
+    python -m benchmarks.endpoints --rows 10000 100000 --output bench.json
+    python -m benchmarks.endpoints --rows 10000 --compare bench.json
+
+Data is generated from a fixed random seed and routes run in a fixed order, so
+two runs on the same machine and database are comparable. --compare reads the
+JSON of an earlier run and exits non-zero when a route got slower than
+--threshold (p95) or started running more statements. Latency varies between
+machines; query counts do not, so those are worth checking in CI.
+
+Set BENCH_DATABASE_URI to run against Postgres instead of a temp SQLite file.
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+BENCH_DB = os.environ.get("BENCH_DATABASE_URI") or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'accessshare_endpoints.db')}"
+os.environ["SQLALCHEMY_DATABASE_URI"] = BENCH_DB
+os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+# Statement counts come from the X-DB-* headers
+os.environ["QUERY_STATS_ENABLED"] = "true"
+
+import httpx  # noqa: E402
+from fastapi.routing import APIRoute  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+
+from app.api.api_v1.api import api_router  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.db.session import engine, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.assistive_device import AssistiveDeviceListing, AssistiveDeviceRequest, AssistiveDeviceResponse  # noqa: E402
+from app.models.blood_donation import BloodDonationRequest  # noqa: E402
+from app.models.caregiver import CaregiverListing, CaregiverRequest, CaregiverResponse, CaregiverReview  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.db.seed import SEED_PASSWORD as PASSWORD, VOLUMES  # noqa: E402
+from benchmarks.explain_plans import EMAIL, seed  # noqa: E402
+
+# Seeding at scale 1 puts this many rows in each large table
+BASE_ROWS = VOLUMES["blood_donation_requests"]
+
+
+@dataclass
+class Case:
+    """How to call one route; body and params are built per iteration"""
+    params: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+    body: Optional[Callable[[int, dict], dict]] = None
+    # Path parameter -> (model, owner column or None, newest first); the route is
+    # called with a different existing id on each iteration
+    ids: dict = field(default_factory=dict)
+    # Fewer iterations for routes dominated by bcrypt
+    requests: Optional[int] = None
+    skip: Optional[str] = None
+
+
+LIST_PARAMS = {"limit": 20, "include_total": "false"}
+
+# Rows that request bodies point at (a listing to request, a request to respond to)
+REFERENCES = {
+    "blood_requests": BloodDonationRequest,
+    "device_listings": AssistiveDeviceListing,
+    "device_requests": AssistiveDeviceRequest,
+    "caregiver_listings": CaregiverListing,
+    "caregiver_requests": CaregiverRequest,
+}
+
+
+def ref(ctx: dict, name: str, i: int) -> int:
+    ids = ctx["references"][name]
+    return ids[i % len(ids)]
+
+
+CASES = {
+    ("POST", "/auth/register"): Case(body=lambda i, ctx: {
+        "email": f"bench-register-{ctx['run']}-{i}@example.com", "username": f"bench-register-{i}", "password": PASSWORD}, requests=10),
+    ("POST", "/auth/login"): Case(body=lambda i, ctx: {"email": EMAIL, "password": PASSWORD}, requests=10),
+    ("POST", "/auth/refresh"): Case(body=lambda i, ctx: {"refresh_token": ctx["refresh_token"]}),
+    ("DELETE", "/auth/delete-account"): Case(skip="deletes the bench user"),
+    ("POST", "/users/register"): Case(body=lambda i, ctx: {
+        "email": f"bench-users-{ctx['run']}-{i}@example.com", "username": f"bench-users-{i}", "password": PASSWORD}, requests=10),
+    ("PUT", "/users/me"): Case(body=lambda i, ctx: {"full_name": f"Bench User {i}"}),
+    ("GET", "/users/{user_id}"): Case(ids={"user_id": (User, None, False)}),
+    ("POST", "/users/me/change-password"): Case(
+        body=lambda i, ctx: {"current_password": PASSWORD, "new_password": PASSWORD}, requests=5),
+    ("POST", "/blood-donation/requests"): Case(body=lambda i, ctx: {
+        "blood_type": "O-", "location": "Mumbai, 3", "latitude": 19.1, "longitude": 72.9, "urgency": "High", "contact_number": "555-0100"}),
+    ("GET", "/blood-donation/requests"): Case(params=LIST_PARAMS),
+    ("GET", "/blood-donation/requests/compatible"): Case(params={**LIST_PARAMS, "blood_type": "O-"}),
+    ("GET", "/blood-donation/requests/{request_id}"): Case(ids={"request_id": (BloodDonationRequest, "user_id", False)}),
+    ("POST", "/blood-donation/responses"): Case(body=lambda i, ctx: {"request_id": ref(ctx, "blood_requests", i), "message": "I can donate"}),
+    ("DELETE", "/blood-donation/requests/{request_id}"): Case(ids={"request_id": (BloodDonationRequest, "user_id", True)}),
+    ("PATCH", "/blood-donation/requests/{request_id}/status"): Case(
+        params={"status": "unavailable"}, ids={"request_id": (BloodDonationRequest, "user_id", False)}),
+    ("POST", "/devices/listings"): Case(body=lambda i, ctx: {
+        "device_name": "folding wheelchair", "device_type": "mobility", "condition": "good", "description": "lightweight folding wheelchair",
+        "location": "Pune, 4", "contact_info": "555-0100"}),
+    ("GET", "/devices/listings/{listing_id}"): Case(ids={"listing_id": (AssistiveDeviceListing, "donor_id", False)}),
+    ("PATCH", "/devices/listings/{listing_id}/status"): Case(
+        headers={"status": "available"}, ids={"listing_id": (AssistiveDeviceListing, "donor_id", False)}),
+    ("POST", "/devices/requests"): Case(body=lambda i, ctx: {"listing_id": ref(ctx, "device_listings", i), "message": "I need this"}),
+    ("GET", "/devices/requests/{request_id}"): Case(ids={"request_id": (AssistiveDeviceRequest, "receiver_id", False)}),
+    ("POST", "/devices/responses"): Case(body=lambda i, ctx: {
+        "request_id": ref(ctx, "device_requests", i), "listing_id": ref(ctx, "device_listings", i), "message": "It is yours", "status": "pending"}),
+    ("GET", "/devices/responses/{response_id}"): Case(ids={"response_id": (AssistiveDeviceResponse, "donor_id", False)}),
+    ("PUT", "/devices/responses/{response_id}/status"): Case(
+        params={"status": "accepted"}, ids={"response_id": (AssistiveDeviceResponse, "donor_id", False)}),
+    ("POST", "/devices/reviews"): Case(body=lambda i, ctx: {"listing_id": ref(ctx, "device_listings", i), "rating": 4, "comment": "Works well"}),
+    ("POST", "/caregivers/listings"): Case(body=lambda i, ctx: {
+        "service_type": "Medical Care", "experience_level": "Experienced (5-10 years)", "hourly_rate": 20, "description": "night nurse for elderly care",
+        "location": "Delhi, 7", "contact_info": "555-0100"}),
+    ("GET", "/caregivers/listings/{listing_id}"): Case(ids={"listing_id": (CaregiverListing, "caregiver_id", False)}),
+    ("PATCH", "/caregivers/listings/{listing_id}/status"): Case(
+        params={"status": "available"}, ids={"listing_id": (CaregiverListing, "caregiver_id", False)}),
+    ("POST", "/caregivers/requests"): Case(body=lambda i, ctx: {
+        "service_type": "Medical Care", "location": "Delhi, 7", "contact_info": "555-0100", "description": "need help", "status": "pending"}),
+    ("GET", "/caregivers/requests/{request_id}"): Case(ids={"request_id": (CaregiverRequest, "receiver_id", False)}),
+    ("POST", "/caregivers/responses"): Case(body=lambda i, ctx: {
+        "listing_id": ref(ctx, "caregiver_listings", i), "request_id": ref(ctx, "caregiver_requests", i), "status": "accepted", "message": "I can help"}),
+    ("GET", "/caregivers/responses/{response_id}"): Case(ids={"response_id": (CaregiverResponse, "caregiver_id", False)}),
+    ("PUT", "/caregivers/responses/{response_id}/status"): Case(
+        params={"status": "accepted"}, ids={"response_id": (CaregiverResponse, "caregiver_id", False)}),
+    ("POST", "/caregivers/reviews"): Case(body=lambda i, ctx: {"listing_id": ref(ctx, "caregiver_listings", i), "rating": 5, "comment": "Very kind"}),
+    ("GET", "/caregivers/reviews/{review_id}"): Case(ids={"review_id": (CaregiverReview, "reviewer_id", False)}),
+    # Never completes; see benchmarks/notification_stream.py
+    ("GET", "/notifications/stream"): Case(skip="streaming endpoint"),
+}
+
+
+def routes() -> list[tuple[str, str, Case]]:
+    """(method, path, case) for every route in api_router, in declaration order"""
+    found = []
+    for route in api_router.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in sorted(route.methods):
+            case = CASES.get((method, route.path))
+            if case is None:
+                # Plain list and read routes need nothing beyond paging parameters
+                has_path_params = "{" in route.path
+                case = Case(params=LIST_PARAMS) if method == "GET" and not has_path_params else Case(skip="no benchmark case")
+            found.append((method, route.path, case))
+    return found
+
+
+def prepare(rows: int) -> dict:
+    """Seed the dataset; returns the run context"""
+    seed(rows / BASE_ROWS)
+    with engine.connect() as connection:
+        user_id = connection.execute(select(User.id).where(User.email == EMAIL)).scalar_one()
+    references = {name: lookup_ids(model, None, False, user_id, 1000) for name, model in REFERENCES.items()}
+    return {"user_id": user_id, "run": rows, "references": references}
+
+
+def lookup_ids(model, owner: Optional[str], newest_first: bool, user_id: int, count: int) -> list[int]:
+    query = select(model.id)
+    if owner:
+        query = query.where(getattr(model, owner) == user_id)
+    query = query.order_by(model.id.desc() if newest_first else model.id).limit(count)
+    with engine.connect() as connection:
+        return list(connection.execute(query).scalars())
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_route(client, method: str, path: str, case: Case, ctx: dict, requests: int, warmup: int, concurrency: int) -> dict:
+    total = warmup + (case.requests or requests)
+    ids = {name: lookup_ids(model, owner, newest, ctx["user_id"], total) for name, (model, owner, newest) in case.ids.items()}
+    if not all(ids.values()):
+        return {"method": method, "path": path, "skipped": "no rows owned by the bench user"}
+
+    def request(i: int):
+        url = "/api/v1" + path.format(**{name: values[i % len(values)] for name, values in ids.items()})
+        kwargs = {"params": case.params, "headers": {"X-User-Email": EMAIL, **case.headers}}
+        if case.body:
+            kwargs["json"] = case.body(i, ctx)
+        return client.request(method, url, **kwargs)
+
+    for i in range(warmup):
+        await request(i)
+
+    timings, queries, errors = [], [], {}
+    next_iteration = warmup
+
+    async def worker():
+        nonlocal next_iteration
+        while next_iteration < total:
+            i = next_iteration
+            next_iteration += 1
+            start = time.perf_counter()
+            response = await request(i)
+            timings.append((time.perf_counter() - start) * 1000)
+            queries.append(int(response.headers.get("X-DB-Query-Count", 0)))
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    timings.sort()
+    return {
+        "method": method,
+        "path": path,
+        "requests": len(timings),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "throughput_rps": round(len(timings) / elapsed, 1),
+        "queries": statistics.median(queries),
+        "max_queries": max(queries),
+        "errors": errors,
+    }
+
+
+async def run_size(rows: int, requests: int, warmup: int, concurrency: int, only: Optional[str]) -> list[dict]:
+    ctx = prepare(rows)
+    results = []
+    # Server errors are counted per route rather than aborting the run
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        with contextlib.redirect_stdout(io.StringIO()):
+            login = await client.post("/api/v1/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        login.raise_for_status()
+        ctx["refresh_token"] = login.json()["refresh_token"]
+
+        for method, path, case in routes():
+            if only and only not in path:
+                continue
+            if case.skip:
+                result = {"method": method, "path": path, "skipped": case.skip}
+            else:
+                # The endpoints print debug output on every call
+                with contextlib.redirect_stdout(io.StringIO()):
+                    result = await run_route(client, method, path, case, ctx, requests, warmup, concurrency)
+            results.append(result)
+            print_result(result)
+    # Pooled connections belong to this event loop, close them before it ends
+    await async_engine.dispose()
+    return results
+
+
+def print_result(result: dict) -> None:
+    label = f"{result['method']} {result['path']}"
+    if "skipped" in result:
+        print(f"  {label:<52} skipped: {result['skipped']}")
+        return
+    errors = ", ".join(f"{n}x {code}" for code, n in sorted(result["errors"].items()))
+    print(
+        f"  {label:<52} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f} "
+        f"{result['throughput_rps']:>8.1f} {result['queries']:>6g}  {errors}"
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: dict, baseline: dict, threshold: float, min_delta_ms: float) -> int:
+    """Print per-route changes against a baseline report; returns the number of regressions"""
+    previous = {
+        (size["rows"], r["method"], r["path"]): r
+        for size in baseline["sizes"] for r in size["routes"] if "skipped" not in r
+    }
+    regressions = 0
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} (p95 threshold {threshold:.0%}):")
+    for size in report["sizes"]:
+        for r in size["routes"]:
+            before = previous.get((size["rows"], r["method"], r["path"]))
+            if before is None or "skipped" in r:
+                continue
+            delta = r["p95_ms"] - before["p95_ms"]
+            slower = delta > min_delta_ms and delta > before["p95_ms"] * threshold
+            more_queries = r["queries"] > before["queries"]
+            if slower or more_queries:
+                regressions += 1
+                print(
+                    f"  REGRESSION {size['rows']:>8} {r['method']} {r['path']}: p95 {before['p95_ms']:.2f} -> {r['p95_ms']:.2f} ms, "
+                    f"queries {before['queries']:g} -> {r['queries']:g}"
+                )
+    if not regressions:
+        print("  no regressions")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000], help="Dataset sizes, rows per large table")
+    parser.add_argument("--requests", type=int, default=50, help="Timed requests per route")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1, help="Requests in flight at once")
+    parser.add_argument("--route", help="Only benchmark routes whose path contains this")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="JSON from an earlier run to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative p95 increase counted as a regression")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore p95 increases smaller than this")
+    args = parser.parse_args()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "database": async_engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "version": settings.VERSION,
+        },
+        "sizes": [],
+    }
+    for rows in args.rows:
+        print(f"\n{rows} rows per table ({async_engine.dialect.name})")
+        print(f"  {'route':<52} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'SQL':>6}")
+        routes_run = asyncio.run(run_size(rows, args.requests, args.warmup, args.concurrency, args.route))
+        report["sizes"].append({"rows": rows, "routes": routes_run})
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Query plan check for the list endpoints.
+
+Seeds a throwaway database with realistic volumes, calls every list endpoint
+(with its common filters) through the ASGI app, captures the SELECTs each one
+runs and EXPLAINs them. Exits non-zero if any plan reads a large table with a
+sequential scan, so a missing or unusable index fails loudly.
+
+    python -m benchmarks.explain_plans --scale 1
+
+Set BENCH_DATABASE_URI to check Postgres plans (what production runs); without
+it a temp SQLite file is used, which checks index coverage but not the planner's
+cost decisions. Search and fuzzy location cases only run on Postgres.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+BENCH_DB = os.environ.get("BENCH_DATABASE_URI") or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'accessshare_explain.db')}"
+os.environ["SQLALCHEMY_DATABASE_URI"] = BENCH_DB
+os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+
+import httpx  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.seed import plan_counts, seed_database  # noqa: E402
+from app.db.session import engine, async_engine, AsyncSessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.notification import NotificationService  # noqa: E402
+
+# The most active seeded user (owner ranks are Zipf distributed)
+EMAIL = "user1@example.com"
+
+# (label, path, params); every list endpoint with its common filters
+CASES = [
+    ("blood requests", "/api/v1/blood-donation/requests", {}),
+    ("blood requests by type", "/api/v1/blood-donation/requests", {"blood_type": "O-"}),
+    ("blood requests by status", "/api/v1/blood-donation/requests", {"status": "reserved"}),
+    ("my blood requests", "/api/v1/blood-donation/requests", {"is_mine": "true"}),
+    ("blood requests near", "/api/v1/blood-donation/requests", {"near": "19.08,72.88", "radius_km": 10}),
+    ("compatible blood requests", "/api/v1/blood-donation/requests/compatible", {"blood_type": "AB+"}),
+    ("blood responses", "/api/v1/blood-donation/responses", {}),
+    ("device listings", "/api/v1/devices/listings", {}),
+    ("device listings by type", "/api/v1/devices/listings", {"device_type": "hearing"}),
+    ("device listings by availability", "/api/v1/devices/listings", {"available": "taken"}),
+    ("my device listings", "/api/v1/devices/listings", {"is_mine": "true"}),
+    ("device requests", "/api/v1/devices/requests", {}),
+    ("device responses", "/api/v1/devices/responses", {}),
+    ("device reviews", "/api/v1/devices/reviews", {}),
+    ("caregiver listings", "/api/v1/caregivers/listings", {}),
+    ("caregiver listings by service", "/api/v1/caregivers/listings", {"service_type": "Medical Care"}),
+    ("my caregiver listings", "/api/v1/caregivers/listings", {"is_mine": "true"}),
+    ("caregiver requests", "/api/v1/caregivers/requests", {}),
+    ("caregiver responses", "/api/v1/caregivers/responses", {}),
+    ("caregiver reviews", "/api/v1/caregivers/reviews", {}),
+]
+
+POSTGRES_CASES = [
+    ("device listings search", "/api/v1/devices/listings", {"search": "portable oxygen concentrator"}),
+    ("caregiver listings search", "/api/v1/caregivers/listings", {"search": "night nurse"}),
+    ("blood requests fuzzy location", "/api/v1/blood-donation/requests", {"location": "Mumbay", "location_match": "fuzzy"}),
+    ("device listings location prefix", "/api/v1/devices/listings", {"location": "Pun", "location_match": "prefix"}),
+]
+
+
+def seed(scale: float) -> dict[str, int]:
+    """Recreate the schema and fill every table; returns the row count per table"""
+    counts = plan_counts(scale)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    seed_database(engine, counts)
+    return counts
+
+
+def seq_scanned_tables(dialect: str, plan_rows) -> list[str]:
+    """Tables read by a sequential scan in an EXPLAIN result"""
+    if dialect == "postgresql":
+        found = []
+
+        def walk(node):
+            if node.get("Node Type") == "Seq Scan":
+                found.append(node["Relation Name"])
+            for child in node.get("Plans", []):
+                walk(child)
+
+        plan = plan_rows[0][0]
+        walk((json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"])
+        return found
+    # SQLite: "SCAN <table>" without an index is a full table scan
+    return [
+        row[3].split()[1] for row in plan_rows
+        if row[3].startswith("SCAN ") and "USING" not in row[3] and not row[3].startswith("SCAN CONSTANT")
+    ]
+
+
+async def explain(statement: str, parameters) -> list[str]:
+    dialect = async_engine.dialect.name
+    prefix = "EXPLAIN (FORMAT JSON) " if dialect == "postgresql" else "EXPLAIN QUERY PLAN "
+    async with async_engine.connect() as connection:
+        rows = (await connection.exec_driver_sql(prefix + statement, parameters)).all()
+    return seq_scanned_tables(dialect, rows)
+
+
+async def capture(run) -> list[tuple]:
+    """The SELECT statements (with parameters) issued while awaiting run()"""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await run()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", record)
+    return statements
+
+
+async def check_plans(counts: dict[str, int], min_rows: int, verbose: bool) -> int:
+    large = {table for table, n in counts.items() if n >= min_rows}
+    cases = CASES + (POSTGRES_CASES if async_engine.dialect.name == "postgresql" else [])
+    # A route that fails while building its response has still run its queries
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    failures = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def run_case(path, params):
+            response = await client.get(path, params={"limit": 20, "include_total": "false", **params},
+                                        headers={"X-User-Email": EMAIL})
+            if response.status_code >= 400:
+                print(f"      {path} returned {response.status_code}")
+
+        runs = [(label, lambda p=path, q=params: run_case(p, q)) for label, path, params in cases]
+
+        async def unread_notifications():
+            async with AsyncSessionLocal() as db:
+                await NotificationService(db).get_user_notifications(1, limit=20, unread_only=True)
+
+        async def all_notifications():
+            async with AsyncSessionLocal() as db:
+                await NotificationService(db).get_user_notifications(1, limit=20)
+
+        async def unread_count():
+            async with AsyncSessionLocal() as db:
+                await NotificationService(db).get_unread_count(1)
+
+        runs += [("unread notifications", unread_notifications), ("notifications", all_notifications),
+                 ("unread count", unread_count)]
+
+        for label, run in runs:
+            bad = []
+            statements = await capture(run)
+            for statement, parameters in statements:
+                scanned = [t for t in await explain(statement, parameters) if t in large]
+                if scanned:
+                    bad.append((statement, scanned))
+            status = "FAIL" if bad else "ok"
+            print(f"{status:>4}  {label:<34} {len(statements)} statement(s)")
+            for statement, scanned in bad:
+                print(f"      seq scan on {', '.join(scanned)}: {' '.join(statement.split())[:300]}")
+            if verbose and not bad:
+                for statement, _ in statements:
+                    print(f"      {' '.join(statement.split())[:200]}")
+            failures += bool(bad)
+    await async_engine.dispose()
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier for the seeded row counts")
+    parser.add_argument("--min-rows", type=int, default=5000, help="Tables with at least this many rows must not be seq scanned")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    counts = seed(args.scale)
+    failures = asyncio.run(check_plans(counts, args.min_rows, args.verbose))
+    print(f"{failures} case(s) with sequential scans on large tables" if failures else "All plans use indexes")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
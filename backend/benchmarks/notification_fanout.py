@@ -0,0 +1,69 @@
+"""
+Time to notify N users: create_notification per user vs create_notifications_bulk.
+
+    python -m benchmarks.notification_fanout --recipients 100 1000 5000
+
+Set BENCH_DATABASE_URI to run against Postgres instead of a temp SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+BENCH_DB = os.environ.get("BENCH_DATABASE_URI") or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'accessshare_fanout.db')}"
+os.environ["SQLALCHEMY_DATABASE_URI"] = BENCH_DB
+os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+
+from sqlalchemy import delete, func, select  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.seed import plan_counts, seed_database  # noqa: E402
+from app.db.session import engine, async_engine, AsyncSessionLocal  # noqa: E402
+from app.models.notification import Notification, NotificationCounter, NotificationType  # noqa: E402
+from app.services.notification import NotificationService  # noqa: E402
+
+
+async def fan_out(recipients: list[int], bulk: bool) -> float:
+    async with AsyncSessionLocal() as db:
+        await db.execute(delete(Notification))
+        await db.execute(delete(NotificationCounter))
+        await db.commit()
+        service = NotificationService(db)
+        start = time.perf_counter()
+        if bulk:
+            await service.create_notifications_bulk(recipients, NotificationType.BLOOD_REQUEST, "Urgent: O- needed", "A nearby patient needs O- blood")
+        else:
+            for user_id in recipients:
+                await service.create_notification(user_id, NotificationType.BLOOD_REQUEST, "Urgent: O- needed", "A nearby patient needs O- blood")
+        elapsed = time.perf_counter() - start
+        assert await db.scalar(select(func.count()).select_from(Notification)) == len(recipients)
+    return elapsed
+
+
+async def run(sizes: list[int]) -> None:
+    print(f"{'recipients':>10} {'per row s':>10} {'bulk s':>10} {'speedup':>8}")
+    for size in sizes:
+        recipients = list(range(1, size + 1))
+        one_by_one = await fan_out(recipients, bulk=False)
+        bulk = await fan_out(recipients, bulk=True)
+        print(f"{size:>10} {one_by_one:>10.2f} {bulk:>10.3f} {one_by_one / bulk:>7.0f}x")
+    # Pooled connections belong to this event loop, close them before it ends
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--recipients", type=int, nargs="+", default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    counts = {table: 0 for table in plan_counts()}
+    counts["users"] = max(args.recipients)
+    seed_database(engine, counts)
+    asyncio.run(run(args.recipients))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Load test for /notifications/stream: many idle connections on one worker.
+
+Runs the app under uvicorn in this process, opens --connections idle streams
+from a child process, and reports the worker's memory per open stream, whether
+heartbeats arrive, and how long a notification sent to every connected user
+takes to reach all of them.
+
+    python -m benchmarks.notification_stream --connections 5000
+
+Set BENCH_DATABASE_URI to run against Postgres, where delivery goes through
+LISTEN/NOTIFY as it does with several workers; without it a temp SQLite file and
+the in-process broker are used.
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DB = os.environ.get("BENCH_DATABASE_URI") or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'accessshare_stream.db')}"
+
+
+def raise_fd_limit() -> int:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+# Client side (child process)
+
+async def open_stream(port: int, token: str, stats: dict) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET /api/v1/notifications/stream HTTP/1.1\r\nHost: bench\r\n"
+        f"Authorization: Bearer {token}\r\nAccept: text/event-stream\r\n\r\n".encode()
+    )
+    await writer.drain()
+    status = await reader.readline()
+    if b" 200 " not in status:
+        stats["failed"] += 1
+        writer.close()
+        return
+    stats["connected"] += 1
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        if line.startswith(b": ping"):
+            stats["heartbeats"] += 1
+        elif line.startswith(b"event: notification"):
+            stats["received"] += 1
+            stats["arrivals"].append(time.time())
+        elif line.startswith(b"event: resync"):
+            stats["resyncs"] += 1
+
+
+async def run_clients(port: int, tokens: list[str], connections: int) -> None:
+    stats = {"connected": 0, "failed": 0, "heartbeats": 0, "received": 0, "resyncs": 0, "arrivals": []}
+    streams = []
+    # Connect in batches so the listen backlog isn't overrun
+    for start in range(0, connections, 200):
+        batch = [
+            asyncio.create_task(open_stream(port, tokens[i % len(tokens)], stats))
+            for i in range(start, min(start + 200, connections))
+        ]
+        streams += batch
+        while stats["connected"] + stats["failed"] < len(streams):
+            await asyncio.sleep(0.01)
+    print(json.dumps({"ready": stats["connected"], "failed": stats["failed"]}), flush=True)
+
+    loop = asyncio.get_running_loop()
+    # Each line on stdin asks for the stats so far
+    while await loop.run_in_executor(None, sys.stdin.readline):
+        print(json.dumps(stats), flush=True)
+        stats["arrivals"] = []
+    for stream in streams:
+        stream.cancel()
+
+
+def client_main(args) -> None:
+    raise_fd_limit()
+    with open(args.tokens) as f:
+        tokens = json.load(f)
+    asyncio.run(run_clients(args.port, tokens, args.connections))
+
+
+# Server side
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct))] if values else 0.0
+
+
+async def run_server(args, user_ids: list[int], tokens_file: str) -> None:
+    import uvicorn
+    from app.db.session import async_engine, AsyncSessionLocal
+    from app.main import app
+    from app.models.notification import NotificationType
+    from app.services.notification import NotificationService
+    from app.services.notification_broker import notification_broker
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096,
+                                            timeout_graceful_shutdown=1))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    baseline = rss_kb()
+    client = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.notification_stream", "--client",
+        "--port", str(port), "--connections", str(args.connections), "--tokens", tokens_file,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, limit=2 ** 24,
+    )
+
+    async def client_stats() -> dict:
+        client.stdin.write(b"stats\n")
+        await client.stdin.drain()
+        return json.loads(await client.stdout.readline())
+
+    start = time.perf_counter()
+    ready = json.loads(await client.stdout.readline())
+    connect_s = time.perf_counter() - start
+    opened = notification_broker.stats()["connections"]
+    per_connection = (rss_kb() - baseline) / max(opened, 1)
+    print(f"streams open         {opened} ({ready['failed']} refused) in {connect_s:.1f}s")
+    print(f"worker RSS           {baseline / 1024:.0f} MB idle, {rss_kb() / 1024:.0f} MB with streams open, "
+          f"{per_connection:.1f} KB per stream")
+
+    # Stay idle past a couple of heartbeats
+    before = await client_stats()
+    await asyncio.sleep(args.heartbeat * 2.5)
+    idle = await client_stats()
+    heartbeats = idle["heartbeats"] - before["heartbeats"]
+    print(f"heartbeats           {heartbeats / max(idle['connected'], 1):.1f} per stream "
+          f"over {args.heartbeat * 2.5:.0f}s idle (every {args.heartbeat:g}s)")
+
+    # One notification to every connected user
+    published = time.time()
+    async with AsyncSessionLocal() as db:
+        created = await NotificationService(db).create_notifications_bulk(
+            user_ids, NotificationType.SYSTEM, "Scheduled maintenance", "AccessShare will be briefly unavailable tonight"
+        )
+    commit_ms = (time.time() - published) * 1000
+    deadline = time.time() + 30
+    while True:
+        delivered = await client_stats()
+        if delivered["received"] >= ready["ready"] or time.time() > deadline:
+            break
+        await asyncio.sleep(0.25)
+    latencies = [(arrival - published) * 1000 for arrival in delivered["arrivals"]]
+    print(f"fan-out              {created} notifications created and committed in {commit_ms:.0f} ms")
+    print(f"delivered            {delivered['received']} of {ready['ready']} streams, "
+          f"p50 {percentile(latencies, 0.5):.0f} ms, p99 {percentile(latencies, 0.99):.0f} ms, "
+          f"last {max(latencies, default=0):.0f} ms after publishing")
+    print(f"broker               {json.dumps(notification_broker.stats())}")
+
+    client.stdin.close()
+    await client.wait()
+    server.should_exit = True
+    await serving
+    await async_engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--users", type=int, help="Distinct users behind the connections (default: one per connection)")
+    parser.add_argument("--heartbeat", type=float, default=2.0, help="Heartbeat interval in seconds")
+    parser.add_argument("--client", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--tokens", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.client:
+        return client_main(args)
+
+    hard = raise_fd_limit()
+    if args.connections + 100 > hard:
+        parser.error(f"--connections needs more than the {hard} open files allowed here")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = BENCH_DB
+    os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+    os.environ["NOTIFICATION_STREAM_HEARTBEAT_SECONDS"] = str(args.heartbeat)
+    os.environ["NOTIFICATION_STREAM_MAX_CONNECTIONS"] = str(args.connections)
+
+    from sqlalchemy import select
+    from app.core.security import ACCESS_TOKEN, create_token
+    from app.db.base import Base
+    from app.db.seed import plan_counts, seed_database
+    from app.db.session import engine
+    from app.models.user import User
+
+    users = args.users or args.connections
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    counts = {table: 0 for table in plan_counts()}
+    counts["users"] = users
+    seed_database(engine, counts)
+    with engine.connect() as connection:
+        rows = connection.execute(select(User.id, User.email, User.role, User.token_version).order_by(User.id)).all()
+    tokens = [
+        create_token({"sub": row.id, "email": row.email, "role": row.role, "ver": row.token_version or 0}, ACCESS_TOKEN, 3600)
+        for row in rows
+    ]
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+        json.dump(tokens, f)
+    try:
+        asyncio.run(run_server(args, [row.id for row in rows], f.name))
+    finally:
+        os.unlink(f.name)
+
+
+if __name__ == "__main__":
+    main()
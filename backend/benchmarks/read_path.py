@@ -0,0 +1,94 @@
+"""
+GET latency of the blood-request list as the table grows.
+
+Seeds a throwaway database with N blood requests for each size, then times
+GET /blood-donation/requests with a fixed page size. The list path is a pure read, so latency should stay flat
+across sizes instead of growing with the table.
+
+    python -m benchmarks.read_path --sizes 1000 10000 100000
+
+Set BENCH_DATABASE_URI to run against Postgres instead of a temp SQLite file.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+BENCH_DB = os.environ.get("BENCH_DATABASE_URI") or f"sqlite:///{os.path.join(tempfile.gettempdir(), 'accessshare_bench.db')}"
+os.environ["SQLALCHEMY_DATABASE_URI"] = BENCH_DB
+os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+
+import httpx  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.session import engine, async_engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.blood_donation import BloodDonationRequest, rank_of_urgency  # noqa: E402
+from app.models.user import User  # noqa: E402
+from app.models import notification, sharing  # noqa: E402,F401 - register all tables
+
+EMAIL = "bench@example.com"
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+
+
+def seed(size: int, batch_size: int = 10000) -> None:
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        user_id = connection.execute(
+            insert(User).values(email=EMAIL, username="bench", hashed_password="x", full_name="Bench").returning(User.id)
+        ).scalar_one()
+        for start in range(0, size, batch_size):
+            rows = [
+                {
+                    "blood_type": BLOOD_TYPES[i % len(BLOOD_TYPES)],
+                    "location": f"City {i % 50}",
+                    "urgency": "High",
+                    "urgency_rank": rank_of_urgency("High"),
+                    "contact_number": "555-0100",
+                    "user_id": user_id,
+                    "status": "available",
+                }
+                for i in range(start, min(start + batch_size, size))
+            ]
+            connection.execute(insert(BloodDonationRequest), rows)
+
+
+async def time_requests(path: str, params: dict, requests: int, warmup: int = 5) -> list[float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        headers = {"X-User-Email": EMAIL}
+        for _ in range(warmup):
+            (await client.get(path, params=params, headers=headers)).raise_for_status()
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path, params=params, headers=headers)
+            timings.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    # Pooled connections belong to this event loop, close them before it ends
+    await async_engine.dispose()
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    params = {"limit": args.limit, "include_total": "false"}
+    print(f"{'rows':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for size in args.sizes:
+        seed(size)
+        timings = asyncio.run(time_requests("/api/v1/blood-donation/requests", params, args.requests))
+        p95 = statistics.quantiles(timings, n=20)[-1]
+        print(f"{size:>10} {statistics.median(timings):>10.2f} {p95:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
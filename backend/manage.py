@@ -1,9 +1,11 @@
 # Python imports
 import os
+import subprocess
 import sys
 import time
 
 # External imports
+from typing import List, Optional
 import asyncio
 import typer
 import uvicorn
@@ -94,11 +96,177 @@ def migrate(revision: str = "head"):
     typer.echo("Migrations applied successfully!")
 
 
+@app.command("backfill-timestamps")
+def backfill_timestamps(batch_size: int = 1000, pause: float = 0.0):
+    """
+    Fill NULL updated_at values left by legacy rows.
+    Rows are updated in bounded batches, each in its own transaction, so the
+    command can run against a live database without long locks.
+    """
+    from app.db.base import Base
+    import app.models.notification  # noqa: F401 - register notification tables
+
+    tables = [t for t in Base.metadata.sorted_tables if "updated_at" in t.c and "created_at" in t.c]
+    for table in tables:
+        with sync_engine.connect() as connection:
+            remaining = connection.execute(
+                text(f"SELECT count(*) FROM {table.name} WHERE updated_at IS NULL")
+            ).scalar()
+        if not remaining:
+            typer.echo(f"{table.name}: nothing to backfill")
+            continue
+
+        typer.echo(f"{table.name}: backfilling {remaining} rows")
+        done = 0
+        while True:
+            with sync_engine.begin() as connection:
+                updated = connection.execute(
+                    text(
+                        f"UPDATE {table.name} SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP) "
+                        f"WHERE id IN (SELECT id FROM {table.name} WHERE updated_at IS NULL LIMIT :batch_size)"
+                    ),
+                    {"batch_size": batch_size},
+                ).rowcount
+            if not updated:
+                break
+            done += updated
+            typer.echo(f"  {table.name}: {done}/{remaining}")
+            if pause:
+                time.sleep(pause)
+    typer.echo("Timestamp backfill complete!")
+
+
+@app.command("rebuild-share-counters")
+def rebuild_share_counters():
+    """
+    Recount the per-platform share counters from the shares table.
+    Counters are kept up to date as shares are created; this is for a backfill or
+    repair, and is one GROUP BY over shares in a single transaction.
+    """
+    from app.db.session import SessionLocal
+    from app.services.sharing import SharingService
+
+    with SessionLocal() as db:
+        written = SharingService(db).rebuild_share_counters()
+    typer.echo(f"Share counters rebuilt: {written} counters.")
+
+
+@app.command("calibrate-passwords")
+def calibrate_passwords(samples: int = 15):
+    """
+    Measure the bcrypt cost for PASSWORD_HASH_ROUNDS: the highest one under
+    PASSWORD_HASH_TARGET_MS on this machine, from the median of several timings.
+    Run it on a production host and set the printed value for every worker.
+    """
+    from app.core.passwords import password_hasher
+
+    rounds = password_hasher.calibrate(
+        settings.PASSWORD_HASH_TARGET_MS,
+        settings.PASSWORD_HASH_MIN_ROUNDS,
+        settings.PASSWORD_HASH_MAX_ROUNDS,
+        samples=samples,
+    )
+    typer.echo(f"PASSWORD_HASH_ROUNDS={rounds}")
+
+
+@app.command()
+def seed(
+    scale: float = typer.Option(1.0, help="Multiplier for the default row counts (app.db.seed.VOLUMES)"),
+    rows: List[str] = typer.Option([], help="Per-table row count, e.g. --rows notifications=5000000; repeatable"),
+    reset: bool = typer.Option(False, help="Empty the tables first instead of refusing when they hold data"),
+    random_seed: int = typer.Option(42, help="Same seed and sizes, same data"),
+    batch_size: int = typer.Option(50000, help="Rows generated and written per batch"),
+):
+    """
+    Fill the database with synthetic data at production scale.
+    Owners, locations and types are Zipf-skewed; rows are written with COPY on
+    Postgres and batched executemany on SQLite. Every seeded user's password is
+    'password'. Run migrations first.
+    """
+    from app.db.seed import existing_rows, plan_counts, seed_database, truncate
+
+    try:
+        counts = plan_counts(scale, {table: int(n) for table, n in (item.split("=", 1) for item in rows)})
+    except ValueError as e:
+        typer.echo(f"Invalid --rows: {e}")
+        sys.exit(1)
+
+    if reset:
+        typer.echo("Emptying tables...")
+        truncate(sync_engine)
+    else:
+        found = existing_rows(sync_engine)
+        if found:
+            typer.echo(f"Tables already hold data ({', '.join(f'{t}: {n}' for t, n in found.items())}). Pass --reset to empty them first.")
+            sys.exit(1)
+
+    typer.echo(f"Seeding {sum(counts.values())} rows...")
+    started = time.time()
+    seed_database(sync_engine, counts, seed=random_seed, batch_size=batch_size, log=typer.echo)
+    elapsed = time.time() - started
+    typer.echo(f"Seeded {sum(counts.values())} rows in {elapsed:.1f}s ({sum(counts.values()) / elapsed:,.0f} rows/s)")
+
+
+@app.command("notifications-archive")
+def notifications_archive(
+    months: Optional[int] = typer.Option(None, help="Whole months to keep before the current one (default: NOTIFICATION_RETENTION_MONTHS)"),
+    action: str = typer.Option(settings.NOTIFICATION_RETENTION_ACTION, help="'detach' keeps old partitions as notifications_archive_* tables, 'drop' removes them"),
+    output_dir: Optional[str] = typer.Option(None, help="Write each retired month to this directory as gzipped CSV first"),
+    dry_run: bool = typer.Option(False, help="Only list what would be retired"),
+    batch_size: int = typer.Option(10000, help="Rows deleted per transaction when the table is not partitioned"),
+):
+    """
+    Create the upcoming monthly notification partitions and retire the months
+    older than the retention window. Without partitions (SQLite, or Postgres before
+    the partitioning migration) old rows are deleted in batches instead, so only
+    --action drop applies. Unread counters are adjusted for what is removed.
+    """
+    from app.db.partitions import ensure_partitions, is_partitioned
+    from app.services.notification_archive import archive_notifications, maintenance_lock
+
+    with maintenance_lock(sync_engine) as locked:
+        if not locked:
+            typer.echo("Another process is maintaining notification partitions, try again later.")
+            sys.exit(1)
+        if not dry_run:
+            with sync_engine.begin() as connection:
+                if is_partitioned(connection):
+                    for name in ensure_partitions(connection, settings.NOTIFICATION_PARTITION_MONTHS_AHEAD):
+                        typer.echo(f"Created partition {name}")
+        months = months if months is not None else settings.NOTIFICATION_RETENTION_MONTHS
+        if months is None:
+            typer.echo("No retention window: pass --months or set NOTIFICATION_RETENTION_MONTHS.")
+            return
+        try:
+            archive_notifications(
+                sync_engine, months, action, output_dir=output_dir, dry_run=dry_run, batch_size=batch_size, log=typer.echo
+            )
+        except ValueError as e:
+            typer.echo(str(e))
+            sys.exit(1)
+    typer.echo("Notification archive complete!")
+
+
+@app.command(context_settings={"allow_extra_args": True, "ignore_unknown_options": True, "help_option_names": []})
+def bench(ctx: typer.Context):
+    """
+    Benchmark every API route against seeded datasets (benchmarks/endpoints.py).
+    Options are passed through, e.g. `manage.py bench --rows 10000 100000 --output bench.json`.
+    Runs against BENCH_DATABASE_URI or a temp SQLite file, never the configured database.
+    """
+    # A separate process, so the benchmark can point the app at its own database
+    # before the settings are loaded
+    result = subprocess.run([sys.executable, "-m", "benchmarks.endpoints", *ctx.args], cwd=BASE_DIR)
+    sys.exit(result.returncode)
+
+
 @app.command()
-def runserver(host: str = "0.0.0.0", port: int = 8000, reload: bool = True):
+def runserver(host: str = "0.0.0.0", port: int = 8000, reload: bool = True, graceful_timeout: int = 5):
     """Run the FastAPI server."""
     typer.echo(f"Starting server at http://{host}:{port}")
-    uvicorn.run("app.main:app", host=host, port=port, reload=reload)
+    # Notification streams never finish on their own; without a timeout shutdown
+    # would wait on them forever. Clients reconnect and resume from Last-Event-ID.
+    uvicorn.run("app.main:app", host=host, port=port, reload=reload, timeout_graceful_shutdown=graceful_timeout)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+# Settings are read at import time: point the app at a throwaway SQLite file and
+# turn the count and result caches off, so every request really queries; query
+# stats are on for the budget tests
+DATABASE = os.path.join(tempfile.mkdtemp(), "accessshare_test.db")
+os.environ.update({
+    "PROJECT_NAME": "Access Share",
+    "VERSION": "test",
+    "API_V1_STR": "/api/v1",
+    "POSTGRES_SERVER": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_DB": "test",
+    "BACKEND_CORS_ORIGINS": "[]",
+    "SECRET_KEY": "test-secret-key",
+    "QUERY_STATS_ENABLED": "true",
+    "SQLALCHEMY_DATABASE_URI": f"sqlite:///{DATABASE}",
+    "COUNT_CACHE_TTL_SECONDS": "0",
+    "RESULT_CACHE_TTL_SECONDS": "{}",
+})
+os.environ.pop("SQLALCHEMY_ASYNC_DATABASE_URI", None)
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.core.security import ACCESS_TOKEN, create_token
+from app.db.base import Base
+from app.db.seed import plan_counts, seed_database
+from app.db.session import engine
+from app.main import app
+from app.models.user import User
+
+
+@pytest.fixture(scope="session")
+def seeded():
+    Base.metadata.create_all(engine)
+    seed_database(engine, plan_counts(0.01))
+    yield
+    engine.dispose()
+    os.unlink(DATABASE)
+
+
+@pytest.fixture(scope="session")
+def client(seeded):
+    # Not entered as a context manager, so the lifespan (outbox worker, partition
+    # maintenance, hash calibration) stays off
+    return TestClient(app)
+
+
+def _headers(offset: int) -> dict:
+    with engine.connect() as connection:
+        user = connection.execute(select(User.id, User.email, User.role).order_by(User.id).offset(offset).limit(1)).one()
+    token = create_token({"sub": user.id, "email": user.email, "role": user.role, "ver": 0}, ACCESS_TOKEN, 3600)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(scope="session")
+def auth_headers(seeded):
+    return _headers(0)
+
+
+@pytest.fixture(scope="session")
+def other_headers(seeded):
+    """A second user, for reads that skip or check the first one's rows"""
+    return _headers(1)
+
+
+@pytest.fixture
+def fresh_db(tmp_path):
+    """
+    An empty database of its own holding users 1-3, for tests that check exact
+    counters: (sync engine, async session factory)
+    """
+    path = tmp_path / "fresh.db"
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as connection:
+        connection.execute(insert(User), [
+            {"id": i, "email": f"fresh{i}@example.com", "username": f"fresh{i}", "hashed_password": "x"}
+            for i in (1, 2, 3)
+        ])
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    yield sync_engine, async_sessionmaker(async_engine, expire_on_commit=False)
+    asyncio.run(async_engine.dispose())
+    sync_engine.dispose()
@@ -0,0 +1,60 @@
+from app.models.blood_donation import URGENCY_RANK
+
+
+def _request(client, auth_headers, urgency: str, blood_type: str = "AB-") -> dict:
+    request = {"blood_type": blood_type, "location": "Pune", "urgency": urgency, "contact_number": "555-0100"}
+    response = client.post("/api/v1/blood-donation/requests", json=request, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _walk(client, headers, blood_type: str, limit: int) -> list[dict]:
+    items, cursor = [], None
+    while True:
+        params = {"blood_type": blood_type, "limit": limit, "include_total": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/blood-donation/requests/compatible", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items += page["items"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            return items
+
+
+def test_compatible_requests_most_urgent_first_across_cursor_pages(client, auth_headers, other_headers):
+    low, high, medium = (_request(client, auth_headers, urgency) for urgency in ("Low", "High", "Medium"))
+    # O+ can't give to A-, and only available requests are offered
+    mismatch = _request(client, auth_headers, "High", blood_type="A-")
+
+    offset_page = client.get("/api/v1/blood-donation/requests/compatible",
+                             params={"blood_type": "O+", "limit": 10000}, headers=other_headers).json()
+    walked = _walk(client, other_headers, "O+", limit=7)
+    assert [item["id"] for item in walked] == [item["id"] for item in offset_page["items"]]
+    assert len(walked) == offset_page["total"]
+
+    ranks = [URGENCY_RANK[item["urgency"]] for item in walked]
+    assert ranks == sorted(ranks)
+    assert {item["blood_type"] for item in walked} <= {"O+", "A+", "B+", "AB+"}
+    assert {item["status"] for item in walked} == {"available"}
+    assert mismatch["id"] not in {item["id"] for item in walked}
+
+    # O- gives to every type; urgency outranks recency
+    walked = _walk(client, other_headers, "O-", limit=50)
+    ids = [item["id"] for item in walked]
+    assert ids.index(high["id"]) < ids.index(medium["id"]) < ids.index(low["id"])
+    assert len(ids) == len(set(ids))
+
+
+def test_compatible_requests_leave_out_the_donors_own(client, auth_headers):
+    own = _request(client, auth_headers, "High")
+    walked = _walk(client, auth_headers, "O-", limit=100)
+    assert own["id"] not in {item["id"] for item in walked}
+
+
+def test_compatible_cursor_from_another_ordering_is_rejected(client, auth_headers, other_headers):
+    page = client.get("/api/v1/blood-donation/requests", params={"limit": 1}, headers=auth_headers).json()
+    params = {"blood_type": "O-", "cursor": page["next_cursor"]}
+    response = client.get("/api/v1/blood-donation/requests/compatible", params=params, headers=other_headers)
+    assert response.status_code == 400
@@ -0,0 +1,95 @@
+import uuid
+from app.core.config import settings
+from app.core.result_cache import result_cache
+from app.core.security import ACCESS_TOKEN, create_token
+
+
+def _listing(client, auth_headers, location: str = "Pune") -> dict:
+    listing = {"device_name": "Bath lift", "device_type": "Bathroom", "condition": "Good",
+               "description": "Battery powered", "location": location, "contact_info": "555-0100"}
+    response = client.post("/api/v1/devices/listings", json=listing, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_detail_answers_304_until_the_row_changes(client, auth_headers):
+    listing = _listing(client, auth_headers)
+    url = f"/api/v1/devices/listings/{listing['id']}"
+    first = client.get(url, headers=auth_headers)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and etag.startswith('W/"')
+
+    again = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b"" and again.headers["etag"] == etag
+    # Weak comparison, and any of a list
+    assert client.get(url, headers={**auth_headers, "If-None-Match": f'"other", {etag.removeprefix("W/")}'}).status_code == 304
+
+    changed = client.patch(f"{url}/status", headers={**auth_headers, "status": "reserved"})
+    assert changed.status_code == 200
+    after = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.json()["available"] == "reserved"
+    assert after.headers["etag"] != etag
+
+
+def test_304_only_for_rows_the_user_may_see(client, auth_headers):
+    request = {"blood_type": "B+", "location": "Pune", "urgency": "Low", "contact_number": "555-0100"}
+    created = client.post("/api/v1/blood-donation/requests", json=request, headers=auth_headers).json()
+    url = f"/api/v1/blood-donation/requests/{created['id']}"
+    token = create_token({"sub": created["user_id"] + 1, "email": "donor@example.com", "role": "donor", "ver": 0}, ACCESS_TOKEN, 3600)
+    donor_headers = {"Authorization": f"Bearer {token}"}
+
+    # A donor may see an open request, so their copy can be current
+    etag = client.get(url, headers=donor_headers).headers["etag"]
+    assert client.get(url, headers={**donor_headers, "If-None-Match": etag}).status_code == 304
+
+    # Once it is reserved the donor gets the usual 403, not a 304 for the stale copy
+    assert client.patch(f"{url}/status", params={"status": "reserved"}, headers=auth_headers).status_code == 200
+    assert client.get(url, headers={**donor_headers, "If-None-Match": etag}).status_code == 403
+    assert client.get(url, headers={**donor_headers, "If-None-Match": "*"}).status_code == 403
+    owner = client.get(url, headers={**auth_headers, "If-None-Match": etag})
+    assert owner.status_code == 200 and owner.json()["status"] == "reserved"
+
+
+def test_list_etag_changes_with_its_rows(client, auth_headers):
+    town = f"Etag {uuid.uuid4().hex[:8]}"
+    _listing(client, auth_headers, town)
+    params = {"location": town}
+    first = client.get("/api/v1/devices/listings", params=params, headers=auth_headers)
+    etag = first.headers["etag"]
+    assert first.json()["total"] == 1
+
+    response = client.get("/api/v1/devices/listings", params=params, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+    added = _listing(client, auth_headers, town)
+    response = client.get("/api/v1/devices/listings", params=params, headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["total"] == 2 and response.json()["items"][0]["id"] == added["id"]
+    assert response.headers["etag"] != etag
+
+
+def test_cached_list_pages_keep_their_etag(client, auth_headers, monkeypatch):
+    monkeypatch.setitem(settings.RESULT_CACHE_TTL_SECONDS, "devices.listings", 30.0)
+    town = f"Etag {uuid.uuid4().hex[:8]}"
+    _listing(client, auth_headers, town)
+    params = {"location": town}
+
+    def hits():
+        return result_cache.stats()["routes"].get("devices.listings", {}).get("hits", 0)
+
+    first = client.get("/api/v1/devices/listings", params=params, headers=auth_headers)
+    before = hits()
+    cached = client.get("/api/v1/devices/listings", params=params, headers=auth_headers)
+    assert hits() == before + 1
+    assert cached.headers["etag"] == first.headers["etag"]
+    assert cached.json()["items"] == first.json()["items"] and cached.json()["total_source"] == "cached"
+    # From the cache as well
+    response = client.get("/api/v1/devices/listings", params=params, headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+    assert response.status_code == 304 and hits() == before + 2
+
+    # A write retires the page
+    _listing(client, auth_headers, town)
+    response = client.get("/api/v1/devices/listings", params=params, headers={**auth_headers, "If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200 and response.json()["total"] == 2
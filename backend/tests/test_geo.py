@@ -0,0 +1,63 @@
+import math
+import pytest
+from app.db.geo import KM_PER_DEGREE_LAT, bounding_box
+
+# Point Nemo: no seeded listing is anywhere near it
+NEMO = (-48.8767, -123.3933)
+
+
+def _device(client, auth_headers, **fields) -> dict:
+    listing = {
+        "device_name": "Shower chair", "device_type": "Bathroom", "condition": "Good",
+        "description": "Adjustable height", "location": "At sea", "contact_info": "555-0100", **fields,
+    }
+    response = client.post("/api/v1/devices/listings", json=listing, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _offset(lat: float, lon: float, north_km: float, east_km: float) -> tuple[float, float]:
+    return (lat + north_km / KM_PER_DEGREE_LAT,
+            lon + east_km / (KM_PER_DEGREE_LAT * math.cos(math.radians(lat))))
+
+
+def _near(client, auth_headers, lat, lon, radius_km):
+    params = {"near": f"{lat},{lon}", "radius_km": radius_km}
+    response = client.get("/api/v1/devices/listings", params=params, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["items"]
+
+
+def test_near_returns_rows_within_radius_nearest_first(client, auth_headers):
+    ids = {}
+    for name, north_km, east_km in [("far", 30, 0), ("here", 0, 0), ("close", 0, -10), ("outside", 80, 0),
+                                    # Inside the bounding box but ~57 km away, past the corner of the circle
+                                    ("corner", 40, 40)]:
+        lat, lon = _offset(*NEMO, north_km, east_km)
+        ids[_device(client, auth_headers, latitude=lat, longitude=lon)["id"]] = name
+    _device(client, auth_headers)  # no coordinates
+
+    items = _near(client, auth_headers, *NEMO, 50)
+    assert [ids[item["id"]] for item in items] == ["here", "close", "far"]
+
+
+def test_near_wraps_the_antimeridian(client, auth_headers):
+    east = _device(client, auth_headers, latitude=-60.0, longitude=179.95)
+    west = _device(client, auth_headers, latitude=-60.0, longitude=-179.95)
+
+    items = _near(client, auth_headers, -60.0, 179.99, 20)
+    assert [item["id"] for item in items] == [east["id"], west["id"]]
+
+
+def test_bounding_box_encloses_the_circle():
+    min_lat, max_lat, min_lon, max_lon = bounding_box(45.0, 10.0, 100)
+    assert max_lat - 45.0 == pytest.approx(100 / KM_PER_DEGREE_LAT)
+    # Degrees of longitude shrink with latitude, so the box is wider than it is tall
+    assert max_lon - 10.0 == pytest.approx((max_lat - 45.0) / math.cos(math.radians(45.0)))
+    assert 10.0 - min_lon == pytest.approx(max_lon - 10.0)
+
+
+def test_near_rejects_invalid_points(client, auth_headers):
+    for near in ["48.8", "91,0", "north,west"]:
+        response = client.get("/api/v1/devices/listings", params={"near": near}, headers=auth_headers)
+        assert response.status_code == 400
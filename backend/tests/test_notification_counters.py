@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timedelta
+from sqlalchemy import func, insert, select
+from app.models.notification import Notification, NotificationCounter, NotificationType
+from app.services.notification import NotificationService
+from app.services.notification_archive import archive_notifications
+
+
+def _counters(engine) -> dict[int, int]:
+    with engine.connect() as connection:
+        return dict(connection.execute(select(NotificationCounter.user_id, NotificationCounter.unread_count)).all())
+
+
+def _unread(engine) -> dict[int, int]:
+    with engine.connect() as connection:
+        return dict(connection.execute(
+            select(Notification.user_id, func.count()).where(Notification.is_read == False).group_by(Notification.user_id)
+        ).all())
+
+
+def test_unread_counter_follows_create_and_read(fresh_db):
+    engine, Session = fresh_db
+
+    async def scenario():
+        async with Session() as db:
+            service = NotificationService(db)
+            first = await service.create_notification(1, NotificationType.DEVICE_REQUEST, "New request", "One")
+            second = await service.create_notification(1, NotificationType.DEVICE_REQUEST, "New request", "Two")
+            await service.create_notification(1, NotificationType.DEVICE_REQUEST, "New request", "Three")
+            assert await service.create_notifications_bulk([1, 2, 2, 3], NotificationType.SYSTEM, "Hello", "Welcome") == 3
+            assert _counters(engine) == {1: 4, 2: 1, 3: 1}
+
+            await service.mark_as_read(first.id, 1)
+            # Reading it again, or someone else's, leaves the counter alone
+            await service.mark_as_read(first.id, 1)
+            await service.mark_as_read(second.id, 2)
+            assert await service.get_unread_count(1) == 3
+
+            await service.mark_all_as_read(1)
+            assert await service.get_unread_count(1) == 0
+            assert await service.get_unread_count(2) == 1
+
+    asyncio.run(scenario())
+    assert _counters(engine) == {1: 0, 2: 1, 3: 1}
+    assert _counters(engine) == {1: 0, **_unread(engine)}
+
+
+def test_deleting_old_notifications_subtracts_the_unread_ones(fresh_db):
+    engine, Session = fresh_db
+    now = datetime(2026, 6, 15)
+    old, recent = now - timedelta(days=200), now - timedelta(days=10)
+    rows = [(1, old, False), (1, old, False), (1, old, True), (1, recent, False), (2, old, True), (2, recent, False)]
+    with engine.begin() as connection:
+        connection.execute(insert(Notification), [
+            {"user_id": user_id, "type": NotificationType.SYSTEM, "title": "t", "message": "m", "is_read": is_read, "created_at": created_at}
+            for user_id, created_at, is_read in rows
+        ])
+        connection.execute(insert(NotificationCounter), [{"user_id": 1, "unread_count": 3}, {"user_id": 2, "unread_count": 1}])
+
+    deleted = archive_notifications(engine, retention_months=3, action="drop", batch_size=2, now=now, log=lambda _: None)
+    assert deleted == 4
+    assert _counters(engine) == {1: 1, 2: 1} == _unread(engine)
@@ -0,0 +1,90 @@
+import asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, insert, select
+from app.core.config import settings
+from app.core.passwords import password_hasher
+from app.main import app, partition_maintenance
+from app.models.notification import Notification, NotificationCounter, NotificationOutbox, NotificationType
+from app.models.user import pwd_context
+from app.services import notification_outbox
+from app.services.notification import NotificationService
+from app.services.notification_outbox import OutboxWorker, outbox_worker
+from app.services.short_links import click_buffer
+
+
+def _enqueue(engine, *user_ids: int) -> None:
+    # Written with the sync engine, which leaves foreign keys unchecked, so an
+    # entry can point at a user that doesn't exist
+    with engine.begin() as connection:
+        connection.execute(insert(NotificationOutbox), [
+            {"user_id": user_id, "type": NotificationType.SYSTEM, "title": "Hi", "message": f"For {user_id}"}
+            for user_id in user_ids
+        ])
+
+
+def _notified(engine) -> list[int]:
+    with engine.connect() as connection:
+        return list(connection.execute(select(Notification.user_id).order_by(Notification.id)).scalars())
+
+
+def test_deliver_outbox_moves_the_oldest_entries_into_notifications(fresh_db):
+    engine, Session = fresh_db
+    _enqueue(engine, 1, 2, 1)
+
+    async def scenario():
+        async with Session() as db:
+            delivered = await NotificationService(db).deliver_outbox(limit=2, max_attempts=3)
+            assert [entry.user_id for entry in delivered] == [1, 2]
+        assert _notified(engine) == [1, 2]
+        async with Session() as db:
+            assert len(await NotificationService(db).deliver_outbox(limit=10, max_attempts=3)) == 1
+            assert await NotificationService(db).deliver_outbox(limit=10, max_attempts=3) == []
+
+    asyncio.run(scenario())
+    assert _notified(engine) == [1, 2, 1]
+    with engine.connect() as connection:
+        assert connection.execute(select(func.count()).select_from(NotificationOutbox)).scalar() == 0
+        assert dict(connection.execute(select(NotificationCounter.user_id, NotificationCounter.unread_count)).all()) == {1: 2, 2: 1}
+
+
+def test_worker_isolates_failing_entries_and_gives_up_after_max_attempts(fresh_db, monkeypatch):
+    engine, Session = fresh_db
+    # The worker's own sessions check foreign keys, so the entry for user 999 fails
+    event.listen(Session.kw["bind"].sync_engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys = ON"))
+    monkeypatch.setattr(notification_outbox, "AsyncSessionLocal", Session)
+    _enqueue(engine, 1, 999, 2)
+    worker = OutboxWorker(batch_size=10, poll_seconds=60, max_attempts=2)
+
+    async def scenario():
+        # The batch fails as a whole and nothing of it is kept; entry by entry,
+        # the good ones go through once and the bad one counts an attempt
+        assert await worker.drain_once() == 2
+        assert _notified(engine) == [1, 2]
+        assert await worker.drain_once() == 0
+        assert await worker.drain_once() == 0
+        return await worker.stats()
+
+    stats = asyncio.run(scenario())
+    assert _notified(engine) == [1, 2]
+    assert worker.failures == 2
+    assert stats["pending"] == 0 and stats["dead"] == 1 and stats["delivered"] == 2
+    with engine.connect() as connection:
+        entry = connection.execute(select(NotificationOutbox)).one()
+    assert entry.user_id == 999 and entry.attempts == 2
+    assert "FOREIGN KEY" in entry.last_error
+
+
+def test_lifespan_starts_and_stops_the_background_services(seeded, monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 4)
+    monkeypatch.setattr(settings, "NOTIFICATION_OUTBOX_ENABLED", True)
+    monkeypatch.setattr(password_hasher, "rounds", password_hasher.rounds)
+    original = pwd_context.to_dict()
+    try:
+        with TestClient(app):
+            assert password_hasher.rounds == 4
+            for service in (outbox_worker, partition_maintenance, click_buffer):
+                assert service._task is not None and not service._task.done()
+        for service in (outbox_worker, partition_maintenance, click_buffer):
+            assert service._task is None
+    finally:
+        pwd_context.load(original)
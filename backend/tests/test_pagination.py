@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+from sqlalchemy import Column, DateTime, Integer, create_engine, select
+from sqlalchemy.orm import DeclarativeBase, Session
+from app.core.pagination import encode_cursor, keyset_filter, keyset_order
+
+
+class _Base(DeclarativeBase):
+    pass
+
+
+class Row(_Base):
+    __tablename__ = "rows"
+    id = Column(Integer, primary_key=True)
+    created_at = Column(DateTime, nullable=True)
+    rank = Column(Integer, nullable=False, default=0)
+
+
+def test_keyset_pages_cover_null_and_dated_rows_once():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        session.add_all(Row(id=i, created_at=None if i % 3 == 0 else start + timedelta(days=i % 5)) for i in range(1, 31))
+        session.commit()
+
+        expected = list(session.scalars(keyset_order(select(Row), Row)))
+        seen, cursor = [], None
+        while True:
+            query = keyset_order(select(Row), Row)
+            if cursor:
+                query = keyset_filter(query, Row, cursor)
+            page = list(session.scalars(query.limit(4)))
+            if not page:
+                break
+            seen += page
+            cursor = encode_cursor(page[-1].created_at, page[-1].id)
+
+    assert [row.id for row in seen] == [row.id for row in expected]
+    assert len(seen) == 30
+    # Undated rows lead, as on Postgres
+    assert all(row.created_at is None for row in seen[:10])
+
+
+def test_ranked_keyset_pages_follow_the_rank_first():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1)
+    with Session(engine) as session:
+        session.add_all(
+            Row(id=i, rank=i % 3, created_at=None if i % 7 == 0 else start + timedelta(days=i % 4))
+            for i in range(1, 41)
+        )
+        session.commit()
+
+        seen, cursor = [], None
+        while True:
+            query = keyset_order(select(Row), Row, Row.rank)
+            if cursor:
+                query = keyset_filter(query, Row, cursor, Row.rank)
+            page = list(session.scalars(query.limit(6)))
+            if not page:
+                break
+            seen += page
+            cursor = encode_cursor(page[-1].created_at, page[-1].id, page[-1].rank)
+
+    assert len({row.id for row in seen}) == len(seen) == 40
+    assert [row.rank for row in seen] == sorted(row.rank for row in seen)
+    for rank in range(3):
+        dated = [row for row in seen if row.rank == rank and row.created_at is not None]
+        assert [(row.created_at, row.id) for row in dated] == sorted(((row.created_at, row.id) for row in dated), reverse=True)
@@ -0,0 +1,36 @@
+from app.core.config import settings
+from app.core.passwords import PasswordHasher, stored_rounds
+from app.models.user import pwd_context
+
+
+def hash_with(rounds: int) -> str:
+    return pwd_context.copy(bcrypt__rounds=rounds).hash("secret")
+
+
+def test_only_hashes_below_the_configured_cost_are_rehashed(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", 6)
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    assert stored_rounds(hash_with(5)) == 5
+    assert hasher.needs_rehash(hash_with(5))
+    assert not hasher.needs_rehash(hash_with(6))
+    # A worker that calibrated lower never weakens a stronger hash
+    assert not hasher.needs_rehash(hash_with(8))
+
+
+def test_without_pinned_rounds_only_hashes_below_the_minimum_are_rehashed(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_ROUNDS", None)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_MIN_ROUNDS", 5)
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    assert hasher.needs_rehash(hash_with(4))
+    assert not hasher.needs_rehash(hash_with(5))
+    assert not hasher.needs_rehash(hash_with(7))
+
+
+def test_calibration_stays_within_bounds():
+    hasher = PasswordHasher(workers=1, max_queue=0)
+    original = pwd_context.to_dict()
+    try:
+        assert hasher.calibrate(target_ms=0.001, min_rounds=4, max_rounds=6, samples=3) == 4
+        assert hasher.calibrate(target_ms=60000, min_rounds=4, max_rounds=6, samples=3) == 6
+    finally:
+        pwd_context.load(original)
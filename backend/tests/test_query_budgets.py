@@ -0,0 +1,43 @@
+"""
+Query budgets for the list endpoints. A page must cost a fixed number of
+statements whatever its size; a relationship or property loaded per row shows
+up as a repeated statement shape and fails the budget.
+"""
+import pytest
+from app.core.query_stats import assert_query_budget, query_budget
+
+# (path, params, statements: COUNT, page, and any selectinload)
+LIST_BUDGETS = [
+    ("/api/v1/caregivers/listings", {}, 3),
+    ("/api/v1/caregivers/listings", {"min_rating": 1}, 3),
+    ("/api/v1/caregivers/listings", {"include_total": "false"}, 2),
+    ("/api/v1/blood-donation/requests", {}, 2),
+    ("/api/v1/blood-donation/requests", {"status": "available"}, 2),
+    ("/api/v1/blood-donation/requests/compatible", {"blood_type": "O-"}, 2),
+    ("/api/v1/devices/listings", {}, 2),
+]
+
+
+@pytest.mark.parametrize("path,params,budget", LIST_BUDGETS)
+def test_list_query_budget(client, auth_headers, path, params, budget):
+    response = client.get(path, params={"limit": 50, **params}, headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()["items"]) > 1
+    assert_query_budget(response, budget)
+
+
+def test_caregiver_listings_serialize_caregiver_and_rating(client, auth_headers):
+    with query_budget(3) as stats:
+        response = client.get("/api/v1/caregivers/listings", params={"limit": 100}, headers=auth_headers)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert all(item["caregiver"]["id"] == item["caregiver_id"] for item in items)
+    assert any(item["rating"] is not None for item in items)
+    assert stats.count == int(response.headers["X-DB-Query-Count"])
+
+
+def test_caregiver_listing_detail_query_budget(client, auth_headers):
+    listing_id = client.get("/api/v1/caregivers/listings", params={"limit": 1}, headers=auth_headers).json()["items"][0]["id"]
+    response = client.get(f"/api/v1/caregivers/listings/{listing_id}", headers=auth_headers)
+    assert response.status_code == 200
+    assert_query_budget(response, 2)
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+from app.core.result_cache import ResultCache
+
+
+class SlowRemoteBackend:
+    """Stands in for Redis: bumps are async and take a while"""
+    name = "remote"
+    remote = True
+
+    def __init__(self):
+        self.bumped: list[str] = []
+
+    async def bump(self, tables: list[str]) -> None:
+        await asyncio.sleep(0.05)
+        self.bumped += tables
+
+    def stats(self) -> dict:
+        return {}
+
+
+def test_remote_bumps_wait_for_the_event_loop():
+    backend = SlowRemoteBackend()
+    cache = ResultCache(backend)
+
+    async def scenario():
+        await cache.flush()  # a request has run on this loop
+        # The commit hook returns at once; nothing is bumped yet
+        cache.bump("caregiver_listings")
+        assert backend.bumped == []
+        # The writing request's get_async_db awaits the bump before responding
+        await cache.flush()
+        assert backend.bumped == ["caregiver_listings"]
+
+        # A sync router commits on a worker thread: the loop picks the bump up by itself
+        thread = threading.Thread(target=cache.bump, args=("users",))
+        thread.start()
+        thread.join()
+        for _ in range(50):
+            if "users" in backend.bumped:
+                break
+            await asyncio.sleep(0.01)
+        assert backend.bumped == ["caregiver_listings", "users"]
+
+        # A flush that finds the tables already taken still waits for their bump
+        cache.bump("blood_donation_requests")
+        await asyncio.sleep(0.01)  # the scheduled flush takes the table
+        await cache.flush()
+        assert backend.bumped[-1] == "blood_donation_requests"
+
+    asyncio.run(scenario())
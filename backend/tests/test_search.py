@@ -0,0 +1,87 @@
+import uuid
+
+
+def _word() -> str:
+    """A token no seeded row contains"""
+    return f"zq{uuid.uuid4().hex[:10]}"
+
+
+def _device(client, auth_headers, **fields) -> dict:
+    listing = {
+        "device_name": "Folding walker", "device_type": "Mobility", "condition": "Good",
+        "description": "Lightly used", "location": "Pune", "contact_info": "555-0100", **fields,
+    }
+    response = client.post("/api/v1/devices/listings", json=listing, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _caregiver(client, auth_headers, **fields) -> dict:
+    listing = {
+        "service_type": "Companionship", "experience_level": "Intermediate (2-5 years)", "hourly_rate": 12.5,
+        "description": "Weekday afternoons", "location": "Pune", "contact_info": "555-0100", **fields,
+    }
+    response = client.post("/api/v1/caregivers/listings", json=listing, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_device_search_matches_every_word_across_fields(client, auth_headers):
+    word, other = _word(), _word()
+    by_name = _device(client, auth_headers, device_name=f"{word.upper()} wheelchair", description=f"with {other}")
+    by_description = _device(client, auth_headers, description=f"Comes with a {word} cushion")
+    _device(client, auth_headers, description=f"Only {other} here")
+
+    page = client.get("/api/v1/devices/listings", params={"search": word}, headers=auth_headers).json()
+    assert {item["id"] for item in page["items"]} == {by_name["id"], by_description["id"]}
+    assert page["total"] == 2
+
+    # Every word has to match, in any of the search fields
+    page = client.get("/api/v1/devices/listings", params={"search": f"{word} {other}"}, headers=auth_headers).json()
+    assert [item["id"] for item in page["items"]] == [by_name["id"]]
+
+
+def test_caregiver_search_matches_description(client, auth_headers):
+    word = _word()
+    match = _caregiver(client, auth_headers, description=f"Patient and {word}")
+    _caregiver(client, auth_headers, description="Patient and kind")
+
+    page = client.get("/api/v1/caregivers/listings", params={"search": word}, headers=auth_headers).json()
+    assert [item["id"] for item in page["items"]] == [match["id"]]
+    assert word in page["items"][0]["description"]
+
+
+def test_location_match_modes(client, auth_headers):
+    town = _word().capitalize()
+    exact = _device(client, auth_headers, location=town)
+    with_state = _device(client, auth_headers, location=f"{town}, MH")
+    inside = _device(client, auth_headers, location=f"North {town}")
+    _device(client, auth_headers, location=f"{town[:-1]}x")
+
+    def ids(mode, location=town):
+        params = {"location": location, "location_match": mode}
+        response = client.get("/api/v1/devices/listings", params=params, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        return {item["id"] for item in response.json()["items"]}
+
+    assert ids("exact") == {exact["id"]}
+    # Case-insensitive starts-with
+    assert ids("prefix", town.lower()) == {exact["id"], with_state["id"]}
+    # SQLite fallback of the trigram match: the location anywhere in the column
+    assert ids("fuzzy", town.upper()) == {exact["id"], with_state["id"], inside["id"]}
+
+
+def test_location_prefix_treats_like_wildcards_literally(client, auth_headers):
+    town = _word()
+    literal = _device(client, auth_headers, location=f"{town}_%")
+    _device(client, auth_headers, location=f"{town}ab")
+
+    params = {"location": f"{town}_%", "location_match": "prefix"}
+    page = client.get("/api/v1/devices/listings", params=params, headers=auth_headers).json()
+    assert [item["id"] for item in page["items"]] == [literal["id"]]
+
+
+def test_location_match_rejects_unknown_mode(client, auth_headers):
+    params = {"location": "Pune", "location_match": "soundex"}
+    response = client.get("/api/v1/devices/listings", params=params, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,14 @@
+from datetime import datetime, timedelta
+from app.db.seed import SPAN_SECONDS, Generator, plan_counts
+
+
+def test_created_at_window_ends_at_seeding_time():
+    end = datetime(2030, 6, 1, 12, 0)
+    counts = plan_counts(0.01)
+    generator = Generator(counts, seed=1, end=end)
+    n = counts["blood_donation_requests"]
+    times = [datetime.fromisoformat(value) for value in generator.times("blood_donation_requests", 0, n)]
+
+    assert times == sorted(times)
+    assert times[0] == end - timedelta(seconds=SPAN_SECONDS)
+    assert end - timedelta(days=7) < times[-1] < end
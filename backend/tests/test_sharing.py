@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from app.models.blood_donation import BloodDonationRequest
+from app.models.sharing import ShareCounter, ShareableType
+from app.services.sharing import SharingService
+from app.services.short_links import MAX_CODE_LENGTH, click_buffer, decode_code, encode_share_id
+
+
+def _listing(client, auth_headers) -> int:
+    listing = {"device_name": "Rollator", "device_type": "Mobility", "condition": "Good",
+               "description": "With seat", "location": "Pune", "contact_info": "555-0100"}
+    response = client.post("/api/v1/devices/listings", json=listing, headers=auth_headers)
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def _share(client, headers, listing_id: int, platform: str) -> dict:
+    share = {"shareable_type": "device_listing", "shareable_id": listing_id, "platform": platform}
+    response = client.post("/api/v1/shares/", json=share, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_share_counters_add_up_per_platform(client, auth_headers, other_headers):
+    listing_id = _listing(client, auth_headers)
+    for headers, platform in [(auth_headers, "whatsapp"), (other_headers, "whatsapp"), (auth_headers, "email")]:
+        _share(client, headers, listing_id, platform)
+
+    stats = client.get(f"/api/v1/shares/stats/device_listing/{listing_id}", headers=auth_headers).json()
+    assert stats == {"total_shares": 3, "platform_stats": {"whatsapp": 2, "email": 1}}
+    # Another item's counters are its own
+    other = client.get(f"/api/v1/shares/stats/device_listing/{_listing(client, auth_headers)}", headers=auth_headers).json()
+    assert other == {"total_shares": 0, "platform_stats": {}}
+
+
+def test_rebuild_share_counters_recounts_from_shares(fresh_db):
+    engine, _ = fresh_db
+    with Session(engine) as db:
+        service = SharingService(db)
+        # Shared items are looked up first; a blood request stands in for any of them
+        db.add(BloodDonationRequest(id=7, blood_type="O-", location="Pune", urgency="High", contact_number="555-0100", user_id=1))
+        db.commit()
+        for user_id, platform in [(1, "twitter"), (2, "twitter"), (3, "linkedin")]:
+            service.create_share(user_id, ShareableType.BLOOD_REQUEST, 7, platform)
+        assert service.get_share_stats(ShareableType.BLOOD_REQUEST, 7)["platform_stats"] == {"twitter": 2, "linkedin": 1}
+
+        db.execute(update(ShareCounter).values(count=ShareCounter.count + 5))
+        db.commit()
+        assert service.get_share_stats(ShareableType.BLOOD_REQUEST, 7)["total_shares"] == 13
+        assert service.rebuild_share_counters() == 2
+        assert service.get_share_stats(ShareableType.BLOOD_REQUEST, 7) == {
+            "total_shares": 3, "platform_stats": {"twitter": 2, "linkedin": 1},
+        }
+
+
+@pytest.mark.parametrize("share_id", [1, 2, 62, 123456, 2 ** 31 - 1])
+def test_short_codes_round_trip(share_id):
+    code = encode_share_id(share_id)
+    assert len(code) <= MAX_CODE_LENGTH
+    assert decode_code(code) == share_id
+
+
+def test_short_link_redirects_and_clicks_are_flushed_in_one_batch(client, auth_headers):
+    listing_id = _listing(client, auth_headers)
+    first = _share(client, auth_headers, listing_id, "facebook")
+    second = _share(client, auth_headers, listing_id, "twitter")
+    codes = {share["id"]: share["short_url"].rsplit("/", 1)[1] for share in (first, second)}
+    # Clicks left over from other tests
+    asyncio.run(click_buffer.flush())
+
+    for share_id in (first["id"], first["id"], second["id"], first["id"]):
+        response = client.get(f"/s/{codes[share_id]}", follow_redirects=False)
+        assert response.status_code == 302
+        assert response.headers["location"].endswith(f"/assistive-devices/listings/{listing_id}")
+        assert response.headers["cache-control"] == "no-store"
+
+    # Buffered in memory until the flush
+    assert click_buffer.stats()["pending_clicks"] == 4
+    assert {share["id"]: share["click_count"] for share in client.get("/api/v1/shares/my-shares", headers=auth_headers).json()
+            if share["id"] in codes} == {first["id"]: 0, second["id"]: 0}
+
+    assert asyncio.run(click_buffer.flush()) == 2
+    assert click_buffer.stats()["pending_clicks"] == 0
+    client.get(f"/s/{codes[second['id']]}", follow_redirects=False)
+    asyncio.run(click_buffer.flush())
+    shares = client.get("/api/v1/shares/my-shares", headers=auth_headers).json()
+    assert {share["id"]: share["click_count"] for share in shares if share["id"] in codes} == {first["id"]: 3, second["id"]: 2}
+
+
+def test_unknown_short_codes_are_not_found(client):
+    assert client.get("/s/zzzzzzz", follow_redirects=False).status_code == 404
+    # A valid code of a share that doesn't exist
+    assert client.get(f"/s/{encode_share_id(2 ** 31 - 1)}", follow_redirects=False).status_code == 404